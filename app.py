@@ -1,34 +1,120 @@
 
-from flask import Flask, render_template, request, redirect, url_for, flash, make_response, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, Response, abort, stream_with_context
 try:
     from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 except ImportError:
     raise ImportError("flask_login is not installed. Please install it with 'pip install flask-login'")
 from werkzeug.security import generate_password_hash, check_password_hash
+from itsdangerous import URLSafeSerializer, BadSignature
 from datetime import datetime
+import functools
+import gzip
 import io
+import json
+import os
 import csv
+import click
 
 # Import forms
 from forms import ContactForm, LoginForm, PredictionForm
-# Import prediction functionality
-from predict_model import predict_climate_risk
+# Prediction functionality (NumPy, matplotlib, the model) is imported inside
+# the routes that use it, keeping worker and test start-up fast
 # Import models and db
-from models import db, User, Contact, Prediction
+from models import db, User, Contact, Prediction, Job
+# Import plot cache
+from plot_cache import PlotCache, plot_cache_key
+# Import plot render pool
+from render_pool import RenderPool, RenderPoolSaturated, RenderTimeout
+# Import SQLite engine profiles
+from sqlite_profile import engine_options, install_pragmas
+# Import report export
+from reports import parse_report_date, prediction_rows_query, city_report_rows, export_rows, iter_csv
+# Import dashboard queries
+from dashboard import prediction_summary, recent_predictions, recent_contacts
+# Import city rollups
+from rollup import record_prediction, rebuild_rollups, city_summaries
+# Import the job queue
+from jobs import JobRunner, enqueue_job, iter_job_result, job_status, needs_worker
+# Import pre-serialized responses
+from response_cache import CachedBody
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key'  # Change this in production
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///climate_risk.db'
+# Relative SQLite paths are in the instance folder; the tests point this at a scratch database
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('SQLALCHEMY_DATABASE_URI', 'sqlite:///climate_risk.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Engine tuning from sqlite_profile.SQLITE_PROFILES: 'production' (WAL, pooled) or 'default'
+app.config['SQLITE_PROFILE'] = os.environ.get('SQLITE_PROFILE', 'production')
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLITE_PROFILE'],
+                                                       app.config['SQLALCHEMY_DATABASE_URI'])
+# Identical inputs produce identical plots so they can be served from the plot cache
+app.config['DETERMINISTIC_PLOTS'] = True
+app.config['PLOT_CACHE_MAX_BYTES'] = 32 * 1024 * 1024
+app.config['PLOT_CACHE_DIR'] = os.path.join(app.instance_path, 'plot_cache')
+# Bytes of rendered images kept in PLOT_CACHE_DIR before the least recently used are deleted
+app.config['PLOT_CACHE_DISK_MAX_BYTES'] = int(os.environ.get('PLOT_CACHE_DISK_MAX_BYTES', 256 * 1024 * 1024))
+# Seconds browsers may reuse a plot image before revalidating it with its ETag
+app.config['PLOT_MAX_AGE'] = 86400
+# Plot rendering runs in a bounded pool of renderer processes (0 renders in the request thread)
+app.config['PLOT_RENDER_PROCESSES'] = int(os.environ.get('PLOT_RENDER_PROCESSES', 2))
+# Renders that may wait for a free renderer before requests get a 503
+app.config['PLOT_RENDER_QUEUE'] = int(os.environ.get('PLOT_RENDER_QUEUE', 8))
+# Seconds a request waits for its plot
+app.config['PLOT_RENDER_TIMEOUT'] = float(os.environ.get('PLOT_RENDER_TIMEOUT', 10))
+# Rows per transaction for bulk prediction writes
+app.config['INGEST_BATCH_SIZE'] = 5000
+# Cities per committed chunk of an async scoring job
+app.config['JOB_CHUNK_SIZE'] = 1000
+# Run queued jobs on a thread of the web process; set JOBS_IN_PROCESS=0 when
+# separate `flask jobs-worker` processes serve the queue
+app.config['JOBS_IN_PROCESS'] = os.environ.get('JOBS_IN_PROCESS', '1') != '0'
+# Worker processes for Monte Carlo batches larger than one block of cities
+app.config['MONTE_CARLO_PROCESSES'] = int(os.environ.get('MONTE_CARLO_PROCESSES', 1))
+# Seconds browsers and proxies may reuse the landing page's climate data without revalidating
+app.config['CLIMATE_DATA_MAX_AGE'] = 3600
+# Distinct /api/climate-data queries whose serialized bodies are kept in each worker
+app.config['CLIMATE_DATA_CACHE_SIZE'] = 256
 
 # Initialize SQLAlchemy with the app
 db.init_app(app)
+with app.app_context():
+    install_pragmas(db.engine, app.config['SQLITE_PROFILE'])
+
+# Schema changes are managed by Alembic migrations (`flask db upgrade`).
+# Flask-Migrate and Alembic are only imported by init-db and the db
+# commands, so serving processes never load them.
+def init_migrate():
+    """Attach Flask-Migrate to the app (once) and return its `flask db` command group"""
+    from flask_migrate import Migrate
+    from flask_migrate.cli import db as db_commands
+    if 'migrate' not in app.extensions:
+        Migrate(app, db, directory=os.path.join(app.root_path, 'migrations'))
+    return db_commands
+
+class LazyMigrateGroup(click.Group):
+    """`flask db`: Flask-Migrate's commands, loaded when one of them is looked up"""
+
+    def list_commands(self, ctx):
+        return init_migrate().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return init_migrate().get_command(ctx, name)
+
+app.cli.add_command(LazyMigrateGroup('db', help='Perform database migrations.'))
 
 # Initialize LoginManager
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'  # Set login_view attribute
+
+# Rendered plots, shared by all requests in this worker and backed by PLOT_CACHE_DIR
+plot_cache = PlotCache(app.config['PLOT_CACHE_MAX_BYTES'], app.config['PLOT_CACHE_DIR'],
+                       app.config['PLOT_CACHE_DISK_MAX_BYTES'])
+job_runner = JobRunner(app, app.config['JOB_CHUNK_SIZE'])
+render_pool = RenderPool(app.config['PLOT_RENDER_PROCESSES'], app.config['PLOT_RENDER_QUEUE'],
+                         app.config['PLOT_RENDER_TIMEOUT'])
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -48,6 +134,8 @@ def predict():
     result = None
 
     if form.validate_on_submit():
+        from predict_model import predict_climate_risk
+
         # Get form data
         city = form.city.data
         population = form.population.data
@@ -61,8 +149,11 @@ def predict():
             population=population,
             temperature_increase=temperature_increase,
             urban_density=urban_density,
-            infrastructure=infrastructure
+            infrastructure=infrastructure,
+            deterministic_plots=app.config['DETERMINISTIC_PLOTS']
         )
+        # Plots are rendered by prediction_plot when the browser requests them
+        result['plot_id'] = _plot_serializer().dumps(result['plot_params'])
 
         # Save prediction to database if user is logged in
         if current_user.is_authenticated:
@@ -77,18 +168,88 @@ def predict():
                 risk_score=result.get('risk_score', 0)
             )
             db.session.add(prediction)
+            # Flushed first so the rollup sees the stored date
+            db.session.flush()
+            record_prediction(prediction)
             db.session.commit()
             flash('Prediction saved to your account', 'success')
 
     return render_template('predict.html', form=form, result=result, now=datetime.now())
 
+def _plot_serializer():
+    """Signs plot parameters so plot URLs are stateless across workers"""
+    return URLSafeSerializer(app.config['SECRET_KEY'], salt='prediction-plot')
+
+@app.route('/predict/<plot_id>/plot/<kind>.<image_format>')
+def prediction_plot(plot_id, kind, image_format):
+    """
+    Render a projection plot for a prediction on demand, in the render pool.
+
+    The extension picks the format (png, webp or svg) and ?dpi= a lower
+    resolution for raster formats (plot_renderer.PLOT_DPIS). A plot URL
+    always names the same image, so its ETag is the plot cache key and a
+    revalidation is answered without rendering.
+    """
+    from predict_model import PLOT_KINDS
+    from plot_renderer import PLOT_DPIS, PLOT_FORMATS
+
+    if kind not in PLOT_KINDS or image_format not in PLOT_FORMATS:
+        abort(404)
+    dpi = request.args.get('dpi', type=int)
+    if dpi is not None and (dpi not in PLOT_DPIS or image_format == 'svg'):
+        abort(400)
+    try:
+        plot_params = _plot_serializer().loads(plot_id)
+    except BadSignature:
+        abort(404)
+
+    etag = plot_cache_key(kind, plot_params, image_format, dpi)
+    # SVG is text and shrinks about 4x with gzip; PNG and WebP are already compressed
+    compress = image_format == 'svg' and bool(request.accept_encodings['gzip'])
+    if compress:
+        etag += '-gzip'
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        try:
+            image = plot_cache.get_or_render(kind, plot_params,
+                                             lambda: render_pool.render(kind, plot_params, image_format, dpi),
+                                             image_format, dpi)
+        except (RenderPoolSaturated, RenderTimeout) as e:
+            # Back-pressure: the browser retries the image instead of piling up requests
+            response = Response(str(e), status=503, mimetype='text/plain')
+            response.headers['Retry-After'] = '1'
+            return response
+        response = Response(gzip.compress(image, mtime=0) if compress else image, mimetype=PLOT_FORMATS[image_format])
+        if compress:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={app.config['PLOT_MAX_AGE']}"
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+@app.route('/api/plot-cache/stats', methods=['GET'])
+def plot_cache_stats():
+    """Plot cache counters for monitoring"""
+    return jsonify(plot_cache.stats())
+
+@app.route('/api/render-pool/stats', methods=['GET'])
+def render_pool_stats():
+    """Plot render pool counters and load for monitoring"""
+    return jsonify(render_pool.stats())
+
 @app.route('/download-report/<city>')
 def download_report(city):
-    """Generate and download a CSV report for a city"""
-    # Get the most recent prediction for this city
-    prediction = None
-    
+    """Stream a CSV report of the current user's predictions for a city"""
+    from projections import REFERENCE_CITY
+    from score_table import lookup_score
+
+    query = None
+    inputs = REFERENCE_CITY
+    risk_score = lookup_score(**REFERENCE_CITY)
+
     if current_user.is_authenticated:
+        # The most recent prediction drives the projections
         prediction = Prediction.query.filter_by(
             user_id=current_user.id, 
             city=city
@@ -97,56 +258,79 @@ def download_report(city):
         if not prediction:
             flash('No prediction data available for the specified city.', 'warning')
             return redirect(url_for('index'))
-    # For non-authenticated users, we'll use sample data (handled below)
-    
-    # Create a CSV string
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write headers
-    writer.writerow(['Urban Climate Risk Report'])
-    writer.writerow(['Generated on', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
-    writer.writerow([])
-    
-    if prediction:
-        # Use actual prediction data
-        writer.writerow(['City', 'Population', 'Temperature Increase', 'Urban Density', 'Infrastructure', 'Risk Level', 'Risk Score'])
-        writer.writerow([
-            prediction.city,
-            prediction.population,
-            prediction.temperature_increase,
-            prediction.urban_density,
-            prediction.infrastructure,
-            prediction.risk_level,
-            f"{prediction.risk_score}%"
-        ])
-        temp_increase = prediction.temperature_increase
-    else:
-        # Use sample data
-        writer.writerow(['City', 'Population', 'Temperature Increase', 'Urban Density', 'Infrastructure', 'Risk Level', 'Risk Score'])
-        writer.writerow([city, '500000', '1.5', 'medium', 'moderate', 'medium', '55%'])
-        temp_increase = 1.5
-    
-    writer.writerow([])
-    writer.writerow(['Future Projections (2023-2030)'])
-    writer.writerow(['Year', 'Projected Temperature (°C)', 'Projected Rainfall (mm)', 'Projected Flood Risk (%)'])
-    
-    # Generate some sample projection data
-    base_temp = 25.0
-    base_rain = 800
-    base_risk = 30
-    
-    for i, year in enumerate(range(2023, 2031)):
-        projected_temp = round(base_temp + (i * temp_increase / 8), 1)
-        projected_rain = round(base_rain - (i * 25))
-        projected_risk = min(100, round(base_risk + (i * 3)))
-        writer.writerow([year, projected_temp, projected_rain, f"{projected_risk}%"])
-    
-    # Create response with CSV data
-    response = make_response(output.getvalue())
-    response.headers["Content-Disposition"] = f"attachment; filename={city}_climate_report.csv"
-    response.headers["Content-type"] = "text/csv"
+        query = prediction_rows_query(user_id=current_user.id, city=city)
+        inputs = {
+            'temperature_increase': prediction.temperature_increase,
+            'urban_density': prediction.urban_density,
+            'infrastructure': prediction.infrastructure
+        }
+        risk_score = prediction.risk_score
+    # For non-authenticated users, the report uses sample data
     
+    return _csv_response(city_report_rows(city, _report_projection(risk_score, inputs), query),
+                         f"{city}_climate_report.csv")
+
+def _report_projection(risk_score, inputs):
+    """The projection series shown for a prediction, matching its plots when they are deterministic"""
+    from predict_model import deterministic_plot_seed
+    from projections import project_city
+
+    seed = None
+    if app.config['DETERMINISTIC_PLOTS']:
+        seed = deterministic_plot_seed(risk_score, inputs['urban_density'], inputs['infrastructure'],
+                                       inputs['temperature_increase'])
+    return project_city(inputs['temperature_increase'], risk_score, inputs['urban_density'],
+                        inputs['infrastructure'], seed)
+
+@app.route('/export/predictions.csv')
+@login_required
+def export_predictions():
+    """
+    Stream prediction history as CSV.
+
+    Query parameters: city, start and end (YYYY-MM-DD, inclusive) filter the
+    rows; all=true exports every user's predictions and requires an admin.
+    """
+    try:
+        start = parse_report_date(request.args.get('start'))
+        end = parse_report_date(request.args.get('end'), end=True)
+    except ValueError:
+        abort(400, description='Dates must use the YYYY-MM-DD format.')
+
+    user_id = current_user.id
+    if request.args.get('all', '').lower() in ('1', 'true', 'yes'):
+        if not current_user.is_admin:
+            abort(403)
+        user_id = None
+
+    query = prediction_rows_query(user_id=user_id, city=request.args.get('city'), start=start, end=end)
+    return _csv_response(export_rows(query), 'climate_predictions.csv')
+
+@app.route('/api/cities/summary', methods=['GET'])
+@login_required
+def cities_summary():
+    """
+    Per-city summaries of stored predictions, read from the rollup table.
+
+    ?city= limits the result to one city; all=true summarizes every user's
+    predictions and requires an admin.
+    """
+    user_id = current_user.id
+    if request.args.get('all', '').lower() in ('1', 'true', 'yes'):
+        if not current_user.is_admin:
+            abort(403)
+        user_id = None
+
+    summaries = city_summaries(user_id, request.args.get('city'))
+    for summary in summaries:
+        if summary['latest_date'] is not None:
+            summary['latest_date'] = summary['latest_date'].isoformat()
+    return jsonify({'cities': summaries})
+
+def _csv_response(rows, filename):
+    """A chunked text/csv download that encodes rows as they are produced"""
+    response = Response(stream_with_context(iter_csv(rows)), mimetype='text/csv')
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
     return response
 
 @app.route('/contact', methods=['GET', 'POST'])
@@ -195,42 +379,329 @@ def logout():
     logout_user()
     return redirect(url_for('index'))
 
-@app.route('/api/climate-data', methods=['GET'])
+@app.route('/dashboard')
+@login_required
+def dashboard():
+    """
+    The user's prediction overview.
+
+    Totals and the risk distribution are aggregated in SQL and the list
+    shows one keyset-paginated page (?before=<prediction id>), so the page
+    never loads all of a user's predictions.
+    """
+    try:
+        before = int(request.args['before']) if 'before' in request.args else None
+        predictions, next_before = recent_predictions(current_user.id, before)
+    except ValueError:
+        abort(400)
+
+    summary = prediction_summary(current_user.id)
+    return render_template(
+        'dashboard.html',
+        summary=summary,
+        risk_counts=summary['risk_counts'],
+        predictions=predictions,
+        next_before=next_before,
+        contacts=recent_contacts() if current_user.is_admin else [],
+        now=datetime.now()
+    )
+
+@app.route('/api/climate-data', methods=['GET', 'POST'])
 def climate_data():
-    # This would typically come from a database or API
-    # For demo purposes, we'll return mock data
-    data = {
-        'temperature': [
-            {'year': 2023, 'value': 25.8},
-            {'year': 2024, 'value': 26.2},
-            {'year': 2025, 'value': 26.7},
-            {'year': 2026, 'value': 27.1},
-            {'year': 2027, 'value': 27.6},
-            {'year': 2028, 'value': 28.0},
-            {'year': 2029, 'value': 28.5},
-            {'year': 2030, 'value': 29.0}
-        ],
-        'rainfall': [
-            {'year': 2023, 'value': 800},
-            {'year': 2024, 'value': 750},
-            {'year': 2025, 'value': 900},
-            {'year': 2026, 'value': 650},
-            {'year': 2027, 'value': 1000},
-            {'year': 2028, 'value': 850},
-            {'year': 2029, 'value': 700},
-            {'year': 2030, 'value': 600}
-        ]
+    """
+    Yearly temperature, rainfall and risk projections.
+
+    GET without parameters returns the reference city's series. Query
+    parameters population, temperature_increase, urban_density and
+    infrastructure override the reference city's inputs (city names the
+    result), and start_year / end_year pick the years (base year to
+    projections.MAX_PROJECTION_YEAR). The bodies of the last
+    CLIMATE_DATA_CACHE_SIZE distinct queries are kept serialized and
+    compressed. POST takes a batch of cities like /api/predict/batch and
+    streams one JSON line per city (application/x-ndjson), projecting a
+    block of cities at a time.
+    """
+    if request.method == 'POST':
+        return _stream_climate_data()
+
+    from projections import PROJECTION_YEARS, REFERENCE_CITY
+
+    args = request.args
+    try:
+        # Normalized, so equivalent queries share one cached body
+        body = _climate_data_body(
+            int(args.get('start_year', PROJECTION_YEARS[0])),
+            int(args.get('end_year', PROJECTION_YEARS[-1])),
+            float(args.get('population', REFERENCE_CITY['population'])),
+            float(args.get('temperature_increase', REFERENCE_CITY['temperature_increase'])),
+            args.get('urban_density', REFERENCE_CITY['urban_density']),
+            args.get('infrastructure', REFERENCE_CITY['infrastructure']),
+            args.get('city')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return body.response(request)
+
+@functools.lru_cache(maxsize=app.config['CLIMATE_DATA_CACHE_SIZE'])
+def _climate_data_body(start_year, end_year, population, temperature_increase, urban_density, infrastructure,
+                       city):
+    """One city's series, serialized and compressed once per distinct query."""
+    from projections import city_climate_data
+
+    data = city_climate_data(start_year, end_year, population=population,
+                             temperature_increase=temperature_increase, urban_density=urban_density,
+                             infrastructure=infrastructure)
+    if city is not None:
+        data['city'] = city
+    return CachedBody.from_json(data, max_age=app.config['CLIMATE_DATA_MAX_AGE'])
+
+def _stream_climate_data():
+    """The series of a batch of cities as newline-delimited JSON."""
+    from predict_model import predict_risk_batch
+    from projections import iter_climate_series
+
+    try:
+        columns = _batch_columns_from_request()
+        risk_score = predict_risk_batch(columns)['risk_score']
+        series = iter_climate_series(columns['temperature_increase'], risk_score, columns['urban_density'],
+                                     columns['infrastructure'], request.args.get('start_year'),
+                                     request.args.get('end_year'))
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    names = columns.get('city')
+
+    def lines():
+        for index, data in enumerate(series):
+            if names is not None:
+                data['city'] = names[index]
+            yield json.dumps(data, separators=(',', ':')) + '\n'
+    return Response(lines(), mimetype='application/x-ndjson')
+
+def _batch_columns_from_request():
+    """Read batch scoring input from a JSON or CSV request body into columns."""
+    from predict_model import BATCH_COLUMNS
+
+    if request.mimetype == 'text/csv':
+        rows = list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    else:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict) and 'cities' in payload:
+            payload = payload['cities']
+        if isinstance(payload, dict):
+            # Already column oriented: {"population": [...], ...}
+            return payload
+        if not isinstance(payload, list):
+            raise ValueError('Request body must be JSON or CSV')
+        rows = payload
+
+    columns = {column: [] for column in BATCH_COLUMNS + ('city',)}
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            raise ValueError('Each city must be an object')
+        # Empty CSV cells count as missing
+        missing = [column for column in BATCH_COLUMNS if row.get(column) in (None, '')]
+        if missing:
+            raise ValueError(f"Row {index} is missing: {', '.join(missing)}")
+        for column in columns:
+            columns[column].append(row.get(column))
+    if not any(columns['city']):
+        del columns['city']
+    return columns
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Score a batch of cities in one vectorized pass.
+
+    ?probability=true adds model probabilities and ?explain=true adds
+    per-factor contributions (for the model too when combined).
+    ?save=true stores the scores as the logged-in user's predictions.
+    """
+    from predict_model import predict_risk_batch
+    from attribution import explain_batch
+    from ingest import score_and_store
+
+    save = request.args.get('save') == 'true'
+    if save and not current_user.is_authenticated:
+        return jsonify({'error': 'Login required to save predictions'}), 401
+
+    try:
+        columns = _batch_columns_from_request()
+        use_model = request.args.get('probability') == 'true'
+        # Explained before saving, so a request that fails stores nothing
+        explanation = explain_batch(columns, use_model=use_model) if request.args.get('explain') == 'true' else None
+        if save:
+            result, ingest_stats = score_and_store(current_user.id, columns, app.config['INGEST_BATCH_SIZE'],
+                                                   use_model=use_model)
+        else:
+            result = predict_risk_batch(columns, use_model=use_model)
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = {
+        'count': len(result['risk_score']),
+        'risk_score': result['risk_score'].tolist(),
+        'risk_level': result['risk_level'].tolist()
     }
-    return jsonify(data)
+    if 'high_risk_probability' in result:
+        response['high_risk_probability'] = result['high_risk_probability'].tolist()
+    if explanation:
+        response['contributions'] = {
+            target: {factor: values.tolist() for factor, values in contributions.items()}
+            for target, contributions in explanation.items()
+        }
+    if 'city' in columns:
+        response['city'] = list(columns['city'])
+    if save:
+        response['saved'] = ingest_stats['rows']
+    return jsonify(response)
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    Queue a batch for asynchronous scoring.
+
+    Takes the same JSON or CSV body as /api/predict/batch (?probability=true
+    adds model probabilities) and answers 202 with the job's status URL.
+    """
+    try:
+        columns = _batch_columns_from_request()
+        job = enqueue_job(columns, current_user.id if current_user.is_authenticated else None,
+                          use_model=request.args.get('probability') == 'true')
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    if app.config['JOBS_IN_PROCESS']:
+        job_runner.wake()
+    response = jsonify(job_status(job))
+    response.status_code = 202
+    response.headers['Location'] = url_for('get_job', job_id=job.id)
+    return response
+
+def _get_job_or_404(job_id):
+    """A job visible to the current user: anonymous jobs to anyone with the id, owned ones to their owner"""
+    job = db.session.get(Job, job_id)
+    if job is None or (job.user_id is not None and
+                       (not current_user.is_authenticated or current_user.id != job.user_id)):
+        abort(404)
+    return job
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Progress of a scoring job; finished jobs link their result"""
+    job = _get_job_or_404(job_id)
+    if app.config['JOBS_IN_PROCESS'] and needs_worker(job):
+        # Picks up jobs left queued or half-done by a web process that exited
+        job_runner.wake()
+    status = job_status(job)
+    if job.status == 'done':
+        status['result_url'] = url_for('job_result', job_id=job.id)
+    return jsonify(status)
+
+@app.route('/api/jobs/<job_id>/result.csv', methods=['GET'])
+def job_result(job_id):
+    """Stream the scored rows of a finished job as CSV"""
+    job = _get_job_or_404(job_id)
+    if job.status != 'done':
+        return jsonify({'error': f'Job is {job.status}'}), 409
+    response = Response(stream_with_context(iter_job_result(job)), mimetype='text/csv')
+    response.headers["Content-Disposition"] = f"attachment; filename=job_{job.id}.csv"
+    return response
+
+@app.route('/api/predict/uncertainty', methods=['POST'])
+def predict_uncertainty():
+    """
+    Monte Carlo bands of the projected rainfall and risk for a batch of cities.
+
+    Takes the same JSON or CSV body as /api/predict/batch. ?samples= sets the
+    scenarios per city and ?seed= makes the bands reproducible; the seed
+    used is always returned.
+    """
+    from predict_model import predict_risk_batch, new_plot_seed
+    from uncertainty import MONTE_CARLO_SAMPLES, simulate
+
+    try:
+        columns = _batch_columns_from_request()
+        samples = int(request.args.get('samples', MONTE_CARLO_SAMPLES))
+        seed = int(request.args['seed']) if 'seed' in request.args else new_plot_seed()
+        risk_score = predict_risk_batch(columns)['risk_score']
+        bands = simulate(columns['temperature_increase'], risk_score, columns['urban_density'],
+                         columns['infrastructure'], samples, seed, app.config['MONTE_CARLO_PROCESSES'])
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = {
+        'count': len(risk_score),
+        'samples': samples,
+        'seed': seed,
+        'years': bands['years'],
+        'risk_score': risk_score.tolist()
+    }
+    for quantity in ('rainfall', 'risk'):
+        response[quantity] = {name: band.round(2).tolist() for name, band in bands[quantity].items()}
+    if 'city' in columns:
+        response['city'] = list(columns['city'])
+    return jsonify(response)
+
+@app.route('/api/predict/sweep', methods=['GET', 'POST'])
+def predict_sweep():
+    """
+    Risk score curve of one city over a range of temperature increases.
+
+    Parameters (JSON body or query string): urban_density, infrastructure,
+    population or a list of populations, and optionally temperature_min,
+    temperature_max and temperature_step (defaults: the form's 0.1-5.0
+    range in 0.1 steps). Each curve includes the temperatures at which the
+    score crosses the medium (40) and high (70) thresholds.
+    """
+    from sweep import MAX_SWEEP_POINTS, TEMPERATURE_RANGE, TEMPERATURE_STEP, sweep, temperature_grid
+
+    params = request.get_json(silent=True) if request.is_json else None
+    if params is None:
+        params = request.args.to_dict()
+        if 'populations' in params:
+            params['populations'] = params['populations'].split(',')
+
+    try:
+        if 'populations' in params:
+            populations = list(params['populations'])
+        elif 'population' in params:
+            populations = [params['population']]
+        else:
+            raise ValueError("Missing parameter: population or populations")
+        if not populations:
+            raise ValueError("sweep needs at least one population")
+        # Bounded by the points left per population, before the grid is built
+        temperatures = temperature_grid(
+            float(params.get('temperature_min', TEMPERATURE_RANGE[0])),
+            float(params.get('temperature_max', TEMPERATURE_RANGE[1])),
+            float(params.get('temperature_step', TEMPERATURE_STEP)),
+            MAX_SWEEP_POINTS // len(populations)
+        )
+        result = sweep(populations, params.get('urban_density', 'low'), params.get('infrastructure', 'new'),
+                       temperatures)
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    result['urban_density'] = params.get('urban_density', 'low')
+    result['infrastructure'] = params.get('infrastructure', 'new')
+    return jsonify(result)
 
 # Add the jinja context processor for current year
 @app.context_processor
 def inject_now():
     return {'now': datetime.now()}
 
-# Flask 2.0+ uses this instead of @app.before_first_request
-with app.app_context():
-    db.create_all()
+# Date formatting for templates, e.g. dates|map('strftime', '%Y-%m-%d')
+@app.template_filter('strftime')
+def strftime_filter(value, format='%Y-%m-%d'):
+    return value.strftime(format) if value else ''
+
+def init_db():
+    """Migrate the database to the latest schema and create the default admin user if it is missing"""
+    init_migrate()
+    from flask_migrate import upgrade
+    upgrade()
     
     # Create admin user if it doesn't exist
     admin = User.query.filter_by(email='admin@example.com').first()
@@ -244,5 +715,43 @@ with app.app_context():
         db.session.add(admin)
         db.session.commit()
 
+# Schema creation is an explicit step (`flask --app app init-db`) rather than
+# an import side effect, so importing the app stays cheap for workers and tests
+@app.cli.command('init-db')
+def init_db_command():
+    """Apply the migrations and create the default admin user."""
+    init_db()
+    click.echo('Initialized the database.')
+
+@app.cli.command('rescore-predictions')
+@click.option('--batch-size', type=int, default=None, help='Rows per transaction (default: INGEST_BATCH_SIZE).')
+def rescore_predictions_command(batch_size):
+    """Re-score the latest prediction of every stored user and city."""
+    from ingest import rescore_stored_predictions
+    stats = rescore_stored_predictions(batch_size or app.config['INGEST_BATCH_SIZE'])
+    click.echo(f"Re-scored {stats['rows']} predictions in {stats['batches']} transactions "
+               f"({stats['seconds']:.2f} s, {stats['rows_per_second']:,.0f} rows/s).")
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recompute the per-city rollups from every stored prediction."""
+    click.echo(f"Rebuilt {rebuild_rollups()} city rollups.")
+
+@app.cli.command('jobs-worker')
+@click.option('--chunk-size', type=int, default=None, help='Cities per committed chunk (default: JOB_CHUNK_SIZE).')
+@click.option('--poll-interval', type=float, default=1.0, help='Seconds to wait when the queue is empty.')
+@click.option('--once', is_flag=True, help='Run the queued jobs and exit instead of polling.')
+def jobs_worker_command(chunk_size, poll_interval, once):
+    """Run queued scoring jobs; start several of these to score in parallel."""
+    from jobs import run_pending_jobs, work
+    chunk_size = chunk_size or app.config['JOB_CHUNK_SIZE']
+    if once:
+        count = run_pending_jobs(chunk_size)
+    else:
+        count = work(chunk_size, poll_interval)
+    click.echo(f"Ran {count} jobs.")
+
 if __name__ == '__main__':
+    with app.app_context():
+        init_db()
     app.run(debug=True)
@@ -0,0 +1,68 @@
+import numpy as np
+from predict_model import BASE_RISK, BATCH_COLUMNS, RULE_TERM_ORDER, batch_arrays, rule_based_terms
+from model_serving import get_model_server
+
+# Factors scores are attributed to, in BATCH_COLUMNS order
+FACTORS = BATCH_COLUMNS
+
+
+def explain_rule_scores(population, temperature_increase, urban_density, infrastructure):
+    """
+    Exact per-factor decomposition of rule_based_prediction for whole batches.
+
+    Returns:
+        dict: 'base' (the constant starting risk), one point array per factor,
+            and 'cap' (the non-positive adjustment applied by the 100 point cap);
+            for every row they sum to the rule-based risk score
+    """
+    terms = rule_based_terms(population, temperature_increase, urban_density, infrastructure)
+    uncapped = BASE_RISK
+    for factor in RULE_TERM_ORDER:
+        uncapped = uncapped + terms[factor]
+
+    # Factors in the order the score adds them, so summing the values is exact
+    contributions = {'base': np.full(uncapped.shape, float(BASE_RISK))}
+    for factor in RULE_TERM_ORDER:
+        contributions[factor] = terms[factor].astype(float)
+    contributions['cap'] = np.minimum(uncapped, 100) - uncapped
+    return contributions
+
+
+def explain_model_scores(population, temperature_increase, urban_density, infrastructure):
+    """
+    Path-based per-factor contributions to the RandomForest's high-risk probability.
+
+    Returns:
+        dict: 'base' (the forest's mean prior probability) and one contribution
+            array per factor; for every row they sum to high_risk_probability
+    """
+    bias, contributions = get_model_server().explain_batch(population, temperature_increase, urban_density, infrastructure)
+    explanation = {'base': np.full(len(contributions), bias)}
+    for index, factor in enumerate(FACTORS):
+        explanation[factor] = contributions[:, index]
+    return explanation
+
+
+def explain_batch(data, use_model=True):
+    """
+    Attribute risk scores (and model probabilities) of many cities to their factors.
+
+    Args:
+        data: pandas DataFrame or mapping of column name -> array-like holding
+            the columns listed in BATCH_COLUMNS
+        use_model (bool): Also explain the RandomForest's high-risk probability
+            (omitted when the model file is missing)
+
+    Returns:
+        dict: 'rule' contributions from explain_rule_scores and, with the model,
+            'model' contributions from explain_model_scores
+
+    Raises:
+        ValueError: If the input does not pass batch_arrays()
+    """
+    arrays = batch_arrays(data)
+    columns = [arrays[column] for column in BATCH_COLUMNS]
+    explanation = {'rule': explain_rule_scores(*columns)}
+    if use_model and get_model_server().available:
+        explanation['model'] = explain_model_scores(*columns)
+    return explanation
@@ -0,0 +1,44 @@
+"""
+Benchmark: explaining risk scores and model probabilities for a large
+batch of cities with the attribution engine.
+
+Run from the repository root:
+    python benchmarks/bench_attribution.py [rows]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from attribution import explain_model_scores, explain_rule_scores
+from model_serving import get_model_server
+
+
+def main(rows=100000):
+    rng = np.random.default_rng(0)
+    columns = (
+        rng.integers(1000, 10000000, rows),
+        rng.uniform(0.1, 5.0, rows),
+        rng.choice(['low', 'medium', 'high'], rows),
+        rng.choice(['new', 'moderate', 'aging'], rows)
+    )
+    get_model_server().load()
+
+    start = time.perf_counter()
+    explain_rule_scores(*columns)
+    rule_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    explain_model_scores(*columns)
+    model_s = time.perf_counter() - start
+
+    print(f"rows: {rows}")
+    print(f"rule decomposition:   {rule_s:8.3f} s ({rows / rule_s:,.0f} rows/s)")
+    print(f"forest contributions: {model_s:8.3f} s ({rows / model_s:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
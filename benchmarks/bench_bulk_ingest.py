@@ -0,0 +1,80 @@
+"""
+Benchmark: storing scored predictions one row per transaction (the /predict
+path) versus batched executemany inserts (ingest.insert_predictions).
+
+Each variant writes to its own on-disk SQLite database so commits pay the
+real fsync cost.
+
+Run from the repository root:
+    python benchmarks/bench_bulk_ingest.py [rows] [batch_size ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from flask import Flask
+
+from models import db, User, Prediction
+from ingest import insert_predictions, prediction_mappings
+from predict_model import predict_risk_batch
+
+
+def scored_mappings(rows, user_id):
+    rng = np.random.default_rng(0)
+    columns = {
+        'city': [f'City {i}' for i in range(rows)],
+        'population': rng.integers(1000, 10000000, rows).tolist(),
+        'temperature_increase': rng.uniform(0.1, 5.0, rows).tolist(),
+        'urban_density': rng.choice(['low', 'medium', 'high'], rows).tolist(),
+        'infrastructure': rng.choice(['new', 'moderate', 'aging'], rows).tolist()
+    }
+    return prediction_mappings(user_id, columns, predict_risk_batch(columns))
+
+
+def per_row(mappings):
+    # What /predict does for every prediction
+    start = time.perf_counter()
+    for mapping in mappings:
+        db.session.add(Prediction(**mapping))
+        db.session.commit()
+    return time.perf_counter() - start
+
+
+def bulk(mappings, batch_size):
+    return insert_predictions(mappings, batch_size)['seconds']
+
+
+def run(label, rows, write):
+    with tempfile.TemporaryDirectory() as directory:
+        bench_app = Flask(__name__)
+        bench_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'bench.db')
+        db.init_app(bench_app)
+        with bench_app.app_context():
+            db.create_all()
+            user = User(name='Bench', email='bench@example.com', password='-')
+            db.session.add(user)
+            db.session.commit()
+            seconds = write(scored_mappings(rows, user.id))
+            assert Prediction.query.count() == rows
+            db.session.remove()
+    print(f"{label:<24} {seconds:8.3f} s  {rows / seconds:12,.0f} rows/s")
+    return seconds
+
+
+def main(rows=20000, batch_sizes=(500, 5000, 50000)):
+    print(f"rows: {rows:,}")
+    # The per-row path is slow; time it on a sample and extrapolate
+    sample = min(rows, 2000)
+    per_row_s = run(f'per-row, {sample} rows', sample, per_row) * rows / sample
+    for batch_size in batch_sizes:
+        bulk_s = run(f'bulk, batch {batch_size}', rows, lambda mappings: bulk(mappings, batch_size))
+        print(f"{'':<24} {per_row_s / bulk_s:8.1f}x faster than per-row")
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(args[0] if args else 20000, args[1:] or (500, 5000, 50000))
@@ -0,0 +1,54 @@
+"""
+Benchmark: /api/climate-data served by rebuilding and jsonify-ing the
+series on every request (the previous route) versus the pre-serialized
+CachedBody, for plain, gzip and revalidating (If-None-Match) clients.
+
+Run from the repository root:
+    python benchmarks/bench_climate_data.py [requests]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import jsonify
+
+from app import app
+from projections import city_climate_data
+
+
+@app.route('/bench/climate-data-uncached')
+def climate_data_uncached():
+    return jsonify(city_climate_data())
+
+
+def timed(client, url, requests, headers=None):
+    response = client.get(url, headers=headers)
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(url, headers=headers)
+    return requests / (time.perf_counter() - start), response
+
+
+def main(requests=2000):
+    client = app.test_client()
+    etag = client.get('/api/climate-data').headers['ETag']
+    gzip_etag = client.get('/api/climate-data', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    cases = [
+        ('rebuilt per request', '/bench/climate-data-uncached', None),
+        ('cached', '/api/climate-data', None),
+        ('cached, gzip', '/api/climate-data', {'Accept-Encoding': 'gzip'}),
+        ('cached, 304', '/api/climate-data', {'If-None-Match': etag}),
+        ('cached, gzip 304', '/api/climate-data', {'Accept-Encoding': 'gzip', 'If-None-Match': gzip_etag}),
+    ]
+    baseline = None
+    for name, url, headers in cases:
+        rate, response = timed(client, url, requests, headers)
+        baseline = baseline or rate
+        print(f"{name:20s} {rate:9,.0f} requests/s  {rate / baseline:5.1f}x  "
+              f"status {response.status_code}  body {len(response.data):5d} bytes")
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
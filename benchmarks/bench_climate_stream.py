@@ -0,0 +1,75 @@
+"""
+Benchmark: the climate series of many cities built as one JSON document
+in memory (a list of every city's dict, then jsonify) versus streamed as
+newline-delimited JSON by POST /api/climate-data, one block of cities at
+a time. Reports the time to the full body and the peak memory traced
+while handling the request (the parsed request body included).
+
+Run from the repository root:
+    python benchmarks/bench_climate_stream.py [cities ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from flask import jsonify
+
+from app import app, _batch_columns_from_request
+from predict_model import predict_risk_batch
+from projections import iter_climate_series
+
+
+@app.route('/bench/climate-data-document', methods=['POST'])
+def climate_data_document():
+    columns = _batch_columns_from_request()
+    risk_score = predict_risk_batch(columns)['risk_score']
+    series = list(iter_climate_series(columns['temperature_increase'], risk_score, columns['urban_density'],
+                                      columns['infrastructure'], block=len(risk_score)))
+    for name, data in zip(columns['city'], series):
+        data['city'] = name
+    return jsonify(series)
+
+
+def consume(client, url, body):
+    response = client.post(url, json=body, buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    return size
+
+
+def measure(client, url, body):
+    start = time.perf_counter()
+    size = consume(client, url, body)
+    seconds = time.perf_counter() - start
+    # Traced separately: tracemalloc slows allocation-heavy code several times over
+    tracemalloc.start()
+    consume(client, url, body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, size
+
+
+def main(*sizes):
+    client = app.test_client()
+    rng = np.random.default_rng(0)
+    for cities in sizes or (100, 1000, 10000):
+        body = {
+            'city': [f'City {i}' for i in range(cities)],
+            'population': rng.integers(10000, 5000000, cities).tolist(),
+            'temperature_increase': rng.uniform(0.1, 5.0, cities).round(1).tolist(),
+            'urban_density': rng.choice(['low', 'medium', 'high'], cities).tolist(),
+            'infrastructure': rng.choice(['new', 'moderate', 'aging'], cities).tolist()
+        }
+        document_s, document_peak, document_size = measure(client, '/bench/climate-data-document', body)
+        stream_s, stream_peak, stream_size = measure(client, '/api/climate-data', body)
+        print(f"{cities:7,d} cities: document {document_s * 1e3:8.1f} ms {document_peak / 2**20:7.1f} MiB peak "
+              f"({document_size / 2**20:5.1f} MiB)   NDJSON stream {stream_s * 1e3:8.1f} ms "
+              f"{stream_peak / 2**20:7.1f} MiB peak ({stream_size / 2**20:5.1f} MiB)")
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,47 @@
+"""
+Benchmark: sklearn predict_proba versus the flat-array CompiledForest for
+single rows and batches of increasing size.
+
+Run from the repository root:
+    python benchmarks/bench_compiled_forest.py
+"""
+import os
+import pickle
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from model_artifact import ModelArtifact, MODEL_ARTIFACT_PATH, MODEL_PATH
+
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        with open(MODEL_PATH, 'rb') as f:
+            model = pickle.load(f)
+    forest = ModelArtifact.load(MODEL_ARTIFACT_PATH).forest
+    X = np.random.default_rng(0).normal(size=(100000, 4))
+
+    print(f"{'rows':>8}{'sklearn ms':>14}{'compiled ms':>14}{'speedup':>10}")
+    for rows in (1, 16, 256, 1024, 10000, 100000):
+        batch = X[:rows]
+        sklearn_s = best_of(lambda: model.predict_proba(batch), repeat=3 if rows > 1000 else 10)
+        compiled_s = best_of(lambda: forest.predict_proba(batch), repeat=3 if rows > 1000 else 10)
+        print(f"{rows:>8}{sklearn_s * 1000:>14.2f}{compiled_s * 1000:>14.2f}{sklearn_s / compiled_s:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: the data behind the dashboard for users with more and more
+predictions, loading every Prediction and aggregating in Python (what the
+template's predictions|length / |sum implied) versus SQL aggregates plus
+one keyset page (dashboard.py).
+
+Run from the repository root:
+    python benchmarks/bench_dashboard.py [predictions ...]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from flask import Flask
+
+from models import db, User, Prediction
+from ingest import insert_predictions
+from dashboard import prediction_summary, recent_predictions
+
+
+def load_all(user_id):
+    predictions = Prediction.query.filter_by(user_id=user_id).order_by(Prediction.date.desc()).all()
+    count = len(predictions)
+    average = sum(p.risk_score for p in predictions) / count if count else 0
+    levels = [p.risk_level for p in predictions]
+    return count, average, predictions[0].date if predictions else None, levels
+
+
+def aggregated(user_id, before=None):
+    predictions, _ = recent_predictions(user_id, before)
+    return prediction_summary(user_id), predictions
+
+
+def timed(function, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as directory:
+        bench_app = Flask(__name__)
+        bench_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'bench.db')
+        db.init_app(bench_app)
+        with bench_app.app_context():
+            db.create_all()
+            user = User(name='Bench', email='bench@example.com', password='-')
+            db.session.add(user)
+            db.session.commit()
+            rng = np.random.default_rng(0)
+            scores = rng.uniform(20, 100, rows).tolist()
+            start = datetime(2020, 1, 1)
+            insert_predictions([
+                {'user_id': user.id, 'city': f'City {i % 500}', 'population': 500000, 'temperature_increase': 1.5,
+                 'urban_density': 'medium', 'infrastructure': 'moderate',
+                 'risk_level': 'high' if score >= 70 else 'medium' if score >= 40 else 'low',
+                 'risk_score': score, 'date': start + timedelta(minutes=i)}
+                for i, score in enumerate(scores)
+            ])
+            # A page deep into the history costs the same as the first one
+            deep = db.session.scalar(db.select(Prediction.id).order_by(Prediction.id).limit(1).offset(rows // 10))
+
+            old_s = timed(load_all, user.id)
+            new_s = timed(aggregated, user.id)
+            deep_s = timed(aggregated, user.id, deep)
+            print(f"{rows:8,d} predictions: load all {old_s * 1e3:9.2f} ms   SQL aggregates + page "
+                  f"{new_s * 1e3:7.2f} ms (deep page {deep_s * 1e3:6.2f} ms)  {old_s / new_s:6.1f}x")
+            db.session.remove()
+            db.engine.dispose()
+
+
+def main(*sizes):
+    for rows in sizes or (1000, 10000, 100000):
+        run(rows)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,64 @@
+"""
+Benchmark: the insight step of a prediction. Compares rebuilding the lists
+on every call (the pre-memoization behaviour), the memoized
+generate_insights and the score_table lookup, by time and by the
+memory each result keeps alive.
+
+Run from the repository root:
+    python benchmarks/bench_insights.py [calls]
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+import predict_model
+from score_table import lookup_insights
+
+# The cached function without its cache: builds fresh lists and tuples each call
+_build_insights = predict_model._insights.__wrapped__
+
+
+def rebuild_insights(temperature_increase, urban_density, infrastructure, risk_level):
+    band = 'severe' if temperature_increase > 2.5 else 'moderate' if temperature_increase > 1.5 else 'mild'
+    return _build_insights(band, urban_density, infrastructure, risk_level)
+
+
+def retained_per_call(function, rows, repeats=50):
+    # Keep every result alive, as a queue of rendered responses would; enough
+    # calls that the interpreter's small-object free lists are used up
+    rows = rows * repeats
+    tracemalloc.start()
+    results = [function(*row) for row in rows]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return retained / len(rows)
+
+
+def main(calls=200000):
+    rng = np.random.default_rng(0)
+    rows = list(zip(
+        np.round(rng.uniform(0.1, 5.0, 1000), 1).tolist(),
+        rng.choice(['low', 'medium', 'high'], 1000).tolist(),
+        rng.choice(['new', 'moderate', 'aging'], 1000).tolist(),
+        rng.choice(['low', 'medium', 'high'], 1000).tolist()
+    ))
+    repeats = max(1, calls // len(rows))
+
+    print(f"calls: {repeats * len(rows):,}")
+    for label, function in (('rebuilt each call', rebuild_insights),
+                            ('memoized', predict_model.generate_insights),
+                            ('lookup table', lookup_insights)):
+        function(*rows[0])
+        seconds = min(timeit.repeat(lambda: [function(*row) for row in rows], number=repeats, repeat=3))
+        print(f"{label:<18} {seconds / (repeats * len(rows)) * 1e9:7.0f} ns/call  "
+              f"{retained_per_call(function, rows):6.0f} bytes retained/call")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
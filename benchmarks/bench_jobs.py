@@ -0,0 +1,75 @@
+"""
+Benchmark: what a client waits for when scoring a large batch, synchronously
+(score plus CSV, as one request) versus queued as a job (the enqueue only),
+and the worker's throughput at several chunk sizes.
+
+The queue lives in an on-disk SQLite database so chunk commits pay the
+real fsync cost.
+
+Run from the repository root:
+    python benchmarks/bench_jobs.py [cities] [chunk_size ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from flask import Flask
+
+from models import db
+from jobs import enqueue_job, iter_job_result, run_pending_jobs, Job
+from predict_model import predict_risk_batch
+from reports import iter_csv
+
+
+def make_columns(cities):
+    rng = np.random.default_rng(0)
+    return {
+        'city': [f'City {i}' for i in range(cities)],
+        'population': rng.integers(1000, 10000000, cities).tolist(),
+        'temperature_increase': np.round(rng.uniform(0.1, 5.0, cities), 1).tolist(),
+        'urban_density': rng.choice(['low', 'medium', 'high'], cities).tolist(),
+        'infrastructure': rng.choice(['new', 'moderate', 'aging'], cities).tolist()
+    }
+
+
+def synchronous(columns):
+    result = predict_risk_batch(columns)
+    rows = zip(*columns.values(), result['risk_score'].tolist(), result['risk_level'].tolist())
+    return ''.join(iter_csv(rows))
+
+
+def main(cities=100000, *chunk_sizes):
+    chunk_sizes = chunk_sizes or (500, 1000, 5000)
+    columns = make_columns(cities)
+
+    with tempfile.TemporaryDirectory() as directory:
+        bench_app = Flask(__name__)
+        bench_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'bench.db')
+        db.init_app(bench_app)
+        with bench_app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            synchronous(columns)
+            print(f"{cities:,} cities")
+            print(f"synchronous request:  {(time.perf_counter() - start) * 1e3:8.1f} ms until the response")
+
+            for chunk_size in chunk_sizes:
+                start = time.perf_counter()
+                job = enqueue_job(columns)
+                enqueued = time.perf_counter() - start
+                start = time.perf_counter()
+                run_pending_jobs(chunk_size)
+                ran = time.perf_counter() - start
+                size = sum(len(text) for text in iter_job_result(db.session.get(Job, job.id)))
+                print(f"job, chunks of {chunk_size:5d}: {enqueued * 1e3:8.1f} ms until 202, worker {ran:6.2f} s "
+                      f"({cities / ran:9,.0f} cities/s, {size / 1e6:.1f} MB result)")
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,68 @@
+"""
+Benchmark: fused encode+scale+score over column batches with the model
+artifact, showing that preprocessing is a small share of the cost next
+to the trees, compared with per-row DataFrame scoring.
+
+Run from the repository root:
+    python benchmarks/bench_model_artifact.py [rows]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from model_artifact import ModelArtifact, MODEL_ARTIFACT_PATH, DENSITY_LEVELS, INFRASTRUCTURE_LEVELS
+
+
+def per_row_dataframe(artifact, columns, rows):
+    """Score the first `rows` cities one DataFrame at a time"""
+    for i in range(rows):
+        frame = pd.DataFrame([{
+            'population': columns[0][i],
+            'temperature_increase': columns[1][i],
+            'urban_density': DENSITY_LEVELS.index(columns[2][i]),
+            'infrastructure_age': INFRASTRUCTURE_LEVELS.index(columns[3][i])
+        }])
+        artifact.forest.predict_proba((frame.to_numpy(dtype=float) - artifact.mean) / artifact.scale)
+
+
+def main(rows=100000):
+    artifact = ModelArtifact.load(MODEL_ARTIFACT_PATH)
+    rng = np.random.default_rng(0)
+    columns = (
+        rng.integers(1000, 10000000, rows),
+        rng.uniform(0.1, 5.0, rows),
+        rng.choice(list(DENSITY_LEVELS), rows),
+        rng.choice(list(INFRASTRUCTURE_LEVELS), rows)
+    )
+
+    start = time.perf_counter()
+    features = artifact.transform(*columns)
+    transform_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    artifact.forest.predict_proba(features)
+    forest_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    artifact.predict_proba(*columns)
+    fused_s = time.perf_counter() - start
+
+    sample = 500
+    start = time.perf_counter()
+    per_row_dataframe(artifact, columns, sample)
+    per_row_s = (time.perf_counter() - start) / sample * rows
+
+    print(f"rows: {rows}")
+    print(f"encode+scale:        {transform_s * 1000:9.1f} ms ({transform_s / fused_s:.1%} of fused)")
+    print(f"forest:              {forest_s * 1000:9.1f} ms")
+    print(f"fused total:         {fused_s * 1000:9.1f} ms ({rows / fused_s:,.0f} rows/s)")
+    print(f"per-row DataFrame:   {per_row_s * 1000:9.1f} ms (extrapolated from {sample} rows)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,72 @@
+"""
+Benchmark: what a /predict page costs with its plots inlined as base64
+data URIs (how plots were sent before they became separate resources)
+versus linked as binary images, and the size and render time of every
+plot variant the plot route serves.
+
+Run from the repository root:
+    python benchmarks/bench_plot_formats.py [renders]
+"""
+import base64
+import gzip
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app, _plot_serializer
+from predict_model import PLOT_KINDS, render_plot, warm_plot_renderer
+
+FORM = {'city': 'Bench', 'population': 750000, 'temperature_increase': 2.0, 'urban_density': 'high',
+        'infrastructure': 'aging'}
+VARIANTS = (('png', None), ('png', 72), ('png', 50), ('webp', None), ('webp', 50), ('svg', None))
+
+
+def predict_page(client):
+    return client.post('/predict', data=FORM).get_data(as_text=True)
+
+
+def inline_page(client):
+    # The page plus each plot rendered, base64-encoded and embedded as a data URI
+    page = predict_page(client)
+    plot_params = _plot_serializer().loads(re.search(r'/predict/([^/"]+)/plot/', page).group(1))
+    for kind in PLOT_KINDS:
+        image = base64.b64encode(render_plot(kind, plot_params)).decode('utf-8')
+        page = page.replace(f'/plot/{kind}.png"', f'/plot/{kind}.png" data-inline="data:image/png;base64,{image}"')
+    return page
+
+
+def peak_memory(function, *args):
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(renders=5):
+    app.config['WTF_CSRF_ENABLED'] = False
+    client = app.test_client()
+    warm_plot_renderer()
+
+    linked, inline = predict_page(client), inline_page(client)
+    print(f"/predict HTML: inline base64 plots {len(inline):8,d} bytes ({len(gzip.compress(inline.encode())):7,d} "
+          f"gzip)   linked plots {len(linked):7,d} bytes ({len(gzip.compress(linked.encode())):6,d} gzip)")
+    print(f"/predict peak memory: inline {peak_memory(inline_page, client) / 2**20:6.2f} MiB   "
+          f"linked {peak_memory(predict_page, client) / 2**20:6.2f} MiB")
+
+    plot_params = _plot_serializer().loads(re.search(r'/predict/([^/"]+)/plot/', linked).group(1))
+    for image_format, dpi in VARIANTS:
+        start = time.perf_counter()
+        for _ in range(renders):
+            image = render_plot('risk', plot_params, image_format, dpi)
+        milliseconds = (time.perf_counter() - start) / renders * 1e3
+        print(f"risk plot {image_format:4s} dpi {dpi or 'default':>7}: {len(image):7,d} bytes "
+              f"({len(gzip.compress(image)):7,d} gzip)  {milliseconds:6.1f} ms per render")
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
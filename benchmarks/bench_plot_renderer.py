@@ -0,0 +1,99 @@
+"""
+Benchmark: per-plot cost of the pyplot state machine versus the reusable
+PlotRenderer used by predict_model.
+
+Run from the repository root:
+    python benchmarks/bench_plot_renderer.py [iterations]
+"""
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from plot_renderer import PlotRenderer
+from predict_model import PROJECTION_YEARS, project_rainfall, project_risk
+
+
+def pyplot_risk_plot(risk_values):
+    """The original pyplot implementation of the risk plot"""
+    plt.figure(figsize=(10, 6))
+    colors = ['#dc3545' if r >= 70 else '#ffc107' if r >= 40 else '#198754' for r in risk_values]
+    plt.bar(PROJECTION_YEARS, risk_values, color=colors, alpha=0.7)
+    plt.axhline(y=70, color='#dc3545', linestyle='--', alpha=0.7, label='High Risk Threshold')
+    plt.axhline(y=40, color='#ffc107', linestyle='--', alpha=0.7, label='Medium Risk Threshold')
+    plt.title('Climate Risk Projection (2023-2030)', fontsize=14)
+    plt.xlabel('Year', fontsize=12)
+    plt.ylabel('Risk Score (%)', fontsize=12)
+    plt.ylim(0, 100)
+    plt.grid(True, linestyle='--', alpha=0.7, axis='y')
+    plt.legend()
+    plt.tight_layout()
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png')
+    plt.close()
+    return buffer.getvalue()
+
+
+def pyplot_rainfall_plot(rainfall_data):
+    """The original pyplot implementation of the rainfall plot"""
+    plt.figure(figsize=(10, 6))
+    plt.bar(PROJECTION_YEARS, rainfall_data, color='#0d6efd', alpha=0.7)
+    steps = range(len(PROJECTION_YEARS))
+    p = np.poly1d(np.polyfit(steps, rainfall_data, 1))
+    plt.plot(PROJECTION_YEARS, p(steps), '--', color='#0d6efd', linewidth=2)
+    plt.title('Annual Rainfall Projection (2023-2030)', fontsize=14)
+    plt.xlabel('Year', fontsize=12)
+    plt.ylabel('Rainfall (mm)', fontsize=12)
+    plt.grid(True, linestyle='--', alpha=0.7, axis='y')
+    plt.tight_layout()
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png')
+    plt.close()
+    return buffer.getvalue()
+
+
+def time_per_call(func, inputs):
+    start = time.perf_counter()
+    for data in inputs:
+        func(data)
+    return (time.perf_counter() - start) / len(inputs) * 1000
+
+
+def main(iterations=50):
+    risk_inputs = [project_risk(45 + i % 30, 'high', 'aging', seed=i) for i in range(iterations)]
+    rainfall_inputs = [project_rainfall(0.5 + (i % 40) / 10, seed=i) for i in range(iterations)]
+    renderer = PlotRenderer(PROJECTION_YEARS)
+
+    # Warm up both paths so font caches are loaded before timing
+    pyplot_risk_plot(risk_inputs[0])
+    renderer.render_risk(risk_inputs[0])
+    renderer.render_rainfall(rainfall_inputs[0])
+
+    print(f"{'plot':<10}{'pyplot ms':>12}{'renderer ms':>14}{'speedup':>10}")
+    for name, legacy, current, inputs in (
+        ('risk', pyplot_risk_plot, renderer.render_risk, risk_inputs),
+        ('rainfall', pyplot_rainfall_plot, renderer.render_rainfall, rainfall_inputs),
+    ):
+        legacy_ms = time_per_call(legacy, inputs)
+        current_ms = time_per_call(current, inputs)
+        print(f"{name:<10}{legacy_ms:>12.2f}{current_ms:>14.2f}{legacy_ms / current_ms:>9.1f}x")
+
+    # Concurrent use from several threads sharing one renderer
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        images = list(executor.map(renderer.render_risk, risk_inputs))
+    elapsed = time.perf_counter() - start
+    assert all(image.startswith(b'\x89PNG') for image in images)
+    print(f"threaded  {len(images)} risk plots on 4 threads in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
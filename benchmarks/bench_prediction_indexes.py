@@ -0,0 +1,105 @@
+"""
+Benchmark: the latest-prediction lookup used by download_report on large
+prediction tables, with and without the (user_id, city, date DESC) index.
+
+For each table size the SQLite query plan is printed and the lookup is
+timed. With the index the plan is a single index search and the time stays
+flat as the table grows; without it every lookup scans the table.
+
+Run from the repository root:
+    python benchmarks/bench_prediction_indexes.py [rows ...]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from flask import Flask
+from sqlalchemy import text
+
+from models import db, User, Prediction
+
+USERS = 1000
+CITIES = 500
+SEED_BATCH = 50000
+LOOKUPS = 200
+
+
+def seed(rows):
+    db.create_all()
+    db.session.execute(User.__table__.insert(), [
+        {'id': i + 1, 'name': f'User {i}', 'email': f'user{i}@example.com', 'password': '-'} for i in range(USERS)
+    ])
+    rng = np.random.default_rng(0)
+    start = datetime(2020, 1, 1)
+    for offset in range(0, rows, SEED_BATCH):
+        count = min(SEED_BATCH, rows - offset)
+        users = rng.integers(1, USERS + 1, count).tolist()
+        cities = rng.integers(0, CITIES, count).tolist()
+        minutes = rng.integers(0, 60 * 24 * 365 * 4, count).tolist()
+        db.session.execute(Prediction.__table__.insert(), [
+            {'user_id': user, 'city': f'City {city}', 'population': 500000, 'temperature_increase': 1.5,
+             'urban_density': 'medium', 'infrastructure': 'moderate', 'risk_level': 'medium', 'risk_score': 55.0,
+             'date': start + timedelta(minutes=minute)}
+            for user, city, minute in zip(users, cities, minutes)
+        ])
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+
+
+def latest_prediction(user_id, city):
+    # The query download_report runs
+    return Prediction.query.filter_by(user_id=user_id, city=city).order_by(Prediction.date.desc()).first()
+
+
+def query_plan(user_id, city):
+    query = Prediction.query.filter_by(user_id=user_id, city=city).order_by(Prediction.date.desc()).limit(1)
+    statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    return [row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {statement}'))]
+
+
+def time_lookups():
+    rng = np.random.default_rng(1)
+    keys = [(int(user), f'City {city}') for user, city in
+            zip(rng.integers(1, USERS + 1, LOOKUPS), rng.integers(0, CITIES, LOOKUPS))]
+    start = time.perf_counter()
+    for user_id, city in keys:
+        latest_prediction(user_id, city)
+    return (time.perf_counter() - start) / LOOKUPS
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as directory:
+        bench_app = Flask(__name__)
+        bench_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'bench.db')
+        db.init_app(bench_app)
+        with bench_app.app_context():
+            seed(rows)
+            indexed_plan = query_plan(1, 'City 1')
+            indexed = time_lookups()
+
+            db.session.remove()
+            for index in Prediction.__table__.indexes:
+                index.drop(db.engine)
+            # Prepared statements cached by the pooled connections predate the drop
+            db.engine.dispose()
+            scan_plan = query_plan(1, 'City 1')
+            scan = time_lookups()
+            db.session.remove()
+
+    print(f"rows: {rows:,}")
+    print(f"  indexed: {indexed * 1e3:9.3f} ms/lookup  plan: {'; '.join(indexed_plan)}")
+    print(f"  no index: {scan * 1e3:8.3f} ms/lookup  plan: {'; '.join(scan_plan)}")
+
+
+def main(sizes=(10000, 100000, 1000000)):
+    for rows in sizes:
+        run(rows)
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or (10000, 100000, 1000000))
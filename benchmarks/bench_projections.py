@@ -0,0 +1,54 @@
+"""
+Benchmark: projecting yearly temperature, rainfall and risk for a batch of
+cities with the vectorized engine, versus one project_city call per city.
+
+Run from the repository root:
+    python benchmarks/bench_projections.py [cities]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from projections import project, project_city
+
+
+def main(cities=10000):
+    rng = np.random.default_rng(0)
+    columns = (
+        rng.uniform(0.1, 5.0, cities),
+        rng.uniform(20, 100, cities),
+        rng.choice(['low', 'medium', 'high'], cities),
+        rng.choice(['new', 'moderate', 'aging'], cities)
+    )
+    seeds = rng.integers(0, 2**31 - 1, cities)
+
+    start = time.perf_counter()
+    project(*columns)
+    trend_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    project(*columns, seeds=int(seeds[0]))
+    batch_seed_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    project(*columns, seeds=seeds)
+    city_seeds_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in zip(*columns, seeds):
+        project_city(*row)
+    loop_s = time.perf_counter() - start
+
+    print(f"cities: {cities:,}")
+    print(f"engine, smooth trend:     {trend_s * 1e3:9.2f} ms")
+    print(f"engine, one batch seed:   {batch_seed_s * 1e3:9.2f} ms")
+    print(f"engine, per-city seeds:   {city_seeds_s * 1e3:9.2f} ms")
+    print(f"project_city per city:    {loop_s * 1e3:9.2f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,79 @@
+"""
+Load test: latency of a request that needs no plot (/api/climate-data)
+while other threads of the same worker keep requesting uncached plots,
+with plots rendered in the request threads versus in the render pool.
+
+Run from the repository root:
+    python benchmarks/bench_render_pool.py [plot_threads] [page_requests] [processes]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+import app as app_module
+from plot_cache import PlotCache
+from predict_model import predict_climate_risk
+from render_pool import RenderPool, RenderPoolSaturated
+
+
+def plot_load(plot_params, stop, counts):
+    client = app_module.app.test_client()
+    serializer = app_module._plot_serializer()
+    seed = threading.get_ident() % 100000 * 100000
+    while not stop.is_set():
+        seed += 1
+        # A new seed per request, so every plot is a cache miss
+        plot_id = serializer.dumps(dict(plot_params, seed=seed))
+        status = client.get(f'/predict/{plot_id}/plot/risk.png').status_code
+        counts[status] = counts.get(status, 0) + 1
+
+
+def run(label, pool, plot_threads, page_requests):
+    app_module.render_pool = pool
+    app_module.plot_cache = PlotCache(max_bytes=0)
+    plot_params = predict_climate_risk('Bench', 750000, 2.0, 'high', 'aging')['plot_params']
+    client = app_module.app.test_client()
+    # Warm up the page and (for the pool) the renderer processes
+    client.get('/api/climate-data')
+    try:
+        pool.render('risk', plot_params)
+    except RenderPoolSaturated:
+        pass
+
+    stop, counts = threading.Event(), {}
+    threads = [threading.Thread(target=plot_load, args=(plot_params, stop, counts)) for _ in range(plot_threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(page_requests):
+        request_start = time.perf_counter()
+        client.get('/api/climate-data')
+        latencies.append(time.perf_counter() - request_start)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+    pool.shutdown()
+
+    p50, p95 = np.percentile(latencies, (50, 95)) * 1e3
+    print(f"{label:<22} page p50 {p50:7.2f} ms  p95 {p95:7.2f} ms  "
+          f"plots {counts.get(200, 0) / elapsed:6.1f}/s  503s {counts.get(503, 0)}")
+
+
+def main(plot_threads=4, page_requests=200, processes=2):
+    print(f"{plot_threads} threads requesting plots, {page_requests} page requests ({os.cpu_count()} CPUs)")
+    run('in request thread', RenderPool(processes=0), plot_threads, page_requests)
+    run(f'pool of {processes} processes', RenderPool(processes=processes, max_queue=2 * plot_threads, timeout=30),
+        plot_threads, page_requests)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,63 @@
+"""
+Benchmark: streaming the prediction history export from a large table.
+
+Seeds a throwaway SQLite database and reports export throughput and the
+peak Python memory allocated while streaming, which should stay flat as
+the row count grows.
+
+Run from the repository root:
+    python benchmarks/bench_report_export.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from models import db, User, Prediction
+from reports import export_rows, iter_csv, prediction_rows_query
+
+
+def seed(rows):
+    db.create_all()
+    user = User(name='Bench', email='bench@example.com', password='-')
+    db.session.add(user)
+    db.session.commit()
+    start = datetime(2024, 1, 1)
+    db.session.execute(Prediction.__table__.insert(), [
+        {'user_id': user.id, 'city': f'City {i % 500}', 'population': 1000 + i, 'temperature_increase': 1.5,
+         'urban_density': 'medium', 'infrastructure': 'moderate', 'risk_level': 'medium', 'risk_score': 55.0,
+         'date': start + timedelta(minutes=i)}
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def main(rows=200000):
+    with tempfile.TemporaryDirectory() as directory:
+        bench_app = Flask(__name__)
+        bench_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'bench.db')
+        db.init_app(bench_app)
+        with bench_app.app_context():
+            seed(rows)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            size = sum(len(chunk) for chunk in iter_csv(export_rows(prediction_rows_query())))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            db.session.remove()
+
+    print(f"rows: {rows}")
+    print(f"export: {elapsed:8.3f} s ({rows / elapsed:,.0f} rows/s, {size / 1e6:.1f} MB of CSV)")
+    print(f"peak traced memory while streaming: {peak / 1e6:.2f} MB")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
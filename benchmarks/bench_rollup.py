@@ -0,0 +1,101 @@
+"""
+Benchmark: per-city summaries aggregated from the raw prediction table
+versus read from the incrementally maintained rollup table, and what
+maintaining the rollup adds to bulk inserts.
+
+Run from the repository root:
+    python benchmarks/bench_rollup.py [predictions] [cities]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from flask import Flask
+from sqlalchemy import func, insert, select
+
+from models import db, User, Prediction
+import ingest
+from rollup import city_summaries, rebuild_rollups
+
+
+def make_mappings(rows, cities, user_ids):
+    rng = np.random.default_rng(0)
+    scores = rng.uniform(20, 100, rows).tolist()
+    start = datetime(2024, 1, 1)
+    return [
+        {'user_id': user_ids[i % len(user_ids)], 'city': f'City {i % cities}', 'population': 500000,
+         'temperature_increase': 1.5, 'urban_density': 'medium', 'infrastructure': 'moderate',
+         'risk_level': 'high' if score >= 70 else 'medium' if score >= 40 else 'low',
+         'risk_score': score, 'date': start + timedelta(minutes=i)}
+        for i, score in enumerate(scores)
+    ]
+
+
+def raw_summaries():
+    # What the summary costs without the rollup: a full scan per request
+    score = Prediction.risk_score
+    return db.session.execute(
+        select(Prediction.city, func.count(), func.avg(score), func.min(score), func.max(score),
+               func.max(Prediction.date))
+        .group_by(Prediction.city)
+    ).all()
+
+
+def best_of(function, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def plain_insert(mappings, batch_size=ingest.INGEST_BATCH_SIZE):
+    for offset in range(0, len(mappings), batch_size):
+        db.session.execute(insert(Prediction), mappings[offset:offset + batch_size])
+        db.session.commit()
+
+
+def main(rows=200000, cities=200):
+    with tempfile.TemporaryDirectory() as directory:
+        bench_app = Flask(__name__)
+        bench_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(directory, 'bench.db')
+        db.init_app(bench_app)
+        with bench_app.app_context():
+            db.create_all()
+            users = [User(name=f'User {i}', email=f'user{i}@example.com', password='-') for i in range(10)]
+            db.session.add_all(users)
+            db.session.commit()
+            mappings = make_mappings(rows, cities, [user.id for user in users])
+
+            start = time.perf_counter()
+            plain_insert(mappings)
+            plain_s = time.perf_counter() - start
+            db.session.execute(db.delete(Prediction))
+            db.session.commit()
+            start = time.perf_counter()
+            ingest.insert_predictions(mappings)
+            rollup_s = time.perf_counter() - start
+            start = time.perf_counter()
+            rebuilt = rebuild_rollups()
+            rebuild_s = time.perf_counter() - start
+
+            print(f"{rows:,} predictions, {cities} cities, {len(users)} users -> {rebuilt:,} rollup rows")
+            print(f"bulk insert:              {rows / plain_s:10,.0f} rows/s")
+            print(f"bulk insert + rollups:    {rows / rollup_s:10,.0f} rows/s")
+            print(f"rebuild-rollups:          {rebuild_s * 1e3:10.1f} ms")
+            raw_s = best_of(raw_summaries)
+            table_s = best_of(city_summaries)
+            print(f"summaries from raw rows:  {raw_s * 1e3:10.2f} ms")
+            print(f"summaries from rollups:   {table_s * 1e3:10.2f} ms ({raw_s / table_s:.0f}x faster)")
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,49 @@
+"""
+Benchmark: scoring one city plus generating its insights with the rule
+chain (rule_based_prediction, risk_level_from_score, generate_insights)
+versus the precomputed lookup tables (score_table.lookup_prediction).
+
+Run from the repository root:
+    python benchmarks/bench_score_table.py [calls]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from predict_model import generate_insights, risk_level_from_score, rule_based_prediction
+from score_table import lookup_prediction
+
+
+def rule_chain(population, temperature_increase, urban_density, infrastructure):
+    risk_score = rule_based_prediction(population, temperature_increase, urban_density, infrastructure)
+    risk_level = risk_level_from_score(risk_score)
+    risk_factors, recommendations = generate_insights(temperature_increase, urban_density, infrastructure, risk_level)
+    return risk_score, risk_level, risk_factors, recommendations
+
+
+def main(calls=200000):
+    rng = np.random.default_rng(0)
+    rows = list(zip(
+        rng.integers(1000, 10000000, 1000).tolist(),
+        np.round(rng.uniform(0.1, 5.0, 1000), 1).tolist(),
+        rng.choice(['low', 'medium', 'high'], 1000).tolist(),
+        rng.choice(['new', 'moderate', 'aging'], 1000).tolist()
+    ))
+    repeats = calls // len(rows)
+
+    def run(function):
+        return min(timeit.repeat(lambda: [function(*row) for row in rows], number=repeats, repeat=3))
+
+    chain_s = run(rule_chain)
+    table_s = run(lookup_prediction)
+    print(f"calls: {repeats * len(rows):,}")
+    print(f"rule chain:    {chain_s / (repeats * len(rows)) * 1e9:8.0f} ns/call")
+    print(f"lookup tables: {table_s / (repeats * len(rows)) * 1e9:8.0f} ns/call ({chain_s / table_s:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
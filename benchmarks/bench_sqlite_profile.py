@@ -0,0 +1,127 @@
+"""
+Load test: concurrent writes from several worker processes, like gunicorn
+workers committing /predict and /contact rows, under each SQLite profile.
+
+Every process runs a few threads; each commits one row per transaction
+while another thread keeps reading, and the run reports the aggregate
+commit throughput and how many commits failed with "database is locked".
+
+Run from the repository root:
+    python benchmarks/bench_sqlite_profile.py [processes] [threads] [commits_per_thread]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from sqlalchemy import func, text
+from sqlalchemy.exc import OperationalError
+
+from models import db, User, Contact, Prediction
+from sqlite_profile import SQLITE_PROFILES, engine_options, install_pragmas
+
+
+def make_app(path, profile):
+    bench_app = Flask(__name__)
+    bench_app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + path
+    bench_app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(profile)
+    db.init_app(bench_app)
+    with bench_app.app_context():
+        install_pragmas(db.engine, profile)
+    return bench_app
+
+
+def writer(bench_app, commits, failures):
+    with bench_app.app_context():
+        for i in range(commits):
+            # Alternate the two single-row commits the app makes
+            if i % 2:
+                row = Prediction(user_id=1, city=f'City {i}', population=500000, temperature_increase=1.5,
+                                 urban_density='medium', infrastructure='moderate', risk_level='medium',
+                                 risk_score=55.0)
+            else:
+                row = Contact(name='Bench', email='bench@example.com', message='Hello')
+            try:
+                db.session.add(row)
+                db.session.commit()
+            except OperationalError:
+                db.session.rollback()
+                failures.append(1)
+        db.session.remove()
+
+
+def reader(bench_app, stop):
+    with bench_app.app_context():
+        while not stop.is_set():
+            db.session.execute(text('SELECT count(*) FROM prediction WHERE city = :city'), {'city': 'City 1'})
+            db.session.commit()
+        db.session.remove()
+
+
+def worker(path, profile, threads, commits, ready, start, results):
+    bench_app = make_app(path, profile)
+    failures = []
+    # Time only the load, not process start-up
+    ready.put(None)
+    start.wait()
+    stop = threading.Event()
+    read_thread = threading.Thread(target=reader, args=(bench_app, stop))
+    read_thread.start()
+    write_threads = [threading.Thread(target=writer, args=(bench_app, commits, failures)) for _ in range(threads)]
+    for thread in write_threads:
+        thread.start()
+    for thread in write_threads:
+        thread.join()
+    stop.set()
+    read_thread.join()
+    results.put(len(failures))
+
+
+def run(profile, processes, threads, commits):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        bench_app = make_app(path, profile)
+        with bench_app.app_context():
+            db.create_all()
+            db.session.add(User(id=1, name='Bench', email='bench@example.com', password='-'))
+            db.session.commit()
+            db.session.remove()
+            db.engine.dispose()
+
+        ready, results, go = multiprocessing.Queue(), multiprocessing.Queue(), multiprocessing.Event()
+        workers = [multiprocessing.Process(target=worker, args=(path, profile, threads, commits, ready, go, results))
+                   for _ in range(processes)]
+        for process in workers:
+            process.start()
+        for _ in workers:
+            ready.get()
+        start = time.perf_counter()
+        go.set()
+        failures = sum(results.get() for _ in workers)
+        for process in workers:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        with bench_app.app_context():
+            stored = (db.session.scalar(db.select(func.count()).select_from(Prediction))
+                      + db.session.scalar(db.select(func.count()).select_from(Contact)))
+            db.session.remove()
+            db.engine.dispose()
+
+    print(f"{profile:<12} {stored:7d} commits in {elapsed:7.2f} s  {stored / elapsed:9,.0f} commits/s  "
+          f"{failures} locked")
+
+
+def main(processes=4, threads=4, commits=200):
+    print(f"{processes} processes x {threads} writer threads x {commits} commits, one reader thread per process")
+    for profile in SQLITE_PROFILES:
+        run(profile, processes, threads, commits)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,61 @@
+"""
+Benchmark: cold-start import cost of the app for workers and for the
+test suite, measured with `python -X importtime`.
+
+Exits non-zero when the best of several runs is over budget, so it can
+guard the cold-start budget in CI.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [budget_ms]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Modules that should only be imported on first use of plotting/scoring
+HEAVY_MODULES = ('numpy', 'matplotlib', 'sklearn', 'pandas')
+
+# What a gunicorn worker imports, and what the login tests import
+TARGETS = {
+    'worker (import app)': 'app',
+    'tests (import tests.test_login)': 'tests.test_login',
+}
+
+
+def import_profile(module):
+    """Run one cold `import module` and return {module name: cumulative microseconds}."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def main(budget_ms=1000.0, runs=5):
+    over_budget = False
+    for label, module in TARGETS.items():
+        profiles = [import_profile(module) for _ in range(runs)]
+        best = min(profiles, key=lambda profile: profile[module])
+        total_ms = best[module] / 1000
+        heavy = [name for name in HEAVY_MODULES if name in best]
+
+        print(f"{label}: {total_ms:.0f} ms (best of {runs}, budget {budget_ms:.0f} ms)")
+        top_level = sorted(((us, name) for name, us in best.items() if '.' not in name and name != module), reverse=True)
+        for us, name in top_level[:5]:
+            print(f"    {name:<24}{us / 1000:8.1f} ms")
+        if heavy:
+            print(f"    heavy modules imported eagerly: {', '.join(heavy)}")
+        over_budget = over_budget or total_ms > budget_ms or bool(heavy)
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else 1000.0))
@@ -0,0 +1,38 @@
+"""
+Benchmark: scoring one city over a temperature grid with a single sweep()
+call versus one predict_climate_risk() call per grid point (what a planner
+sliding the /predict form amounts to, without the model or any chart rendering).
+
+Run from the repository root:
+    python benchmarks/bench_sweep.py [populations] [step]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from predict_model import predict_climate_risk
+from sweep import sweep, temperature_grid
+
+
+def per_point(populations, temperatures):
+    return [predict_climate_risk('Bench', population, temperature, 'high', 'aging', use_model=False)
+            for population in populations for temperature in temperatures]
+
+
+def main(n_populations=10, step=0.01):
+    populations = [250000 * (i + 1) for i in range(n_populations)]
+    temperatures = temperature_grid(0.1, 5.0, step)
+    temperature_list = temperatures.tolist()
+    points = len(populations) * len(temperatures)
+
+    per_point_s = min(timeit.repeat(lambda: per_point(populations, temperature_list), number=1, repeat=3))
+    sweep_s = min(timeit.repeat(lambda: sweep(populations, 'high', 'aging', temperatures), number=1, repeat=3))
+    print(f"points: {points:,} ({len(populations)} populations x {len(temperatures)} temperatures)")
+    print(f"per-point predict_climate_risk: {per_point_s * 1e3:8.2f} ms")
+    print(f"one sweep() call:               {sweep_s * 1e3:8.2f} ms ({per_point_s / sweep_s:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10, float(sys.argv[2]) if len(sys.argv) > 2 else 0.01)
@@ -0,0 +1,60 @@
+"""
+Benchmark: Monte Carlo bands for a batch of cities, as samples per second,
+in process and across a process pool, against drawing the same scenarios
+one project_city() call at a time (the one-sample-per-call plot jitter).
+
+Run from the repository root:
+    python benchmarks/bench_uncertainty.py [cities] [samples] [processes]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from projections import project_city
+from uncertainty import simulate
+
+
+def looped(columns, samples):
+    # One jittered series per call, percentiles taken at the end
+    for temperature_increase, risk_score, urban_density, infrastructure in zip(*columns):
+        series = [project_city(temperature_increase, risk_score, urban_density, infrastructure, seed)
+                  for seed in range(samples)]
+        np.percentile([s['rainfall'] for s in series], (5, 50, 95), axis=0)
+        np.percentile([s['risk'] for s in series], (5, 50, 95), axis=0)
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main(cities=2000, samples=1000, processes=os.cpu_count()):
+    rng = np.random.default_rng(0)
+    columns = (
+        rng.uniform(0.1, 5.0, cities),
+        rng.uniform(20, 100, cities),
+        rng.choice(['low', 'medium', 'high'], cities),
+        rng.choice(['new', 'moderate', 'aging'], cities)
+    )
+    total = cities * samples
+    print(f"{cities:,} cities x {samples:,} samples ({os.cpu_count()} CPUs)")
+
+    loop_cities = max(1, cities // 100)
+    loop_s = timed(lambda: looped([column[:loop_cities] for column in columns], samples))
+    print(f"per-sample project_city:     {loop_cities * samples / loop_s:12,.0f} samples/s "
+          f"(on {loop_cities} cities)")
+
+    serial_s = timed(lambda: simulate(*columns, samples=samples, seed=0))
+    print(f"simulate, in process:        {total / serial_s:12,.0f} samples/s ({serial_s:.2f} s)")
+    if processes > 1:
+        pooled_s = timed(lambda: simulate(*columns, samples=samples, seed=0, processes=processes))
+        print(f"simulate, {processes} processes:       {total / pooled_s:12,.0f} samples/s ({pooled_s:.2f} s)")
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,197 @@
+import io
+import struct
+import zipfile
+import numpy as np
+
+# Rows evaluated together; bounds the (rows x trees) node index matrix
+CHUNK_SIZE = 256
+
+
+class CompiledForest:
+    """
+    A tree ensemble flattened into contiguous NumPy arrays.
+
+    All trees share one set of node arrays; roots holds the index of each
+    tree's root node. Leaves point back to themselves with an infinite
+    threshold, so every row can be walked for max_depth steps without
+    checking which rows have already reached a leaf.
+    """
+
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self._children_cache = None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted RandomForestClassifier (or any forest of DecisionTreeClassifiers)."""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            # Normalize so leaf values are class probabilities whatever the sklearn version stores
+            value = tree.value[:, 0, :]
+            values.append(value / value.sum(axis=1, keepdims=True))
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth
+        )
+
+    def to_arrays(self):
+        """The node arrays (plus max_depth) keyed by name, ready for np.savez."""
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        arrays['max_depth'] = np.int64(self.max_depth)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild a forest from to_arrays() output (or a mapping loaded from it)."""
+        return cls(max_depth=int(arrays['max_depth']), **{name: arrays[name] for name in cls.ARRAYS})
+
+    def save(self, path):
+        """Write the arrays to an uncompressed .npz so they can be memory-mapped."""
+        np.savez(path, **self.to_arrays())
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load arrays from save(); with mmap the pages are shared by every process mapping the file."""
+        return cls.from_arrays(load_npz(path, mmap))
+
+    def _children(self):
+        # Left and right child interleaved so a step is one gather: children[2 * node + go_right]
+        if self._children_cache is None:
+            children = np.empty(2 * len(self.left), dtype=np.intp)
+            children[0::2] = self.left
+            children[1::2] = self.right
+            self._children_cache = children
+        return self._children_cache
+
+    def _walk(self, X):
+        """Yield (nodes, next_nodes) index matrices of shape (rows, trees) for each traversal step."""
+        # Trees split on float32 features, exactly like sklearn
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        children = self._children()
+        row_offsets = (np.arange(n_rows) * n_features)[:, None]
+        nodes = np.broadcast_to(np.asarray(self.roots, dtype=np.intp), (n_rows, self.n_trees))
+        for _ in range(self.max_depth):
+            x = np.take(X, row_offsets + np.take(self.feature, nodes))
+            go_right = x > np.take(self.threshold, nodes)
+            next_nodes = np.take(children, 2 * nodes + go_right)
+            yield nodes, next_nodes
+            nodes = next_nodes
+
+    def apply(self, X):
+        """Leaf node index reached in every tree, shape (rows, trees)."""
+        X = np.atleast_2d(X)
+        leaves = np.broadcast_to(np.asarray(self.roots, dtype=np.intp), (len(X), self.n_trees))
+        for _, leaves in self._walk(X):
+            pass
+        return leaves
+
+    def predict_proba(self, X):
+        """Class probabilities averaged over the trees, like RandomForestClassifier.predict_proba."""
+        X = np.atleast_2d(X)
+        proba = np.empty((len(X), self.value.shape[1]))
+        for start in range(0, len(X), CHUNK_SIZE):
+            chunk = X[start:start + CHUNK_SIZE]
+            proba[start:start + len(chunk)] = self.value[self.apply(chunk)].mean(axis=1)
+        return proba
+
+    def predict_contributions(self, X, class_index=1):
+        """
+        Path-based attribution of the class probability to each feature.
+
+        Every split along a row's path moves the node value from parent to
+        child; that change is credited to the split's feature and averaged
+        over the trees.
+
+        Returns:
+            tuple: (bias, contributions) where bias is the forest's mean
+                root value and contributions has shape (rows, features), so
+                bias + contributions.sum(axis=1) == predict_proba(X)[:, class_index]
+        """
+        X = np.atleast_2d(X)
+        n_features = X.shape[1]
+        value = np.ascontiguousarray(self.value[:, class_index])
+        contributions = np.zeros((len(X), n_features))
+        for start in range(0, len(X), CHUNK_SIZE):
+            chunk = X[start:start + CHUNK_SIZE]
+            row_offsets = (np.arange(len(chunk)) * n_features)[:, None]
+            out = np.zeros(len(chunk) * n_features)
+            for nodes, next_nodes in self._walk(chunk):
+                # Leaves loop back to themselves, so finished paths add zero
+                delta = np.take(value, next_nodes) - np.take(value, nodes)
+                slots = row_offsets + np.take(self.feature, nodes)
+                out += np.bincount(slots.ravel(), weights=delta.ravel(), minlength=len(out))
+            contributions[start:start + len(chunk)] = out.reshape(len(chunk), n_features)
+        contributions /= self.n_trees
+        return value[self.roots].mean(), contributions
+
+
+def load_npz(path, mmap=True):
+    """
+    Load every array stored in an .npz file.
+
+    With mmap, arrays are memory-mapped straight out of the (uncompressed)
+    archive instead of being copied into process memory.
+    """
+    if not mmap:
+        with np.load(path) as archive:
+            return dict(archive)
+
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-len('.npy')]
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: '{name}' is compressed and cannot be memory-mapped")
+
+            # Skip the zip local file header to reach the .npy payload
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_length, extra_length = struct.unpack('<HH', header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            if not shape or 0 in shape:
+                # Scalars and empty arrays cannot be mapped; they are tiny anyway
+                arrays[name] = np.load(io.BytesIO(archive.read(info.filename)))
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                         order='F' if fortran_order else 'C')
+    return arrays
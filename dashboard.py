@@ -0,0 +1,67 @@
+from sqlalchemy import select, tuple_
+from models import db, CityRollup, Contact, Prediction
+from rollup import combine
+
+# Predictions per page of the dashboard's recent-prediction list
+DASHBOARD_PAGE_SIZE = 20
+# Contact messages shown to admins
+DASHBOARD_CONTACTS = 20
+
+
+def prediction_summary(user_id):
+    """
+    Totals and the risk distribution of a user's predictions.
+
+    Combined from the user's CityRollup rows, one per city, so the cost
+    does not grow with the number of predictions.
+
+    Returns:
+        dict: 'count', 'average_risk' and 'last_date' (both None without
+            predictions) and 'risk_counts' (level -> count, for RISK_LEVELS)
+    """
+    summary = combine(db.session.execute(select(CityRollup.__table__).where(CityRollup.user_id == user_id)))
+    return {
+        'count': summary['count'],
+        'average_risk': summary['mean_risk_score'],
+        'last_date': summary['latest_date'],
+        'risk_counts': summary['risk_counts']
+    }
+
+
+def recent_predictions(user_id, before=None, limit=DASHBOARD_PAGE_SIZE):
+    """
+    One page of a user's predictions, newest first.
+
+    Keyset pagination: a page starts after the prediction with id `before`
+    (the last row of the previous page), so every page is an index range
+    scan on ix_prediction_user_id_date_id however deep it is.
+
+    Returns:
+        tuple: (predictions, cursor of the next page or None)
+
+    Raises:
+        ValueError: If before is not one of the user's predictions
+    """
+    query = (
+        select(Prediction)
+        .where(Prediction.user_id == user_id)
+        .order_by(Prediction.date.desc(), Prediction.id.desc())
+        .limit(limit + 1)
+    )
+    if before is not None:
+        anchor = db.session.execute(
+            select(Prediction.date, Prediction.id).where(Prediction.id == before, Prediction.user_id == user_id)
+        ).one_or_none()
+        if anchor is None:
+            raise ValueError(f"Unknown prediction: {before}")
+        query = query.where(tuple_(Prediction.date, Prediction.id) < tuple(anchor))
+
+    predictions = db.session.scalars(query).all()
+    if len(predictions) > limit:
+        return predictions[:limit], predictions[limit - 1].id
+    return predictions, None
+
+
+def recent_contacts(limit=DASHBOARD_CONTACTS):
+    """The newest contact messages."""
+    return db.session.scalars(select(Contact).order_by(Contact.date.desc(), Contact.id.desc()).limit(limit)).all()
@@ -0,0 +1,17 @@
+# Gunicorn configuration: gunicorn -c gunicorn.conf.py app:app
+
+# Import the app (and preload the model) in the master so workers share its pages copy-on-write
+preload_app = True
+
+
+def on_starting(server):
+    from model_serving import preload_model
+    preload_model()
+
+
+def post_worker_init(worker):
+    # No-op when the master preloaded the model; loads it once per worker otherwise
+    from model_serving import get_model_server
+    server = get_model_server()
+    if server.available:
+        server.load()
@@ -0,0 +1,161 @@
+import time
+from datetime import datetime, timezone
+from sqlalchemy import func, insert, select
+from models import db, Prediction
+from rollup import record_predictions
+
+# Rows written per transaction; each commit is one fsync on SQLite
+INGEST_BATCH_SIZE = 5000
+
+
+def prediction_mappings(user_id, columns, result, date=None):
+    """
+    Prediction rows for a scored batch, as dicts ready for an executemany insert.
+
+    Args:
+        user_id (int or sequence): Owner of every row, or one owner per row
+        columns (dict): Input columns including 'city' (see predict_risk_batch)
+        result (dict): predict_risk_batch output for the same columns
+        date (datetime): Timestamp for every row; defaults to now
+
+    Populations are parsed as numbers the way batch_arrays() does (so 1e6
+    and "600000.5" are accepted) and stored rounded to whole people.
+    """
+    date = date or datetime.now(timezone.utc)
+    count = len(result['risk_score'])
+    user_ids = [user_id] * count if isinstance(user_id, int) else list(user_id)
+    return [
+        {
+            'user_id': owner,
+            'city': city,
+            'population': round(float(population)),
+            'temperature_increase': float(temperature_increase),
+            'urban_density': urban_density,
+            'infrastructure': infrastructure,
+            'risk_level': risk_level,
+            'risk_score': float(risk_score),
+            'date': date
+        }
+        for owner, city, population, temperature_increase, urban_density, infrastructure, risk_level, risk_score
+        in zip(user_ids, columns['city'], columns['population'], columns['temperature_increase'],
+               columns['urban_density'], columns['infrastructure'],
+               result['risk_level'].tolist(), result['risk_score'].tolist())
+    ]
+
+
+def insert_predictions(mappings, batch_size=INGEST_BATCH_SIZE, commit_batches=True):
+    """
+    Write Prediction rows with one executemany INSERT and one commit per batch.
+
+    Each batch updates the city rollups in the same transaction. With
+    commit_batches=False every batch is written in one transaction, so an
+    error leaves nothing stored. Either way a failing batch is rolled back.
+
+    Returns:
+        dict: rows, batches, seconds and rows_per_second
+    """
+    start = time.perf_counter()
+    batches = 0
+    try:
+        for offset in range(0, len(mappings), batch_size):
+            batch = mappings[offset:offset + batch_size]
+            db.session.execute(insert(Prediction), batch)
+            record_predictions(batch)
+            if commit_batches:
+                db.session.commit()
+            batches += 1
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    seconds = time.perf_counter() - start
+    return {
+        'rows': len(mappings),
+        'batches': batches,
+        'seconds': seconds,
+        'rows_per_second': len(mappings) / seconds if seconds else 0.0
+    }
+
+
+def score_and_store(user_id, columns, batch_size=INGEST_BATCH_SIZE, use_model=False):
+    """
+    Score a batch of cities and store every result as a Prediction.
+
+    use_model is passed to predict_risk_batch; only the rule-based score
+    and level are stored. The rows are written in batch_size executemany
+    batches of one transaction: the whole batch is stored, or nothing.
+
+    Returns:
+        tuple: (predict_risk_batch result, insert_predictions stats)
+
+    Raises:
+        ValueError: If a column (including 'city') is missing or invalid, or
+            a row lacks a city name
+    """
+    from predict_model import predict_risk_batch
+
+    if 'city' not in columns:
+        raise ValueError("Missing required column: city")
+    # Validates every column, 'city' included
+    result = predict_risk_batch(columns, use_model=use_model)
+    invalid = [str(row) for row, city in enumerate(columns['city']) if not isinstance(city, str) or not city.strip()]
+    if invalid:
+        raise ValueError(f"Missing or invalid city in rows: {', '.join(invalid[:10])}")
+    mappings = prediction_mappings(user_id, columns, result)
+    return result, insert_predictions(mappings, batch_size, commit_batches=False)
+
+
+def latest_predictions_query():
+    """The most recent stored prediction for every (user, city) pair."""
+    latest = (
+        select(Prediction.user_id, Prediction.city, func.max(Prediction.date).label('date'))
+        .group_by(Prediction.user_id, Prediction.city)
+        .subquery()
+    )
+    return (
+        select(Prediction.user_id, Prediction.city, Prediction.population, Prediction.temperature_increase,
+               Prediction.urban_density, Prediction.infrastructure)
+        .join(latest, (Prediction.user_id == latest.c.user_id) & (Prediction.city == latest.c.city)
+              & (Prediction.date == latest.c.date))
+        .order_by(Prediction.user_id, Prediction.city)
+    )
+
+
+def rescore_stored_predictions(batch_size=INGEST_BATCH_SIZE):
+    """
+    Re-score the latest inputs of every stored (user, city) pair with the
+    current model and store the results as new predictions.
+
+    The inputs (one row per pair) are read up front; each batch_size chunk
+    is then scored in one vectorized pass and written in one transaction.
+
+    Returns:
+        dict: insert_predictions stats for the whole run
+    """
+    from predict_model import predict_risk_batch
+
+    start = time.perf_counter()
+    date = datetime.now(timezone.utc)
+    # Read everything before writing, so the new rows cannot join the scan
+    rows = db.session.execute(latest_predictions_query()).all()
+    batches = 0
+    for offset in range(0, len(rows), batch_size):
+        chunk = rows[offset:offset + batch_size]
+        user_ids, cities, populations, temperatures, densities, infrastructures = zip(*chunk)
+        columns = {
+            'city': cities,
+            'population': [population or 0 for population in populations],
+            'temperature_increase': [temperature or 0.0 for temperature in temperatures],
+            'urban_density': densities,
+            'infrastructure': infrastructures
+        }
+        mappings = prediction_mappings(user_ids, columns, predict_risk_batch(columns), date)
+        batches += insert_predictions(mappings, batch_size)['batches']
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows': len(rows),
+        'batches': batches,
+        'seconds': seconds,
+        'rows_per_second': len(rows) / seconds if seconds else 0.0
+    }
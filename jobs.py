@@ -0,0 +1,276 @@
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, func, or_, select, update
+from models import db, Job, JobChunk
+from reports import iter_csv
+
+# Cities scored (and committed, as one progress step) at a time
+JOB_CHUNK_SIZE = 1000
+# Seconds a jobs-worker process sleeps when the queue is empty
+JOB_POLL_INTERVAL = 1.0
+# Seconds a running job's heartbeat may go unrenewed before another worker takes it over
+JOB_LEASE_SECONDS = 300
+# Claims after which a job that keeps losing its worker is failed instead of requeued
+MAX_JOB_ATTEMPTS = 3
+
+JOB_INPUT_COLUMNS = ('city', 'population', 'temperature_increase', 'urban_density', 'infrastructure')
+
+
+def enqueue_job(columns, user_id=None, use_model=False):
+    """
+    Store a batch of cities as a queued Job.
+
+    Args:
+        columns (dict): Input columns as accepted by predict_risk_batch, 'city' optional
+        user_id (int): Owner of the job; None for anonymous jobs
+        use_model (bool): Also store the model's high-risk probability
+
+    Returns:
+        Job: The committed job
+
+    Raises:
+        ValueError: If a column is missing or not a list, the columns differ in
+            length, or a row lacks a finite number or a level name
+    """
+    from predict_model import batch_arrays
+
+    # Rejected now, with a 400, rather than as a failed job later
+    batch_arrays(columns)
+    payload = {column: list(columns[column]) for column in JOB_INPUT_COLUMNS if column in columns}
+
+    job = Job(id=uuid.uuid4().hex, user_id=user_id, status='queued', total=len(payload['population']),
+              processed=0, use_model=use_model, payload=json.dumps(payload))
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def _claimable(cutoff):
+    """Jobs a worker may claim: queued ones, and running ones whose lease expired before cutoff."""
+    return or_(Job.status == 'queued',
+               and_(Job.status == 'running', or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < cutoff)))
+
+
+def claim_job(lease_seconds=JOB_LEASE_SECONDS):
+    """
+    Atomically move the oldest queued job to 'running'.
+
+    The conditional UPDATE lets any number of worker threads and processes
+    share the queue: exactly one of them wins each job. A running job whose
+    worker stopped renewing its heartbeat for lease_seconds (the process
+    died or hung) is claimed again and resumes after its last committed
+    chunk; after MAX_JOB_ATTEMPTS claims it is failed instead.
+
+    Returns:
+        Job: The claimed job, or None when the queue is empty
+    """
+    while True:
+        now = datetime.now(timezone.utc)
+        claimable = _claimable(now - timedelta(seconds=lease_seconds))
+        row = db.session.execute(
+            select(Job.id, Job.attempts).where(claimable).order_by(Job.created, Job.id).limit(1)).first()
+        if row is None:
+            return None
+        job_id, attempts = row
+        if attempts >= MAX_JOB_ATTEMPTS:
+            values = {'status': 'failed', 'finished': now,
+                      'error': f'Abandoned by its worker {attempts} times'}
+        else:
+            values = {'status': 'running', 'started': func.coalesce(Job.started, now), 'heartbeat_at': now,
+                      'attempts': attempts + 1}
+        # The attempts check makes the claim exclusive even when two workers race for an expired lease
+        claimed = db.session.execute(
+            update(Job).where(Job.id == job_id, Job.attempts == attempts, claimable).values(**values)
+        ).rowcount
+        db.session.commit()
+        if claimed and values['status'] == 'running':
+            return db.session.get(Job, job_id)
+
+
+def needs_worker(job, lease_seconds=JOB_LEASE_SECONDS):
+    """Whether claim_job would pick the job up: it is queued, or running on an expired lease."""
+    if job.status == 'queued':
+        return True
+    if job.status != 'running':
+        return False
+    if job.heartbeat_at is None:
+        return True
+    heartbeat = job.heartbeat_at
+    if heartbeat.tzinfo is None:
+        # SQLite hands back the stored UTC times without their timezone
+        heartbeat = heartbeat.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - heartbeat > timedelta(seconds=lease_seconds)
+
+
+def _renew_lease(job, attempt, **values):
+    """
+    Update a running job and its heartbeat if this worker still holds it.
+
+    Returns False when the lease expired and another worker claimed the job
+    since (its attempts moved on); the caller must then drop its work.
+    """
+    return db.session.execute(
+        update(Job).where(Job.id == job.id, Job.attempts == attempt, Job.status == 'running')
+        .values(heartbeat_at=datetime.now(timezone.utc), **values)
+    ).rowcount == 1
+
+
+def result_header(columns, use_model):
+    """CSV header of a job's result for its input columns."""
+    header = [column for column in JOB_INPUT_COLUMNS if column in columns] + ['risk_score', 'risk_level']
+    return header + ['high_risk_probability'] if use_model else header
+
+
+def run_job(job, chunk_size=JOB_CHUNK_SIZE):
+    """
+    Score a claimed job chunk by chunk.
+
+    Every chunk's CSV rows are committed together with the new progress
+    count and a renewed heartbeat, so a polling client never sees progress
+    without its results, and a job taken over after its worker died resumes
+    after the last committed chunk. Errors mark the job 'failed' with the
+    message. A worker that lost its lease stops without writing anything.
+    """
+    from predict_model import predict_risk_batch
+
+    attempt = job.attempts
+    try:
+        columns = json.loads(job.payload)
+        inputs = [column for column in JOB_INPUT_COLUMNS if column in columns]
+        position, offset = job.chunks.count(), job.processed
+        while offset < job.total:
+            chunk = {column: columns[column][offset:offset + chunk_size] for column in inputs}
+            result = predict_risk_batch(chunk, use_model=job.use_model)
+            outputs = [result['risk_score'].tolist(), result['risk_level'].tolist()]
+            if job.use_model:
+                # Empty cells when the model file is missing
+                outputs.append(result['high_risk_probability'].tolist() if 'high_risk_probability' in result
+                               else [''] * len(outputs[0]))
+            rows = zip(*(chunk[column] for column in inputs), *outputs)
+            db.session.add(JobChunk(job_id=job.id, position=position, rows=''.join(iter_csv(rows))))
+            offset = min(offset + chunk_size, job.total)
+            if not _renew_lease(job, attempt, processed=offset):
+                db.session.rollback()
+                return job
+            db.session.commit()
+            position += 1
+        status, error = 'done', None
+    except Exception as e:
+        db.session.rollback()
+        status, error = 'failed', str(e)
+    try:
+        _renew_lease(job, attempt, status=status, error=error, finished=datetime.now(timezone.utc))
+        db.session.commit()
+    except Exception:
+        # The job stays 'running' until its lease expires; the next claim finds it complete
+        db.session.rollback()
+        raise
+    return job
+
+
+def run_pending_jobs(chunk_size=JOB_CHUNK_SIZE, max_jobs=None, lease_seconds=JOB_LEASE_SECONDS):
+    """Claim and run queued jobs until the queue is empty (or max_jobs ran); returns the number run."""
+    count = 0
+    while max_jobs is None or count < max_jobs:
+        job = claim_job(lease_seconds)
+        if job is None:
+            break
+        run_job(job, chunk_size)
+        count += 1
+    return count
+
+
+def work(chunk_size=JOB_CHUNK_SIZE, poll_interval=JOB_POLL_INTERVAL, max_jobs=None):
+    """Worker process loop: run jobs as they arrive, polling the queue when it is empty."""
+    count = 0
+    while max_jobs is None or count < max_jobs:
+        ran = run_pending_jobs(chunk_size, None if max_jobs is None else max_jobs - count)
+        count += ran
+        if not ran:
+            db.session.remove()
+            time.sleep(poll_interval)
+    return count
+
+
+def job_status(job):
+    """Progress of a job as a JSON-ready dict."""
+    return {
+        'id': job.id,
+        'status': job.status,
+        'total': job.total,
+        'processed': job.processed,
+        'progress': job.processed / job.total if job.total else 1.0,
+        'error': job.error,
+        'created': job.created.isoformat() if job.created else None,
+        'finished': job.finished.isoformat() if job.finished else None
+    }
+
+
+def iter_job_result(job):
+    """The result CSV of a finished job as text chunks: the header, then one stored chunk at a time."""
+    yield ''.join(iter_csv([result_header(json.loads(job.payload), job.use_model)]))
+    position = 0
+    while True:
+        chunk = db.session.get(JobChunk, (job.id, position))
+        if chunk is None:
+            return
+        yield chunk.rows
+        # Each stored chunk is sent once; keep the session from holding them all
+        db.session.expunge(chunk)
+        position += 1
+
+
+class JobRunner:
+    """
+    Runs queued jobs on a background thread of the web process.
+
+    wake() starts the thread if it is not running; it drains the queue and
+    exits. This is the broker-less default; for more throughput, start
+    separate `flask jobs-worker` processes and disable the in-process runner.
+    """
+
+    def __init__(self, app, chunk_size=JOB_CHUNK_SIZE):
+        self.app = app
+        self.chunk_size = chunk_size
+        self._thread = None
+        self._pending = False
+        self._lock = threading.Lock()
+
+    def wake(self):
+        """Make sure a runner thread will see the jobs queued so far."""
+        with self._lock:
+            self._pending = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='job-runner', daemon=True)
+                self._thread.start()
+
+    def join(self, timeout=None):
+        """Wait for the runner thread to finish (for tests and shutdown)."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        with self.app.app_context():
+            try:
+                while True:
+                    with self._lock:
+                        if not self._pending:
+                            self._thread = None
+                            return
+                        self._pending = False
+                    try:
+                        run_pending_jobs(self.chunk_size)
+                    except Exception:
+                        # A failed claim or status write must not stop the runner; the
+                        # job is picked up again on a later wake, or when its lease expires
+                        db.session.rollback()
+                        self.app.logger.exception('Job runner failed')
+            finally:
+                with self._lock:
+                    if self._thread is threading.current_thread():
+                        self._thread = None
+                db.session.remove()
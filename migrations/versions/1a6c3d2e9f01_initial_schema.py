@@ -0,0 +1,69 @@
+"""initial schema
+
+Databases created with db.create_all() before migrations were introduced
+already have these tables, so only missing tables are created.
+
+Revision ID: 1a6c3d2e9f01
+Revises: 
+Create Date: 2026-10-18 16:06:57.427614
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a6c3d2e9f01'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'user' not in existing:
+        op.create_table(
+            'user',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=100), nullable=False),
+            sa.Column('password', sa.String(length=200), nullable=False),
+            sa.Column('date_registered', sa.DateTime(), nullable=True),
+            sa.Column('is_admin', sa.Boolean(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email')
+        )
+    if 'contact' not in existing:
+        op.create_table(
+            'contact',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('email', sa.String(length=100), nullable=False),
+            sa.Column('message', sa.Text(), nullable=False),
+            sa.Column('date', sa.DateTime(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'prediction' not in existing:
+        op.create_table(
+            'prediction',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('city', sa.String(length=100), nullable=False),
+            sa.Column('population', sa.Integer(), nullable=True),
+            sa.Column('temperature_increase', sa.Float(), nullable=True),
+            sa.Column('urban_density', sa.String(length=20), nullable=True),
+            sa.Column('infrastructure', sa.String(length=20), nullable=True),
+            sa.Column('risk_level', sa.String(length=20), nullable=True),
+            sa.Column('risk_score', sa.Float(), nullable=True),
+            sa.Column('date', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('prediction')
+    op.drop_table('contact')
+    op.drop_table('user')
@@ -0,0 +1,29 @@
+"""prediction lookup indexes
+
+Revision ID: 7b4e0f5a2c13
+Revises: 1a6c3d2e9f01
+Create Date: 2026-10-18 16:06:58.521735
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b4e0f5a2c13'
+down_revision = '1a6c3d2e9f01'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_prediction_city', 'prediction', ['city'])
+    op.create_index('ix_prediction_date', 'prediction', ['date'])
+    op.create_index('ix_prediction_user_id_city_date', 'prediction',
+                    ['user_id', 'city', sa.text('date DESC')])
+
+
+def downgrade():
+    op.drop_index('ix_prediction_user_id_city_date', table_name='prediction')
+    op.drop_index('ix_prediction_date', table_name='prediction')
+    op.drop_index('ix_prediction_city', table_name='prediction')
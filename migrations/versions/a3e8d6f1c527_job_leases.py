@@ -0,0 +1,27 @@
+"""job leases
+
+Revision ID: a3e8d6f1c527
+Revises: f3b7c2a9e614
+Create Date: 2026-10-18 22:41:09.274816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3e8d6f1c527'
+down_revision = 'f3b7c2a9e614'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('job', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    op.add_column('job', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('job') as batch_op:
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('heartbeat_at')
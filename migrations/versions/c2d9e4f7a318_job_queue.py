@@ -0,0 +1,50 @@
+"""job queue
+
+Revision ID: c2d9e4f7a318
+Revises: 7b4e0f5a2c13
+Create Date: 2026-10-18 19:12:04.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d9e4f7a318'
+down_revision = '7b4e0f5a2c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'job',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('use_model', sa.Boolean(), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created', sa.DateTime(), nullable=True),
+        sa.Column('started', sa.DateTime(), nullable=True),
+        sa.Column('finished', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_job_status_created', 'job', ['status', 'created'])
+    op.create_table(
+        'job_chunk',
+        sa.Column('job_id', sa.String(length=32), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('rows', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['job.id']),
+        sa.PrimaryKeyConstraint('job_id', 'position')
+    )
+
+
+def downgrade():
+    op.drop_table('job_chunk')
+    op.drop_index('ix_job_status_created', table_name='job')
+    op.drop_table('job')
@@ -0,0 +1,23 @@
+"""dashboard indexes
+
+Revision ID: e5a1b8c4d902
+Revises: c2d9e4f7a318
+Create Date: 2026-10-18 20:03:41.562017
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1b8c4d902'
+down_revision = 'c2d9e4f7a318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_prediction_user_id_date_id', 'prediction', ['user_id', 'date', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_prediction_user_id_date_id', table_name='prediction')
@@ -0,0 +1,75 @@
+"""city rollup
+
+Per-city totals for the dashboard. Existing predictions are rolled up
+here, so the dashboard is complete straight after the upgrade.
+
+Revision ID: f3b7c2a9e614
+Revises: e5a1b8c4d902
+Create Date: 2026-10-18 21:27:15.903384
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b7c2a9e614'
+down_revision = 'e5a1b8c4d902'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'city_rollup',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('city', sa.String(length=100), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('score_count', sa.Integer(), nullable=False),
+        sa.Column('score_sum', sa.Float(), nullable=False),
+        sa.Column('min_score', sa.Float(), nullable=True),
+        sa.Column('max_score', sa.Float(), nullable=True),
+        sa.Column('low_count', sa.Integer(), nullable=False),
+        sa.Column('medium_count', sa.Integer(), nullable=False),
+        sa.Column('high_count', sa.Integer(), nullable=False),
+        sa.Column('latest_date', sa.DateTime(), nullable=True),
+        sa.Column('latest_risk_level', sa.String(length=20), nullable=True),
+        sa.Column('latest_risk_score', sa.Float(), nullable=True),
+        sa.Column('sum_t', sa.Float(), nullable=False),
+        sa.Column('sum_tt', sa.Float(), nullable=False),
+        sa.Column('sum_ty', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('user_id', 'city')
+    )
+    op.create_index('ix_city_rollup_city', 'city_rollup', ['city'])
+    # The same totals as rollup.rebuild_rollups(), frozen here as SQL: t is in
+    # days since rollup.TREND_EPOCH, and the latest prediction of each group
+    # is found through ix_prediction_user_id_city_date
+    op.execute("""
+        INSERT INTO city_rollup (user_id, city, count, score_count, score_sum, min_score, max_score,
+                                 low_count, medium_count, high_count,
+                                 latest_date, latest_risk_level, latest_risk_score, sum_t, sum_tt, sum_ty)
+        SELECT p.user_id, p.city, count(*), count(p.risk_score), coalesce(sum(p.risk_score), 0.0),
+               min(p.risk_score), max(p.risk_score),
+               count(CASE WHEN p.risk_level = 'low' THEN 1 END),
+               count(CASE WHEN p.risk_level = 'medium' THEN 1 END),
+               count(CASE WHEN p.risk_level = 'high' THEN 1 END),
+               max(p.date),
+               (SELECT latest.risk_level FROM prediction AS latest
+                WHERE latest.user_id = p.user_id AND latest.city = p.city
+                ORDER BY latest.date DESC, latest.id DESC LIMIT 1),
+               (SELECT latest.risk_score FROM prediction AS latest
+                WHERE latest.user_id = p.user_id AND latest.city = p.city
+                ORDER BY latest.date DESC, latest.id DESC LIMIT 1),
+               coalesce(sum(p.t), 0.0), coalesce(sum(p.t * p.t), 0.0), coalesce(sum(p.t * p.risk_score), 0.0)
+        FROM (SELECT user_id, city, risk_level, risk_score, date,
+                     CASE WHEN risk_score IS NOT NULL
+                          THEN julianday(date) - julianday('2020-01-01 00:00:00') END AS t
+              FROM prediction) AS p
+        GROUP BY p.user_id, p.city
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_city_rollup_city', table_name='city_rollup')
+    op.drop_table('city_rollup')
@@ -0,0 +1,146 @@
+import os
+import numpy as np
+from compiled_forest import CompiledForest, load_npz
+
+# Bump when the artifact layout changes; load() refuses other versions
+ARTIFACT_VERSION = 1
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+# Trained RandomForestClassifier from notebooks/train.ipynb
+MODEL_PATH = os.path.join(MODELS_DIR, 'climate_model.pkl')
+# Encoder, scaler and compiled forest bundled by `python model_artifact.py`
+MODEL_ARTIFACT_PATH = os.path.join(MODELS_DIR, f'climate_model_v{ARTIFACT_VERSION}.npz')
+
+# Model features, in training column order
+FEATURE_NAMES = ('population', 'temperature_increase', 'urban_density', 'infrastructure_age')
+
+# Categorical levels in code order (low/medium/high -> 0/1/2, new/moderate/aging -> 0/1/2)
+DENSITY_LEVELS = ('low', 'medium', 'high')
+INFRASTRUCTURE_LEVELS = ('new', 'moderate', 'aging')
+
+
+def training_scaler():
+    """
+    Rebuild the StandardScaler fitted in notebooks/train.ipynb.
+
+    Older notebook runs only pickled the classifier, but the training
+    features are synthetic and fully determined by np.random.seed(42) and
+    the train/test split's random_state, so the scaler statistics can be
+    reproduced exactly.
+
+    Returns:
+        tuple: (mean, scale) arrays for the four model features
+    """
+    from sklearn.model_selection import train_test_split
+
+    rng = np.random.RandomState(42)
+    n_samples = 1000
+    features = np.column_stack([
+        rng.randint(50000, 5000000, n_samples),
+        rng.uniform(0.5, 4.0, n_samples),
+        rng.randint(0, 3, n_samples),
+        rng.randint(0, 3, n_samples)
+    ]).astype(float)
+    train, _ = train_test_split(features, test_size=0.2, random_state=42)
+    return train.mean(axis=0), train.std(axis=0)
+
+
+def encode_levels(values, levels):
+    """
+    Vectorized categorical encoding: the index of each value in levels.
+
+    Unknown values encode as 0, matching rule_based_prediction, which adds
+    nothing for them. Only the distinct values are looked up in Python.
+    """
+    values = np.atleast_1d(np.asarray(values, dtype=str))
+    distinct, inverse = np.unique(values, return_inverse=True)
+    codes = np.array([levels.index(value) if value in levels else 0 for value in distinct], dtype=float)
+    return codes[inverse.reshape(-1)]
+
+
+class ModelArtifact:
+    """
+    Versioned bundle of everything needed to score raw inputs: the
+    categorical encoder, the feature scaler and the compiled forest.
+    """
+
+    def __init__(self, mean, scale, forest, density_levels=DENSITY_LEVELS, infrastructure_levels=INFRASTRUCTURE_LEVELS):
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.forest = forest
+        self.density_levels = tuple(str(level) for level in density_levels)
+        self.infrastructure_levels = tuple(str(level) for level in infrastructure_levels)
+
+    @classmethod
+    def from_fitted(cls, model, scaler):
+        """Bundle a fitted RandomForestClassifier and StandardScaler."""
+        return cls(scaler.mean_, scaler.scale_, CompiledForest.from_sklearn(model))
+
+    @classmethod
+    def from_pickle(cls, model_path=MODEL_PATH):
+        """Bundle the pickled classifier with the scaler rebuilt by training_scaler()."""
+        import pickle
+        with open(model_path, 'rb') as f:
+            model = pickle.load(f)
+        mean, scale = training_scaler()
+        return cls(mean, scale, CompiledForest.from_sklearn(model))
+
+    def save(self, path=MODEL_ARTIFACT_PATH):
+        """Write the artifact as an uncompressed, memory-mappable .npz."""
+        arrays = {'forest_' + name: array for name, array in self.forest.to_arrays().items()}
+        np.savez(
+            path,
+            artifact_version=np.int64(ARTIFACT_VERSION),
+            feature_names=np.array(FEATURE_NAMES),
+            density_levels=np.array(self.density_levels),
+            infrastructure_levels=np.array(self.infrastructure_levels),
+            scaler_mean=self.mean,
+            scaler_scale=self.scale,
+            **arrays
+        )
+
+    @classmethod
+    def load(cls, path=MODEL_ARTIFACT_PATH, mmap=True):
+        """Load an artifact written by save(), memory-mapping the forest arrays."""
+        arrays = load_npz(path, mmap)
+        version = int(arrays['artifact_version'])
+        if version != ARTIFACT_VERSION:
+            raise ValueError(f"{path}: unsupported model artifact version {version} (expected {ARTIFACT_VERSION})")
+        forest = CompiledForest.from_arrays({name[len('forest_'):]: array for name, array in arrays.items()
+                                             if name.startswith('forest_')})
+        return cls(arrays['scaler_mean'], arrays['scaler_scale'], forest,
+                   arrays['density_levels'].tolist(), arrays['infrastructure_levels'].tolist())
+
+    def transform(self, population, temperature_increase, urban_density, infrastructure):
+        """Encode and scale raw input columns into the forest's (rows, 4) feature matrix."""
+        population = np.atleast_1d(np.asarray(population, dtype=float))
+        features = np.empty((len(population), len(FEATURE_NAMES)))
+        features[:, 0] = population
+        features[:, 1] = np.asarray(temperature_increase, dtype=float)
+        features[:, 2] = encode_levels(urban_density, self.density_levels)
+        features[:, 3] = encode_levels(infrastructure, self.infrastructure_levels)
+        features -= self.mean
+        features /= self.scale
+        return features
+
+    def predict_proba(self, population, temperature_increase, urban_density, infrastructure):
+        """High-risk probability for raw input columns: encoding, scaling and the forest in one pass."""
+        features = self.transform(population, temperature_increase, urban_density, infrastructure)
+        return self.forest.predict_proba(features)[:, 1]
+
+    def explain(self, population, temperature_increase, urban_density, infrastructure):
+        """
+        Per-feature contributions to the high-risk probability of each row.
+
+        Returns:
+            tuple: (bias, contributions) with contributions of shape (rows, 4)
+                in FEATURE_NAMES order; see CompiledForest.predict_contributions
+        """
+        features = self.transform(population, temperature_increase, urban_density, infrastructure)
+        return self.forest.predict_contributions(features)
+
+
+if __name__ == '__main__':
+    artifact = ModelArtifact.from_pickle()
+    artifact.save()
+    print(f"Wrote model artifact v{ARTIFACT_VERSION} ({artifact.forest.n_trees} trees) to {MODEL_ARTIFACT_PATH}")
@@ -12,7 +12,8 @@ class User(db.Model, UserMixin):
     password = db.Column(db.String(200), nullable=False)
     date_registered = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     is_admin = db.Column(db.Boolean, default=False)
-    predictions = db.relationship('Prediction', back_populates='user', lazy=True)
+    # A query, not a list: users can own a very large number of predictions
+    predictions = db.relationship('Prediction', back_populates='user', lazy='dynamic')
 
     def __repr__(self):
         return f'User("{self.name}", "{self.email}")'
@@ -31,15 +32,91 @@ class Contact(db.Model):
 class Prediction(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    city = db.Column(db.String(100), nullable=False)
+    city = db.Column(db.String(100), nullable=False, index=True)
     population = db.Column(db.Integer)
     temperature_increase = db.Column(db.Float)
     urban_density = db.Column(db.String(20))
     infrastructure = db.Column(db.String(20))
     risk_level = db.Column(db.String(20))
     risk_score = db.Column(db.Float)
-    date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     user = db.relationship('User', back_populates='predictions')
 
+    # Serves the latest-prediction lookup (user_id, city, newest date first);
+    # its user_id prefix also covers lookups by user alone. The second index
+    # serves the dashboard's newest-first pages of a user's predictions.
+    __table_args__ = (
+        db.Index('ix_prediction_user_id_city_date', user_id, city, date.desc()),
+        db.Index('ix_prediction_user_id_date_id', user_id, date, id),
+    )
+
     def __repr__(self):
         return f'Prediction("{self.city}", "{self.risk_level}", "{self.date}")'
+
+class CityRollup(db.Model):
+    """
+    Running totals of the predictions of one user for one city, kept up to
+    date as predictions are stored (see rollup.py). Summaries over users or
+    cities combine these rows instead of scanning Prediction.
+    """
+    __tablename__ = 'city_rollup'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    city = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    # Predictions with a risk score, and their sum, min and max
+    score_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    min_score = db.Column(db.Float)
+    max_score = db.Column(db.Float)
+    low_count = db.Column(db.Integer, nullable=False, default=0)
+    medium_count = db.Column(db.Integer, nullable=False, default=0)
+    high_count = db.Column(db.Integer, nullable=False, default=0)
+    latest_date = db.Column(db.DateTime)
+    latest_risk_level = db.Column(db.String(20))
+    latest_risk_score = db.Column(db.Float)
+    # Least-squares sums of risk_score over time (days since rollup.TREND_EPOCH)
+    sum_t = db.Column(db.Float, nullable=False, default=0.0)
+    sum_tt = db.Column(db.Float, nullable=False, default=0.0)
+    sum_ty = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.Index('ix_city_rollup_city', city),
+    )
+
+    def __repr__(self):
+        return f'CityRollup({self.user_id}, "{self.city}", {self.count})'
+
+class Job(db.Model):
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex, unguessable
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    total = db.Column(db.Integer, nullable=False)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    use_model = db.Column(db.Boolean, nullable=False, default=False)
+    payload = db.Column(db.Text, nullable=False)  # Input columns as JSON
+    error = db.Column(db.Text)
+    created = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    started = db.Column(db.DateTime)
+    finished = db.Column(db.DateTime)
+    # Renewed with every committed chunk; a running job whose heartbeat is older than the lease is requeued
+    heartbeat_at = db.Column(db.DateTime)
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Times a worker claimed it
+    chunks = db.relationship('JobChunk', back_populates='job', lazy='dynamic', cascade='all, delete-orphan',
+                             order_by='JobChunk.position')
+
+    # Workers claim the oldest queued (or abandoned) job
+    __table_args__ = (
+        db.Index('ix_job_status_created', status, created),
+    )
+
+    def __repr__(self):
+        return f'Job("{self.id}", "{self.status}", {self.processed}/{self.total})'
+
+class JobChunk(db.Model):
+    job_id = db.Column(db.String(32), db.ForeignKey('job.id'), primary_key=True)
+    position = db.Column(db.Integer, primary_key=True)
+    rows = db.Column(db.Text, nullable=False)  # Scored rows as CSV text, without the header
+    job = db.relationship('Job', back_populates='chunks')
+
+    def __repr__(self):
+        return f'JobChunk("{self.job_id}", {self.position})'
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Part of every key: bump it whenever plot_renderer's output changes, so
+# images (and browser ETags) rendered by older code are never served again
+PLOT_RENDERER_VERSION = 2
+# Share of the disk budget written between scans of the cache directory
+DISK_PRUNE_FRACTION = 0.1
+# A prune deletes down to this share of the disk budget, so the next one is not one write away
+DISK_LOW_WATER = 0.9
+
+
+def plot_cache_key(kind, plot_params, image_format='png', dpi=None):
+    """Content address for a plot: a hash of the renderer version, its kind, rendering inputs and image variant."""
+    key = {'version': PLOT_RENDERER_VERSION, 'kind': kind, 'params': plot_params, 'format': image_format, 'dpi': dpi}
+    payload = json.dumps(key, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PlotCache:
+    """
+    Two-tier cache of rendered plot images.
+
+    The first tier is an in-process LRU bounded by the total size of the
+    cached images. The optional second tier is a directory of image files
+    named by their content address, shared by every worker on the host.
+    It is bounded by max_disk_bytes (None for no bound): after every
+    DISK_PRUNE_FRACTION of it has been written, the least recently used
+    files (by mtime, which disk hits refresh) are deleted down to
+    DISK_LOW_WATER of it. Workers prune independently, so the directory
+    can briefly exceed the bound by what they wrote since their last scan.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, directory=None, max_disk_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_evictions': 0}
+        # Bytes written since the last prune; starts due, to account for files left by earlier processes
+        self._disk_written = self._prune_interval()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get_or_render(self, kind, plot_params, render, image_format='png', dpi=None):
+        """Return the cached image for (kind, plot_params) in this variant, calling render() on a miss."""
+        key = plot_cache_key(kind, plot_params, image_format, dpi)
+
+        image = self._get_memory(key)
+        if image is not None:
+            return image
+
+        image = self._read_disk(key, image_format)
+        if image is not None:
+            self._count('disk_hits')
+        else:
+            self._count('misses')
+            image = render()
+            self._write_disk(key, image, image_format)
+
+        self._put_memory(key, image)
+        return image
+
+    def stats(self):
+        """Hit/miss/eviction counters and current memory usage for monitoring."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._size
+            stats['max_bytes'] = self.max_bytes
+        return stats
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is left in place)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _count(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _get_memory(self, key):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self._stats['memory_hits'] += 1
+            return image
+
+    def _put_memory(self, key, image):
+        if len(image) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = image
+            self._size += len(image)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._stats['evictions'] += 1
+
+    def _path(self, key, image_format):
+        return os.path.join(self.directory, key[:2], f'{key}.{image_format}')
+
+    def _read_disk(self, key, image_format):
+        if not self.directory:
+            return None
+        path = self._path(key, image_format)
+        try:
+            with open(path, 'rb') as f:
+                image = f.read()
+        except OSError:
+            return None
+        try:
+            # Mark the file recently used, so pruning deletes colder ones first
+            os.utime(path)
+        except OSError:
+            pass
+        return image
+
+    def _write_disk(self, key, image, image_format):
+        if not self.directory:
+            return
+        path = self._path(key, image_format)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see a partial image
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(image)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The disk tier is best effort; the image is still served from memory
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self._lock:
+            self._disk_written += len(image)
+            due = self._disk_written >= self._prune_interval()
+            if due:
+                self._disk_written = 0
+        if due:
+            self._prune_disk()
+
+    def _prune_interval(self):
+        if self.max_disk_bytes is None:
+            return float('inf')
+        return max(1, int(self.max_disk_bytes * DISK_PRUNE_FRACTION))
+
+    def _prune_disk(self):
+        """Delete the least recently used files until the directory is within max_disk_bytes."""
+        # One scan at a time per process; a thread that finds one running skips its own
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            files, total = [], 0
+            for shard in os.scandir(self.directory):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # Removed by another worker meanwhile
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+            if total <= self.max_disk_bytes:
+                return
+            files.sort()
+            evicted = 0
+            for _, size, path in files:
+                if total <= self.max_disk_bytes * DISK_LOW_WATER:
+                    break
+                try:
+                    os.remove(path)
+                    evicted += 1
+                except OSError:
+                    pass  # Already removed by another worker, or in use; either way it no longer counts
+                total -= size
+            with self._lock:
+                self._stats['disk_evictions'] += evicted
+        except OSError:
+            pass  # The disk tier is best effort
+        finally:
+            self._prune_lock.release()
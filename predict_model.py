@@ -1,15 +1,12 @@
 
-import os
 from datetime import datetime
-import io
-import base64
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
+import hashlib
+import functools
 import numpy as np
-
-# Check if model exists, if not use a simple rule-based approach
-MODEL_PATH = os.path.join('models', 'climate_model.pkl')
+from plot_renderer import PlotRenderer
+from projections import PROJECTION_YEARS, project_city
+# The trained model adds a high-risk probability when available; scores stay rule-based
+from model_serving import get_model_server
 
 def rule_based_prediction(population, temperature_increase, urban_density, infrastructure):
     """Simple rule-based model for risk prediction."""
@@ -40,115 +37,240 @@ def rule_based_prediction(population, temperature_increase, urban_density, infra
     # Cap at 100
     return min(risk, 100)
 
-# Functions for generating plots
+def risk_level_from_score(risk_score):
+    """Map a risk score onto the 'low' / 'medium' / 'high' risk levels."""
+    if risk_score >= 70:
+        return 'high'
+    elif risk_score >= 40:
+        return 'medium'
+    return 'low'
 
+# Columns expected by the batch scoring path
+BATCH_COLUMNS = ('population', 'temperature_increase', 'urban_density', 'infrastructure')
+# Batch inputs that must be finite numbers; the others are level names
+NUMERIC_COLUMNS = ('population', 'temperature_increase')
 
+# Risk every city starts from in rule_based_prediction
+BASE_RISK = 20
 
+# Order rule_based_prediction adds the factors in; float addition is not
+# associative, so every other path adds them in this order too
+RULE_TERM_ORDER = ('population', 'temperature_increase', 'urban_density', 'infrastructure')
 
-def generate_rainfall_plot(temperature_increase):
-    """Generate rainfall projection plot"""
-    plt.figure(figsize=(10, 6))
-    years = list(range(2023, 2031))
-    base_rainfall = 800  # Base annual rainfall in mm
-    
-    # Generate rainfall data with some randomness and inverse relationship with temperature
-    # As temperature increases, rainfall tends to decrease
-    rainfall_data = []
-    for i, year in enumerate(years):
-        # Decrease rainfall as years progress based on temperature increase
-        yearly_rainfall = base_rainfall - (i * 25 * temperature_increase / 2.0)
-        # Add some randomness
-        yearly_rainfall += (np.random.random() * 50 - 25)
-        rainfall_data.append(yearly_rainfall)
-    
-    # Convert to numpy array for plotting
-    rainfall_data = np.array(rainfall_data)
-    
-    # Create the bar plot
-    plt.bar(years, rainfall_data, color='#0d6efd', alpha=0.7)
-    
-    # Add trend line
-    z = np.polyfit(range(len(years)), rainfall_data, 1)
-    p = np.poly1d(z)
-    plt.plot(years, p(range(len(years))), "r--", color='#0d6efd', linewidth=2)
-    
-    plt.title('Annual Rainfall Projection (2023-2030)', fontsize=14)
-    plt.xlabel('Year', fontsize=12)
-    plt.ylabel('Rainfall (mm)', fontsize=12)
-    plt.grid(True, linestyle='--', alpha=0.7, axis='y')
-    plt.tight_layout()
-    
-    # Convert plot to base64 string
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    image_png = buffer.getvalue()
-    buffer.close()
-    plt.close()
-    
-    return base64.b64encode(image_png).decode('utf-8')
+def rule_based_terms(population, temperature_increase, urban_density, infrastructure):
+    """
+    The uncapped per-factor points rule_based_prediction adds, as arrays.
 
+    Returns:
+        dict: 'population', 'temperature_increase', 'urban_density' and
+            'infrastructure' point arrays aligned with the inputs
+    """
+    population = np.asarray(population, dtype=float)
+    temperature_increase = np.asarray(temperature_increase, dtype=float)
+    urban_density = np.asarray(urban_density, dtype=str)
+    infrastructure = np.asarray(infrastructure, dtype=str)
 
-def generate_risk_plot(risk_score, urban_density, infrastructure, temperature_increase=None):
-    """Generate risk projection plot"""
-    plt.figure(figsize=(10, 6))
-    years = list(range(2023, 2031))
-    
-    # Base risk increases over time
-    risk_values = []
-    for i, _ in enumerate(years):
-        # Risk increases more rapidly for high density and aging infrastructure
-        density_factor = 1.5 if urban_density == 'high' else (1.2 if urban_density == 'medium' else 1.0)
-        infra_factor = 1.5 if infrastructure == 'aging' else (1.2 if infrastructure == 'moderate' else 1.0)
-        
-        # Calculate yearly risk with some randomness
-        yearly_risk = min(100, risk_score + (i * 3 * density_factor * infra_factor) + (np.random.random() * 5 - 2.5))
-        risk_values.append(yearly_risk)
-    
-    # Create color gradient based on risk level
-    colors = []
-    for risk in risk_values:
-        if risk >= 70:
-            colors.append('#dc3545')  # High risk - red
-        elif risk >= 40:
-            colors.append('#ffc107')  # Medium risk - yellow
+    return {
+        # Population factor
+        'population': np.where(population > 1000000, 20, np.where(population > 500000, 10, 0)),
+        # Temperature increase factor
+        'temperature_increase': temperature_increase * 10,
+        # Urban density factor
+        'urban_density': np.where(urban_density == 'high', 15, np.where(urban_density == 'medium', 10, 0)),
+        # Infrastructure factor
+        'infrastructure': np.where(infrastructure == 'aging', 20, np.where(infrastructure == 'moderate', 10, 0))
+    }
+
+def rule_based_prediction_batch(population, temperature_increase, urban_density, infrastructure):
+    """Vectorized rule_based_prediction over equally sized arrays of inputs.
+
+    The additions are applied in the same order as the scalar path so the
+    resulting scores are identical to calling rule_based_prediction per row.
+    """
+    terms = rule_based_terms(population, temperature_increase, urban_density, infrastructure)
+    risk = BASE_RISK
+    for factor in RULE_TERM_ORDER:
+        risk = risk + terms[factor]
+    return np.minimum(risk, 100)
+
+def risk_level_batch(risk_score):
+    """Vectorized risk_level_from_score."""
+    risk_score = np.asarray(risk_score, dtype=float)
+    return np.where(risk_score >= 70, 'high', np.where(risk_score >= 40, 'medium', 'low'))
+
+def batch_arrays(data):
+    """
+    The BATCH_COLUMNS of a batch, validated, as 1-D NumPy arrays.
+
+    Args:
+        data: pandas DataFrame or mapping of column name -> list of values;
+            a 'city' column, if present, must have the same length
+
+    Returns:
+        dict: Column name -> array (float for NUMERIC_COLUMNS, str otherwise)
+
+    Raises:
+        ValueError: If a column is missing or not a list, the columns differ in
+            length, or a row lacks a finite number or a level name
+    """
+    missing = [column for column in BATCH_COLUMNS if column not in data]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    lengths = set()
+    for column in BATCH_COLUMNS + ('city',):
+        if column not in data:
+            continue
+        values = data[column]
+        if isinstance(values, (str, bytes, dict)) or np.ndim(values) != 1:
+            raise ValueError(f"Column {column} must be a list of values")
+        lengths.add(len(values))
+    if len(lengths) > 1:
+        raise ValueError("All columns must have the same length")
+
+    arrays = {}
+    for column in BATCH_COLUMNS:
+        values = data[column]
+        if column in NUMERIC_COLUMNS:
+            try:
+                array = np.asarray(values, dtype=float)
+            except (TypeError, ValueError):
+                raise ValueError(f"Column {column} must hold numbers")
+            invalid = np.flatnonzero(~np.isfinite(array))
         else:
-            colors.append('#198754')  # Low risk - green
-    
-    plt.bar(years, risk_values, color=colors, alpha=0.7)
-    
-    # Add threshold lines
-    plt.axhline(y=70, color='#dc3545', linestyle='--', alpha=0.7, label='High Risk Threshold')
-    plt.axhline(y=40, color='#ffc107', linestyle='--', alpha=0.7, label='Medium Risk Threshold')
-    
-    plt.title('Climate Risk Projection (2023-2030)', fontsize=14)
-    plt.xlabel('Year', fontsize=12)
-    plt.ylabel('Risk Score (%)', fontsize=12)
-    plt.ylim(0, 100)
-    plt.grid(True, linestyle='--', alpha=0.7, axis='y')
-    plt.legend()
-    plt.tight_layout()
-    
-    # Convert plot to base64 string
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    image_png = buffer.getvalue()
-    buffer.close()
-    plt.close()
-    
-    return base64.b64encode(image_png).decode('utf-8')
+            invalid = np.flatnonzero([not isinstance(value, str) for value in values])
+            array = np.asarray(values, dtype=str)
+        if len(invalid):
+            rows = ', '.join(map(str, invalid[:10].tolist()))
+            raise ValueError(f"Missing or invalid {column} in rows: {rows}")
+        arrays[column] = array
+    return arrays
+
+def predict_risk_batch(data, use_model=False):
+    """
+    Score many cities in one vectorized pass.
+
+    Args:
+        data: pandas DataFrame or mapping of column name -> array-like holding
+            the columns listed in BATCH_COLUMNS
+        use_model (bool): Also add the RandomForest's 'high_risk_probability'
+            per row (omitted when the model file is missing)
+
+    Returns:
+        dict: 'risk_score' and 'risk_level' NumPy arrays aligned with the input rows
+
+    Raises:
+        ValueError: If the input does not pass batch_arrays()
+    """
+    arrays = batch_arrays(data)
+    columns = [arrays[column] for column in BATCH_COLUMNS]
+    risk_score = rule_based_prediction_batch(*columns)
+    result = {
+        'risk_score': risk_score,
+        'risk_level': risk_level_batch(risk_score)
+    }
+
+    model_server = get_model_server()
+    if use_model and model_server.available:
+        result['high_risk_probability'] = model_server.predict_proba_batch(*columns)
+    return result
+
+# Functions for generating plots
+
+
+# Plot kinds that can be rendered on demand
+PLOT_KINDS = ('rainfall', 'risk')
+
+def new_plot_seed():
+    """Draw a seed for the random jitter applied to projection series."""
+    return int(np.random.randint(0, 2**31 - 1))
+
+def deterministic_plot_seed(risk_score, urban_density, infrastructure, temperature_increase):
+    """Seed derived from the plot inputs, so equal inputs always produce the same plots."""
+    key = f"{float(risk_score)!r}|{urban_density}|{infrastructure}|{float(temperature_increase)!r}"
+    return int.from_bytes(hashlib.sha256(key.encode('utf-8')).digest()[:4], 'big') & 0x7fffffff
+
+def project_rainfall(temperature_increase, seed=None):
+    """Yearly rainfall projection (mm) for PROJECTION_YEARS, from the projection engine"""
+    return project_city(temperature_increase, 0.0, None, None, seed)['rainfall']
+
+def project_risk(risk_score, urban_density, infrastructure, seed=None):
+    """Yearly risk score projection for PROJECTION_YEARS, from the projection engine"""
+    return project_city(0.0, risk_score, urban_density, infrastructure, seed)['risk']
+
+# Shared by every request in the worker; figures are built once per thread
+plot_renderer = PlotRenderer(PROJECTION_YEARS)
+
+def render_rainfall_plot(rainfall_data, image_format='png', dpi=None):
+    """Render a rainfall projection series as image bytes (PNG unless image_format says otherwise)"""
+    return plot_renderer.render_rainfall(rainfall_data, image_format, dpi)
+
+def render_risk_plot(risk_values, image_format='png', dpi=None):
+    """Render a risk projection series as image bytes (PNG unless image_format says otherwise)"""
+    return plot_renderer.render_risk(risk_values, image_format, dpi)
+
+def render_plot(kind, plot_params, image_format='png', dpi=None):
+    """
+    Render one of PLOT_KINDS.
+
+    Args:
+        kind (str): 'rainfall' or 'risk'
+        plot_params (dict): The 'plot_params' entry of a predict_climate_risk result
+        image_format (str): One of plot_renderer.PLOT_FORMATS
+        dpi (int): Resolution of raster formats; None for the figure's own
+
+    Returns:
+        bytes: The image
+    """
+    if kind == 'rainfall':
+        return render_rainfall_plot(project_rainfall(plot_params['temperature_increase'], plot_params['seed']),
+                                    image_format, dpi)
+    elif kind == 'risk':
+        return render_risk_plot(project_risk(
+            plot_params['risk_score'],
+            plot_params['urban_density'],
+            plot_params['infrastructure'],
+            plot_params['seed']
+        ), image_format, dpi)
+    raise ValueError(f"Unknown plot kind: {kind}")
+
+def warm_plot_renderer():
+    """Import matplotlib and build this thread's figures ahead of the first real render."""
+    render_rainfall_plot(project_rainfall(0.0))
+    render_risk_plot(project_risk(0.0, None, None))
 
 def generate_insights(temperature_increase, urban_density, infrastructure, risk_level):
-    """Generate risk factors and recommendations based on inputs and risk level."""
+    """
+    Generate risk factors and recommendations based on inputs and risk level.
+
+    The output depends only on the temperature band, the two levels and the
+    risk level, so each combination is built once and shared: the returned
+    (risk_factors, recommendations) tuples are the same objects on every call.
+    """
+    if temperature_increase > 2.5:
+        temperature_band = 'severe'
+    elif temperature_increase > 1.5:
+        temperature_band = 'moderate'
+    else:
+        temperature_band = 'mild'
+    # Values the rules do not mention share one cache entry
+    return _insights(
+        temperature_band,
+        urban_density if urban_density in ('high', 'medium') else None,
+        infrastructure if infrastructure in ('aging', 'moderate') else None,
+        risk_level if risk_level in ('high', 'medium') else None
+    )
+
+@functools.lru_cache(maxsize=None)
+def _insights(temperature_band, urban_density, infrastructure, risk_level):
     risk_factors = []
     recommendations = []
     
     # Temperature factors
-    if temperature_increase > 2.5:
+    if temperature_band == 'severe':
         risk_factors.append("Severe temperature increase")
         recommendations.append("Implement extensive heat mitigation strategies")
-    elif temperature_increase > 1.5:
+    elif temperature_band == 'moderate':
         risk_factors.append("Moderate temperature increase")
         recommendations.append("Develop cooling centers and heat action plans")
     else:
@@ -185,46 +307,56 @@ def generate_insights(temperature_increase, urban_density, infrastructure, risk_
     else:
         recommendations.append("Monitor climate indicators regularly")
     
-    return risk_factors, recommendations
+    # Immutable, so every caller can share them
+    return tuple(risk_factors), tuple(recommendations)
+
+def generate_csv_data(city, population, temperature_increase, urban_density, infrastructure, risk_level, risk_score,
+                      projection=None):
+    """
+    Generate CSV data for report download.
 
-def generate_csv_data(city, population, temperature_increase, urban_density, infrastructure, risk_level, risk_score):
-    """Generate CSV data for report download"""
+    Args:
+        projection (dict): project_city() output to report; defaults to the
+            smooth trend for the inputs
+    """
     header = "City,Population,Temperature Increase,Urban Density,Infrastructure,Risk Level,Risk Score,Date\n"
     date = datetime.now().strftime('%Y-%m-%d')
     row = f"{city},{population},{temperature_increase},{urban_density},{infrastructure},{risk_level},{risk_score},{date}\n"
     
-    # Generate future projections (5 years)
-    future_years = list(range(1, 6))  # 1 to 5 years ahead
-    current_year = datetime.now().year
+    if projection is None:
+        projection = project_city(temperature_increase, risk_score, urban_density, infrastructure)
     
     # Add projection header
     projection_header = "\n\nYear,Projected Temperature (°C),Projected Rainfall (mm),Projected Risk Score\n"
     
-    projection_rows = ""
-    for i in future_years:
-        future_year = current_year + i
-        # Simple projection models:
-        # Temperature increases linearly
-        future_temp = round(temperature_increase * (1 + i * 0.2), 2)
-        # Rainfall decreases with temperature
-        future_rainfall = round(800 - (i * 50 * temperature_increase / 2.0))
-        # Risk increases
-        future_risk = min(100, risk_score + (i * 5))
-        
-        projection_rows += f"{future_year},{future_temp},{future_rainfall},{future_risk}\n"
+    projection_rows = "".join(
+        f"{year},{temperature:.1f},{rainfall:.0f},{risk:.1f}\n"
+        for year, temperature, rainfall, risk in zip(
+            projection['years'], projection['temperature'].tolist(),
+            projection['rainfall'].tolist(), projection['risk'].tolist())
+    )
     
     return header + row + projection_header + projection_rows
 
-def predict_climate_risk(city, population, temperature_increase, urban_density, infrastructure):
+def predict_climate_risk(city, population, temperature_increase, urban_density, infrastructure,
+                         deterministic_plots=False, use_model=True):
     """
     Predict climate risk based on input parameters.
     
+    Plots are not rendered here; the result carries the numeric projection
+    series plus the 'plot_params' needed to render them later with
+    render_plot(), which the app serves as separate image resources.
+    
     Args:
         city (str): Name of the city
         population (int): Population of the city
         temperature_increase (float): Projected temperature increase in degrees Celsius
         urban_density (str): Urban density level ('low', 'medium', 'high')
         infrastructure (str): Infrastructure quality ('modern', 'moderate', 'aging')
+        deterministic_plots (bool): Derive the projection jitter from the inputs instead
+            of drawing a random seed, so repeated inputs yield identical (cacheable) plots
+        use_model (bool): Add the RandomForest's 'high_risk_probability' (None when
+            the model file is missing)
         
     Returns:
         dict: Dictionary containing risk assessment results
@@ -237,29 +369,39 @@ def predict_climate_risk(city, population, temperature_increase, urban_density,
     if isinstance(temperature_increase, str):
         temperature_increase = float(temperature_increase)
     
-    # Calculate risk score using rule-based approach
-    risk_score = rule_based_prediction(population, temperature_increase, urban_density, infrastructure)
-    
-    # Determine risk level based on score
-    if risk_score >= 70:
-        risk_level = 'high'
-    elif risk_score >= 40:
-        risk_level = 'medium'
+    # Rule-based score, risk level and insights, looked up from the precomputed
+    # tables (equal to rule_based_prediction, risk_level_from_score and generate_insights)
+    from score_table import lookup_prediction
+    risk_score, risk_level, risk_factors, recommendations = lookup_prediction(
+        population, temperature_increase, urban_density, infrastructure)
+    
+    # Probability of high risk from the trained model, alongside the rule score
+    high_risk_probability = None
+    model_server = get_model_server()
+    if use_model and model_server.available:
+        high_risk_probability = model_server.predict_proba(population, temperature_increase, urban_density, infrastructure)
+    
+    # Projection series; plots are rendered from these on demand
+    if deterministic_plots:
+        seed = deterministic_plot_seed(risk_score, urban_density, infrastructure, temperature_increase)
     else:
-        risk_level = 'low'
-    
-    # Generate visualizations
-    rainfall_plot = generate_rainfall_plot(temperature_increase)
-    risk_plot = generate_risk_plot(risk_score, urban_density, infrastructure, temperature_increase)
-    
-    # Generate insights
-    risk_factors, recommendations = generate_insights(temperature_increase, urban_density, infrastructure, risk_level)
+        seed = new_plot_seed()
+    plot_params = {
+        'risk_score': risk_score,
+        'urban_density': urban_density,
+        'infrastructure': infrastructure,
+        'temperature_increase': temperature_increase,
+        'seed': seed
+    }
+    projection = project_city(temperature_increase, risk_score, urban_density, infrastructure, seed)
+    rainfall, risk = projection['rainfall'], projection['risk']
     
-    # Prepare CSV data for download
-    csv_data = generate_csv_data(city, population, temperature_increase, urban_density, infrastructure, risk_level, risk_score)
+    # Prepare CSV data for download, with the same series as the plots
+    csv_data = generate_csv_data(city, population, temperature_increase, urban_density, infrastructure, risk_level,
+                                 risk_score, projection)
     
     # Return results
-    return {
+    result = {
         'city': city,
         'population': population,
         'temperature_increase': temperature_increase,
@@ -267,10 +409,18 @@ def predict_climate_risk(city, population, temperature_increase, urban_density,
         'infrastructure': infrastructure,
         'risk_level': risk_level,
         'risk_score': risk_score,
-        'rainfall_plot': rainfall_plot,
-        'risk_plot': risk_plot,
+        'high_risk_probability': high_risk_probability,
+        'projections': {
+            'years': PROJECTION_YEARS,
+            'temperature': projection['temperature'].tolist(),
+            'rainfall': rainfall.tolist(),
+            'risk': risk.tolist()
+        },
+        'plot_params': plot_params,
         'risk_factors': risk_factors,
         'recommendations': recommendations,
         'csv_data': csv_data
     }
+    
+    return result
 
@@ -0,0 +1,194 @@
+import numpy as np
+
+# Years covered by the projection series, plots and reports
+PROJECTION_YEARS = list(range(2023, 2031))
+
+# Starting points of the yearly series
+BASE_TEMPERATURE = 25.0  # Mean temperature in degrees Celsius
+BASE_RAINFALL = 800  # Annual rainfall in mm
+
+# The projected temperature increase is reached over this many years; later
+# years continue at the same yearly step
+TEMPERATURE_RAMP_YEARS = len(PROJECTION_YEARS)
+
+# Risk grows faster for dense cities and aging infrastructure
+DENSITY_GROWTH = {'high': 1.5, 'medium': 1.2}
+INFRASTRUCTURE_GROWTH = {'aging': 1.5, 'moderate': 1.2}
+
+# Last year the climate data API projects to
+MAX_PROJECTION_YEAR = 2100
+# Series of the climate data API, and cities projected together when streaming them
+CLIMATE_QUANTITIES = ('temperature', 'rainfall', 'risk')
+CLIMATE_BLOCK_CITIES = 256
+
+# City used where a projection is shown without user inputs (the sample report, the landing page)
+REFERENCE_CITY = {
+    'population': 500000,
+    'temperature_increase': 1.5,
+    'urban_density': 'medium',
+    'infrastructure': 'moderate'
+}
+
+
+def _growth(values, factors):
+    # Look up only the distinct levels, then broadcast; other values grow at 1.0
+    distinct, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return np.array([factors.get(value, 1.0) for value in distinct])[inverse.reshape(-1)]
+
+
+def _jitter(seeds, n_cities, n_years):
+    """Uniform [0, 1) noise of shape (cities, years); one generator per city seed."""
+    if seeds is None:
+        return None
+    if np.ndim(seeds) == 0:
+        return np.random.default_rng(seeds).random((n_cities, n_years))
+    # Per-city seeds reproduce the series each city gets when projected alone
+    return np.stack([np.random.default_rng(int(seed)).random(n_years) for seed in seeds])
+
+
+def projection_trend(temperature_increase, risk_score, urban_density, infrastructure, years=PROJECTION_YEARS):
+    """
+    The smooth yearly trend behind project(), before any jitter or capping.
+
+    Every quantity changes by a fixed step per year from years[0], so a
+    year's value does not depend on how many years are projected.
+
+    Returns:
+        tuple: (temperature, rainfall, risk) arrays of shape (cities, years);
+            rainfall is floored at 0, risk is not yet capped at 100
+    """
+    temperature_increase = np.atleast_1d(np.asarray(temperature_increase, dtype=float))
+    risk_score = np.atleast_1d(np.asarray(risk_score, dtype=float))
+    steps = np.arange(len(years))
+
+    # Temperature climbs by the projected increase over the period
+    temperature = BASE_TEMPERATURE + steps * temperature_increase[:, None] / TEMPERATURE_RAMP_YEARS
+    # Rainfall decreases as years progress based on temperature increase, but never below none
+    rainfall = np.maximum(0, BASE_RAINFALL - (steps * 25 * temperature_increase[:, None] / 2.0))
+    # Risk increases more rapidly for high density and aging infrastructure
+    density_growth = _growth(urban_density, DENSITY_GROWTH)[:, None]
+    infrastructure_growth = _growth(infrastructure, INFRASTRUCTURE_GROWTH)[:, None]
+    risk = risk_score[:, None] + (steps * 3 * density_growth * infrastructure_growth)
+    return temperature, rainfall, risk
+
+
+def project(temperature_increase, risk_score, urban_density, infrastructure, seeds=None, years=PROJECTION_YEARS):
+    """
+    Project yearly temperature, rainfall and risk for many cities at once.
+
+    Args:
+        temperature_increase, risk_score, urban_density, infrastructure:
+            Equally sized array-likes, one entry per city
+        seeds: None for the smooth trend, one int to jitter the whole batch
+            from one generator, or one int per city to jitter every city as
+            if it was projected on its own (what the plots use)
+        years (list): Years to project, the first one being the base year
+
+    Returns:
+        dict: 'years' plus 'temperature', 'rainfall' and 'risk' arrays of
+            shape (cities, years)
+    """
+    temperature, rainfall, risk = projection_trend(temperature_increase, risk_score, urban_density, infrastructure,
+                                                   years)
+
+    noise = _jitter(seeds, *rainfall.shape)
+    if noise is not None:
+        rainfall = np.maximum(0, rainfall + noise * 50 - 25)
+        risk += noise * 5 - 2.5
+
+    return {
+        'years': list(years),
+        'temperature': temperature,
+        'rainfall': rainfall,
+        'risk': np.minimum(100, risk)
+    }
+
+
+def project_city(temperature_increase, risk_score, urban_density, infrastructure, seed=None, years=PROJECTION_YEARS):
+    """project() for one city: 'years' plus one 1-D series per quantity."""
+    projection = project([temperature_increase], [risk_score], [urban_density], [infrastructure],
+                         None if seed is None else [seed], years)
+    return {key: value if key == 'years' else value[0] for key, value in projection.items()}
+
+
+def climate_years(start_year=None, end_year=None):
+    """
+    The years to project for a requested range.
+
+    Projections always start from the base year, PROJECTION_YEARS[0]; with
+    fixed yearly steps, a year's values do not depend on the range asked for.
+
+    Returns:
+        tuple: (years to project, index of start_year within them)
+
+    Raises:
+        ValueError: If the range is empty or outside the base year to MAX_PROJECTION_YEAR
+    """
+    start_year = PROJECTION_YEARS[0] if start_year is None else int(start_year)
+    end_year = PROJECTION_YEARS[-1] if end_year is None else int(end_year)
+    if not PROJECTION_YEARS[0] <= start_year <= end_year <= MAX_PROJECTION_YEAR:
+        raise ValueError(f"Years must satisfy {PROJECTION_YEARS[0]} <= start_year <= end_year <= "
+                         f"{MAX_PROJECTION_YEAR}")
+    return list(range(PROJECTION_YEARS[0], end_year + 1)), start_year - PROJECTION_YEARS[0]
+
+
+def climate_series(projection, row=0, offset=0):
+    """One city's rows of a project() result as year/value points per quantity, from years[offset]."""
+    years = projection['years'][offset:]
+    return {
+        quantity: [{'year': year, 'value': round(value, 1)}
+                   for year, value in zip(years, projection[quantity][row, offset:].tolist())]
+        for quantity in CLIMATE_QUANTITIES
+    }
+
+
+def iter_climate_series(temperature_increase, risk_score, urban_density, infrastructure, start_year=None,
+                        end_year=None, block=CLIMATE_BLOCK_CITIES):
+    """
+    climate_series() of many cities, projected `block` cities at a time.
+
+    Only one block of projections is held at once, so the series of any
+    number of cities can be streamed in bounded memory.
+
+    Raises:
+        ValueError: From climate_years(), or if a temperature_increase or
+            risk_score is missing or not finite; before anything is yielded
+    """
+    years, offset = climate_years(start_year, end_year)
+    temperature_increase = np.asarray(temperature_increase, dtype=float)
+    risk_score = np.asarray(risk_score, dtype=float)
+    invalid = np.flatnonzero(~(np.isfinite(temperature_increase) & np.isfinite(risk_score)))
+    if len(invalid):
+        raise ValueError(f"Missing or invalid values in rows: {', '.join(map(str, invalid[:10].tolist()))}")
+
+    def series():
+        for begin in range(0, len(risk_score), block):
+            end = begin + block
+            projection = project(temperature_increase[begin:end], risk_score[begin:end],
+                                 urban_density[begin:end], infrastructure[begin:end], years=years)
+            for row in range(len(projection['risk'])):
+                yield climate_series(projection, row, offset)
+    return series()
+
+
+def city_climate_data(start_year=None, end_year=None, **inputs):
+    """
+    climate_series() of one city.
+
+    Inputs not given (population, temperature_increase, urban_density,
+    infrastructure) are REFERENCE_CITY's; with none given these are the
+    landing page series.
+
+    Raises:
+        ValueError: From climate_years(), or if population or
+            temperature_increase is not a finite number
+    """
+    from score_table import lookup_score
+
+    city = dict(REFERENCE_CITY, **inputs)
+    if not np.isfinite([float(city['population']), float(city['temperature_increase'])]).all():
+        raise ValueError("population and temperature_increase must be finite numbers")
+    years, offset = climate_years(start_year, end_year)
+    projection = project([city['temperature_increase']], [lookup_score(**city)], [city['urban_density']],
+                         [city['infrastructure']], years=years)
+    return climate_series(projection, 0, offset)
@@ -0,0 +1,153 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+
+class RenderPoolSaturated(Exception):
+    """Every renderer is busy and the queue is full; the caller should retry later."""
+
+
+class RenderTimeout(Exception):
+    """A render did not finish within the pool's timeout."""
+
+
+def _warm_renderer():
+    # Runs once in every renderer process: pays for the matplotlib import and
+    # the figure layout before the first request arrives
+    from predict_model import warm_plot_renderer
+    warm_plot_renderer()
+
+
+def _render(kind, plot_params, image_format, dpi):
+    from predict_model import render_plot
+    return render_plot(kind, plot_params, image_format, dpi)
+
+
+class RenderPool:
+    """
+    Renders projection plots in a bounded pool of warm renderer processes.
+
+    matplotlib holds the GIL while it draws, so rendering in a request
+    thread stalls every other thread of the worker. Renders are sent to
+    `processes` child processes instead, with at most `max_queue` more
+    waiting behind them; further renders are refused with
+    RenderPoolSaturated rather than queued without bound. A render that
+    takes longer than `timeout` seconds raises RenderTimeout; it keeps its
+    slot until the process finishes it, so slow renders still count
+    against the limit.
+
+    The processes are started on first use, so a pool created in a
+    preloading gunicorn master is only started in the workers. With
+    processes=0 plots are rendered in the calling thread.
+    """
+
+    def __init__(self, processes=2, max_queue=8, timeout=10.0):
+        self.processes = processes
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stats = {'rendered': 0, 'rejected': 0, 'timeouts': 0, 'restarts': 0}
+        if processes > 0:
+            atexit.register(self.shutdown)
+
+    def render(self, kind, plot_params, image_format='png', dpi=None):
+        """
+        Image bytes for one of predict_model.PLOT_KINDS (see predict_model.render_plot).
+
+        Raises:
+            RenderPoolSaturated: If processes + max_queue renders are already in flight
+            RenderTimeout: If the render takes longer than timeout
+        """
+        if self.processes <= 0:
+            image = _render(kind, plot_params, image_format, dpi)
+            self._count('rendered')
+            return image
+
+        with self._lock:
+            if self._in_flight >= self.processes + self.max_queue:
+                self._stats['rejected'] += 1
+                raise RenderPoolSaturated(f"{self._in_flight} plot renders in flight")
+            self._in_flight += 1
+
+        try:
+            executor, future = self._submit(kind, plot_params, image_format, dpi)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            image = future.result(timeout=self.timeout)
+        except TimeoutError:
+            self._count('timeouts')
+            raise RenderTimeout(f"plot render took longer than {self.timeout} s")
+        except BrokenProcessPool:
+            # A renderer died (e.g. killed for memory); start a fresh pool next time
+            self._restart(executor)
+            raise
+        self._count('rendered')
+        return image
+
+    def stats(self):
+        """Render counters and current load for monitoring."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = self._in_flight
+            stats['processes'] = self.processes
+            stats['max_queue'] = self.max_queue
+        return stats
+
+    def shutdown(self):
+        """Stop the renderer processes; the pool starts again on the next render."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self):
+        # Called with the lock held
+        if self._executor is None:
+            # Spawned rather than forked: the children start clean instead of
+            # inheriting a threaded worker's locks and database connections
+            self._executor = ProcessPoolExecutor(max_workers=self.processes,
+                                                 mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_warm_renderer)
+        return self._executor
+
+    def _submit(self, *args):
+        """Submit a render; returns (executor, future)."""
+        for attempt in range(2):
+            with self._lock:
+                executor = self._get_executor()
+            try:
+                return executor, executor.submit(_render, *args)
+            except BrokenProcessPool:
+                # A renderer died; start a fresh pool next time
+                self._restart(executor)
+                raise
+            except RuntimeError:
+                # "cannot schedule new futures after shutdown": another thread shut
+                # the pool down after this one took it; retry once on a fresh pool
+                self._restart(executor)
+                if attempt:
+                    raise
+
+    def _restart(self, executor):
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._stats['restarts'] += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
@@ -0,0 +1,144 @@
+import csv
+import io
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from models import db, User, Prediction
+
+# Rows fetched from the database per round trip while exporting
+EXPORT_FETCH_ROWS = 1000
+# Rows written to the CSV buffer before it is flushed to the client
+EXPORT_FLUSH_ROWS = 500
+
+PREDICTION_HEADER = ['Date', 'User', 'City', 'Population', 'Temperature Increase', 'Urban Density',
+                     'Infrastructure', 'Risk Level', 'Risk Score']
+
+
+def parse_report_date(value, end=False):
+    """
+    Parse a YYYY-MM-DD query parameter.
+
+    With end=True the date is inclusive, so the returned bound is the start
+    of the following day. Empty values mean no bound.
+
+    Raises:
+        ValueError: If the value is not a valid date
+    """
+    if not value:
+        return None
+    date = datetime.strptime(value, '%Y-%m-%d')
+    return date + timedelta(days=1) if end else date
+
+
+def prediction_rows_query(user_id=None, city=None, start=None, end=None):
+    """
+    Select the export columns for predictions, newest first.
+
+    Args:
+        user_id (int): Only this user's predictions; None for all users
+        city (str): Only predictions for this city
+        start (datetime): Earliest prediction date (inclusive)
+        end (datetime): Latest prediction date (exclusive)
+    """
+    query = (
+        select(Prediction.date, User.email, Prediction.city, Prediction.population,
+               Prediction.temperature_increase, Prediction.urban_density, Prediction.infrastructure,
+               Prediction.risk_level, Prediction.risk_score)
+        .join(User, Prediction.user_id == User.id)
+        .order_by(Prediction.date.desc(), Prediction.id.desc())
+    )
+    if user_id is not None:
+        query = query.where(Prediction.user_id == user_id)
+    if city:
+        query = query.where(Prediction.city == city)
+    if start is not None:
+        query = query.where(Prediction.date >= start)
+    if end is not None:
+        query = query.where(Prediction.date < end)
+    return query
+
+
+def iter_prediction_rows(query):
+    """Stream rows for a query in EXPORT_FETCH_ROWS batches instead of loading the full result."""
+    result = db.session.execute(query.execution_options(yield_per=EXPORT_FETCH_ROWS))
+    try:
+        for row in result:
+            yield row
+    finally:
+        result.close()
+
+
+def format_prediction_row(row):
+    """CSV cells for one row of prediction_rows_query()"""
+    date, email, city, population, temperature_increase, urban_density, infrastructure, risk_level, risk_score = row
+    return [
+        date.strftime('%Y-%m-%d %H:%M:%S') if date else '',
+        email,
+        city,
+        population,
+        temperature_increase,
+        urban_density,
+        infrastructure,
+        risk_level,
+        f"{risk_score}%"
+    ]
+
+
+def iter_csv(rows):
+    """
+    Encode an iterable of CSV rows as text chunks.
+
+    Rows are written into one reusable buffer that is flushed every
+    EXPORT_FLUSH_ROWS rows, so memory use does not grow with the export.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % EXPORT_FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_rows(query):
+    """Header and one row per prediction, for the full prediction export."""
+    yield PREDICTION_HEADER
+    for row in iter_prediction_rows(query):
+        yield format_prediction_row(row)
+
+
+def projection_rows(projection):
+    """The report's projection table for a project_city() result."""
+    yield [f"Future Projections ({projection['years'][0]}-{projection['years'][-1]})"]
+    yield ['Year', 'Projected Temperature (°C)', 'Projected Rainfall (mm)', 'Projected Flood Risk (%)']
+
+    for year, temperature, rainfall, risk in zip(projection['years'], projection['temperature'].tolist(),
+                                                 projection['rainfall'].tolist(), projection['risk'].tolist()):
+        yield [year, round(temperature, 1), round(rainfall), f"{round(risk, 1)}%"]
+
+
+def city_report_rows(city, projection, query=None):
+    """
+    Rows of the downloadable city report.
+
+    With a query, every matching prediction is listed (newest first);
+    without one, a single row of sample data for projections.REFERENCE_CITY
+    is used. projection is the project_city() series to report.
+    """
+    yield ['Urban Climate Risk Report']
+    yield ['Generated on', datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
+    yield []
+
+    if query is not None:
+        yield PREDICTION_HEADER
+        for row in iter_prediction_rows(query):
+            yield format_prediction_row(row)
+    else:
+        # Use sample data
+        yield ['City', 'Population', 'Temperature Increase', 'Urban Density', 'Infrastructure', 'Risk Level', 'Risk Score']
+        yield [city, '500000', '1.5', 'medium', 'moderate', 'medium', '55%']
+
+    yield []
+    yield from projection_rows(projection)
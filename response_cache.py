@@ -0,0 +1,64 @@
+import gzip
+import hashlib
+import json
+from flask import Response
+try:
+    import brotli
+except ImportError:
+    # Optional: without it, bodies are offered gzip-compressed and plain
+    brotli = None
+
+# Bodies shorter than this are sent as they are; compression would not pay off
+MIN_COMPRESS_BYTES = 256
+
+
+class CachedBody:
+    """
+    A response body serialized once, with a strong ETag and pre-compressed variants.
+
+    Serving it costs a header lookup and a bytes copy: no serialization or
+    compression per request, and a 304 without a body when the client's
+    copy is current. Each encoding is its own representation with its own
+    strong ETag, as RFC 9110 requires.
+    """
+
+    def __init__(self, body, mimetype='application/json', max_age=3600):
+        self.mimetype = mimetype
+        self.max_age = max_age
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # encoding -> (body, unquoted ETag); None is the uncompressed body
+        self.variants = {None: (body, digest)}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            # mtime=0 keeps the gzip bytes identical across processes and restarts
+            self.variants['gzip'] = (gzip.compress(body, compresslevel=9, mtime=0), f'{digest}-gzip')
+            if brotli is not None:
+                self.variants['br'] = (brotli.compress(body), f'{digest}-br')
+
+    @classmethod
+    def from_json(cls, data, **kwargs):
+        """A CachedBody of compact JSON with sorted keys (stable bytes, so stable ETags)."""
+        return cls(json.dumps(data, separators=(',', ':'), sort_keys=True).encode('utf-8'), **kwargs)
+
+    def select(self, accept_encodings):
+        """The best variant the client accepts: brotli, then gzip, then plain."""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings[encoding]:
+                return encoding
+        return None
+
+    def response(self, request):
+        """A 200 with the negotiated variant, or a 304 if the client already has it."""
+        encoding = self.select(request.accept_encodings)
+        body, etag = self.variants[encoding]
+
+        # If-None-Match uses the weak comparison (RFC 9110 13.1.2); '*' matches too
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype=self.mimetype)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = f'public, max-age={self.max_age}'
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
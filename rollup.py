@@ -0,0 +1,222 @@
+from datetime import datetime
+from sqlalchemy import case, delete, func, insert, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased
+from models import db, CityRollup, Prediction
+
+# Origin of the time axis of the trend sums; recent dates keep them small
+TREND_EPOCH = datetime(2020, 1, 1)
+DAYS_PER_YEAR = 365.25
+
+RISK_LEVELS = ('low', 'medium', 'high')
+LEVEL_COUNTS = {'low': 'low_count', 'medium': 'medium_count', 'high': 'high_count'}
+
+# Columns every running total adds up
+_SUMMED = ('count', 'score_count', 'score_sum', 'low_count', 'medium_count', 'high_count', 'sum_t', 'sum_tt', 'sum_ty')
+
+
+def _days(date):
+    # Stored dates are naive UTC
+    return (date.replace(tzinfo=None) - TREND_EPOCH).total_seconds() / 86400
+
+
+def rollup_deltas(predictions):
+    """
+    Per (user, city) totals of new predictions, ready to be added to CityRollup.
+
+    Args:
+        predictions: Mappings with user_id, city, risk_score, risk_level and
+            date, e.g. ingest.prediction_mappings() rows
+
+    Returns:
+        list: One dict of CityRollup columns per (user_id, city)
+    """
+    deltas = {}
+    for prediction in predictions:
+        key = (prediction['user_id'], prediction['city'])
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = dict.fromkeys(_SUMMED, 0)
+            delta.update(user_id=key[0], city=key[1], min_score=None, max_score=None, latest_date=None,
+                         latest_risk_level=None, latest_risk_score=None)
+        score, level, date = prediction['risk_score'], prediction['risk_level'], prediction['date']
+
+        delta['count'] += 1
+        if level in LEVEL_COUNTS:
+            delta[LEVEL_COUNTS[level]] += 1
+        if score is not None:
+            t = _days(date)
+            delta['score_count'] += 1
+            delta['score_sum'] += score
+            delta['sum_t'] += t
+            delta['sum_tt'] += t * t
+            delta['sum_ty'] += t * score
+            delta['min_score'] = score if delta['min_score'] is None else min(delta['min_score'], score)
+            delta['max_score'] = score if delta['max_score'] is None else max(delta['max_score'], score)
+        # Later rows win ties, as they do in the rebuild (newest date, then highest id)
+        if delta['latest_date'] is None or date >= delta['latest_date']:
+            delta.update(latest_date=date, latest_risk_level=level, latest_risk_score=score)
+    return list(deltas.values())
+
+
+def record_predictions(predictions):
+    """
+    Add new predictions to their CityRollup rows in the current transaction.
+
+    Call it next to the INSERT of the predictions, before the commit, so the
+    rollup and Prediction always change together. One upsert per (user,
+    city) is issued, however many predictions share it.
+    """
+    deltas = rollup_deltas(predictions)
+    if not deltas:
+        return
+    table = CityRollup.__table__
+    statement = sqlite_insert(table)
+    new = statement.excluded
+    newer = (table.c.latest_date.is_(None)) | (new.latest_date >= table.c.latest_date)
+    values = {column: table.c[column] + new[column] for column in _SUMMED}
+    values.update(
+        # SQLite's scalar min()/max() return NULL when either side is NULL
+        min_score=func.min(func.coalesce(table.c.min_score, new.min_score),
+                           func.coalesce(new.min_score, table.c.min_score)),
+        max_score=func.max(func.coalesce(table.c.max_score, new.max_score),
+                           func.coalesce(new.max_score, table.c.max_score)),
+        latest_date=case((newer, new.latest_date), else_=table.c.latest_date),
+        latest_risk_level=case((newer, new.latest_risk_level), else_=table.c.latest_risk_level),
+        latest_risk_score=case((newer, new.latest_risk_score), else_=table.c.latest_risk_score)
+    )
+    db.session.execute(
+        statement.on_conflict_do_update(index_elements=[table.c.user_id, table.c.city], set_=values),
+        deltas
+    )
+
+
+def record_prediction(prediction):
+    """record_predictions() for one flushed Prediction object."""
+    record_predictions([{
+        'user_id': prediction.user_id,
+        'city': prediction.city,
+        'risk_score': prediction.risk_score,
+        'risk_level': prediction.risk_level,
+        'date': prediction.date
+    }])
+
+
+def rebuild_rollups():
+    """
+    Recompute every CityRollup row from Prediction in one transaction.
+
+    For after predictions were changed outside the app's write paths, or
+    to create the rollups of an existing database.
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    latest = aliased(Prediction)
+
+    def latest_value(column):
+        # The newest prediction of the group, served by ix_prediction_user_id_city_date
+        return (
+            select(column)
+            .where(latest.user_id == Prediction.user_id, latest.city == Prediction.city)
+            .order_by(latest.date.desc(), latest.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    score = Prediction.risk_score
+    t = func.julianday(Prediction.date) - func.julianday(literal(TREND_EPOCH.strftime('%Y-%m-%d %H:%M:%S')))
+    scored_t = case((score.is_not(None), t))
+    groups = (
+        select(
+            Prediction.user_id, Prediction.city, func.count(), func.count(score), func.coalesce(func.sum(score), 0.0),
+            func.min(score), func.max(score),
+            *(func.count(case((Prediction.risk_level == level, 1))) for level in RISK_LEVELS),
+            func.max(Prediction.date), latest_value(latest.risk_level), latest_value(latest.risk_score),
+            func.coalesce(func.sum(scored_t), 0.0), func.coalesce(func.sum(scored_t * scored_t), 0.0),
+            func.coalesce(func.sum(scored_t * score), 0.0)
+        )
+        .group_by(Prediction.user_id, Prediction.city)
+    )
+    columns = ['user_id', 'city', 'count', 'score_count', 'score_sum', 'min_score', 'max_score',
+               'low_count', 'medium_count', 'high_count', 'latest_date', 'latest_risk_level', 'latest_risk_score',
+               'sum_t', 'sum_tt', 'sum_ty']
+
+    db.session.execute(delete(CityRollup))
+    db.session.execute(insert(CityRollup).from_select(columns, groups))
+    db.session.commit()
+    return db.session.scalar(select(func.count()).select_from(CityRollup))
+
+
+def combine(rows):
+    """
+    Merge CityRollup rows (e.g. every user's row for one city) into one summary.
+
+    Returns:
+        dict: count, mean, min and max risk_score, risk_counts (level ->
+            count), the latest date, risk level and score, and trend (least
+            squares slope of risk_score in points per year; None with fewer
+            than two distinct prediction times)
+    """
+    totals = dict.fromkeys(_SUMMED, 0)
+    minimum = maximum = latest = None
+    for row in rows:
+        for column in _SUMMED:
+            totals[column] += getattr(row, column)
+        if row.min_score is not None:
+            minimum = row.min_score if minimum is None else min(minimum, row.min_score)
+            maximum = row.max_score if maximum is None else max(maximum, row.max_score)
+        if row.latest_date is not None and (latest is None or row.latest_date > latest.latest_date):
+            latest = row
+
+    n = totals['score_count']
+    trend = None
+    if n >= 2:
+        mean_t = totals['sum_t'] / n
+        variance = totals['sum_tt'] / n - mean_t * mean_t
+        # Dates closer than about a second apart carry no trend
+        if variance > 1e-10:
+            covariance = totals['sum_ty'] / n - mean_t * totals['score_sum'] / n
+            trend = covariance / variance * DAYS_PER_YEAR
+
+    return {
+        'count': totals['count'],
+        'mean_risk_score': totals['score_sum'] / n if n else None,
+        'min_risk_score': minimum,
+        'max_risk_score': maximum,
+        'risk_counts': {level: totals[LEVEL_COUNTS[level]] for level in RISK_LEVELS},
+        'latest_date': latest.latest_date if latest else None,
+        'latest_risk_level': latest.latest_risk_level if latest else None,
+        'latest_risk_score': latest.latest_risk_score if latest else None,
+        'trend': trend
+    }
+
+
+def city_summaries(user_id=None, city=None):
+    """
+    Per-city summaries from the rollup table, sorted by city.
+
+    Args:
+        user_id (int): Only this user's predictions; None for every user
+        city (str): Only this city
+
+    Returns:
+        list: combine() dicts with a 'city' key
+    """
+    # Plain rows: summaries read many rollups and never change them
+    query = select(CityRollup.__table__).order_by(CityRollup.city)
+    if user_id is not None:
+        query = query.where(CityRollup.user_id == user_id)
+    if city:
+        query = query.where(CityRollup.city == city)
+
+    summaries, group, current = [], [], None
+    for row in db.session.execute(query):
+        if group and row.city != current:
+            summaries.append(dict(combine(group), city=current))
+            group = []
+        current = row.city
+        group.append(row)
+    if group:
+        summaries.append(dict(combine(group), city=current))
+    return summaries
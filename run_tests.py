@@ -7,6 +7,25 @@ sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
 # Import test modules
 from tests.test_login import TestLoginFunction
+from tests.test_batch_prediction import TestBatchPrediction
+from tests.test_prediction_plots import TestPredictionPlots
+from tests.test_plot_cache import TestPlotCache
+from tests.test_model_serving import TestModelServing, TestModelArtifact
+from tests.test_attribution import TestAttribution
+from tests.test_startup import TestStartup
+from tests.test_report_export import TestReportExport
+from tests.test_migrations import TestMigrations
+from tests.test_bulk_ingest import TestBulkIngest
+from tests.test_sqlite_profile import TestSqliteProfile
+from tests.test_score_table import TestScoreTable, TestInsights
+from tests.test_projections import TestProjections
+from tests.test_sweep import TestSweep
+from tests.test_uncertainty import TestUncertainty
+from tests.test_render_pool import TestRenderPool
+from tests.test_jobs import TestJobs
+from tests.test_dashboard import TestDashboard
+from tests.test_rollup import TestRollup
+from tests.test_response_cache import TestResponseCache
 
 if __name__ == '__main__':
     # Create a test suite
@@ -14,6 +33,27 @@ if __name__ == '__main__':
     
     # Add test cases using the recommended loader
     test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestLoginFunction))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestBatchPrediction))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestPredictionPlots))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestPlotCache))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestModelServing))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestModelArtifact))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestAttribution))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestStartup))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestReportExport))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestMigrations))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestBulkIngest))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestSqliteProfile))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestScoreTable))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestInsights))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestProjections))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestSweep))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestUncertainty))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestRenderPool))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestJobs))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestDashboard))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestRollup))
+    test_suite.addTest(unittest.defaultTestLoader.loadTestsFromTestCase(TestResponseCache))
     
     # Run the tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,110 @@
+from bisect import bisect_left, bisect_right
+import numpy as np
+from predict_model import rule_based_prediction, generate_insights
+
+# Lookup tables for the discrete part of the input space. rule_based_prediction
+# sees population only through two thresholds, urban_density and infrastructure
+# through three levels each, and temperature_increase linearly, so a score is
+# a few table entries plus the temperature term, and the insights depend only
+# on a temperature band, the two levels and the risk level.
+
+# Population bucket boundaries: <= 500k, <= 1M, > 1M
+POPULATION_THRESHOLDS = (500000, 1000000)
+# Temperature band boundaries used by generate_insights: <= 1.5, <= 2.5, > 2.5
+TEMPERATURE_THRESHOLDS = (1.5, 2.5)
+
+# Level -> table index; unknown values add nothing, exactly like 'low' and 'new'
+DENSITY_INDEX = {'low': 0, 'medium': 1, 'high': 2}
+INFRASTRUCTURE_INDEX = {'new': 0, 'moderate': 1, 'aging': 2}
+RISK_LEVEL_INDEX = {'low': 0, 'medium': 1, 'high': 2}
+# Scores at which risk_level_from_score moves to 'medium' and 'high'
+RISK_LEVEL_THRESHOLDS = (40, 70)
+
+# A member of every bucket / band, for evaluating the rules once per cell
+_POPULATIONS = (0, POPULATION_THRESHOLDS[0] + 1, POPULATION_THRESHOLDS[1] + 1)
+_TEMPERATURES = (0.0, TEMPERATURE_THRESHOLDS[0] + 0.5, TEMPERATURE_THRESHOLDS[1] + 0.5)
+_DENSITIES = sorted(DENSITY_INDEX, key=DENSITY_INDEX.get)
+_INFRASTRUCTURES = sorted(INFRASTRUCTURE_INDEX, key=INFRASTRUCTURE_INDEX.get)
+_RISK_LEVELS = sorted(RISK_LEVEL_INDEX, key=RISK_LEVEL_INDEX.get)
+
+# Points of each factor, from the rules themselves so the two cannot drift
+# apart: the base risk plus the population points per bucket, then the
+# density and infrastructure points per level. Scores add them around the
+# temperature term in rule_based_prediction's order, so the float results
+# are identical, not just equal to within rounding.
+POPULATION_OFFSETS = np.array([rule_based_prediction(population, 0.0, 'low', 'new') for population in _POPULATIONS],
+                              dtype=np.int64)
+DENSITY_POINTS = np.array([rule_based_prediction(0, 0.0, density, 'new') for density in _DENSITIES],
+                          dtype=np.int64) - POPULATION_OFFSETS[0]
+INFRASTRUCTURE_POINTS = np.array([rule_based_prediction(0, 0.0, 'low', infrastructure)
+                                  for infrastructure in _INFRASTRUCTURES], dtype=np.int64) - POPULATION_OFFSETS[0]
+# Every point except the temperature term, indexed [population bucket,
+# density, infrastructure]; exact, as all of them are integers
+BASE_OFFSETS = (POPULATION_OFFSETS[:, None, None] + DENSITY_POINTS[None, :, None]
+                + INFRASTRUCTURE_POINTS[None, None, :])
+for _table in (POPULATION_OFFSETS, DENSITY_POINTS, INFRASTRUCTURE_POINTS, BASE_OFFSETS):
+    _table.flags.writeable = False
+
+# generate_insights output as (risk_factors, recommendations) tuples, indexed
+# [temperature band][density][infrastructure][risk level]; the entries are
+# the tuples generate_insights shares, not copies
+INSIGHTS = tuple(
+    tuple(
+        tuple(
+            tuple(
+                generate_insights(temperature, density, infrastructure, level)
+                for level in _RISK_LEVELS
+            )
+            for infrastructure in _INFRASTRUCTURES
+        )
+        for density in _DENSITIES
+    )
+    for temperature in _TEMPERATURES
+)
+
+# Tuples index faster than NumPy arrays for one score at a time
+_POPULATION_OFFSETS = tuple(POPULATION_OFFSETS.tolist())
+_DENSITY_POINTS = tuple(DENSITY_POINTS.tolist())
+_INFRASTRUCTURE_POINTS = tuple(INFRASTRUCTURE_POINTS.tolist())
+
+
+def population_bucket(population):
+    """Index of the population bucket (0, 1 or 2)."""
+    return bisect_left(POPULATION_THRESHOLDS, population)
+
+
+def temperature_band(temperature_increase):
+    """Index of the generate_insights temperature band (0, 1 or 2)."""
+    return bisect_left(TEMPERATURE_THRESHOLDS, temperature_increase)
+
+
+def lookup_score(population, temperature_increase, urban_density, infrastructure):
+    """O(1) rule_based_prediction: three table lookups around the temperature term."""
+    return min(_POPULATION_OFFSETS[population_bucket(population)] + temperature_increase * 10
+               + _DENSITY_POINTS[DENSITY_INDEX.get(urban_density, 0)]
+               + _INFRASTRUCTURE_POINTS[INFRASTRUCTURE_INDEX.get(infrastructure, 0)], 100)
+
+
+def lookup_insights(temperature_increase, urban_density, infrastructure, risk_level):
+    """generate_insights from the precomputed table, as shared (risk_factors, recommendations) tuples."""
+    return INSIGHTS[temperature_band(temperature_increase)][DENSITY_INDEX.get(urban_density, 0)][
+        INFRASTRUCTURE_INDEX.get(infrastructure, 0)][RISK_LEVEL_INDEX.get(risk_level, 0)]
+
+
+def lookup_prediction(population, temperature_increase, urban_density, infrastructure):
+    """
+    Score a city and look up its insights in one pass over the tables.
+
+    Returns:
+        tuple: (risk_score, risk_level, risk_factors, recommendations), equal
+            to rule_based_prediction, risk_level_from_score and generate_insights
+    """
+    density = DENSITY_INDEX.get(urban_density, 0)
+    infra = INFRASTRUCTURE_INDEX.get(infrastructure, 0)
+    risk_score = min(_POPULATION_OFFSETS[bisect_left(POPULATION_THRESHOLDS, population)] + temperature_increase * 10
+                     + _DENSITY_POINTS[density] + _INFRASTRUCTURE_POINTS[infra], 100)
+    level = bisect_right(RISK_LEVEL_THRESHOLDS, risk_score)
+    band = bisect_left(TEMPERATURE_THRESHOLDS, temperature_increase)
+    risk_factors, recommendations = INSIGHTS[band][density][infra][level]
+    return risk_score, _RISK_LEVELS[level], risk_factors, recommendations
+
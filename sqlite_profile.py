@@ -0,0 +1,80 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Engine settings by profile name; select one with the SQLITE_PROFILE config key.
+# 'default' leaves SQLite and the pool as they come.
+SQLITE_PROFILES = {
+    'default': {
+        'pragmas': {},
+        'engine_options': {}
+    },
+    # Tuned for several gunicorn workers sharing one database file
+    'production': {
+        'pragmas': {
+            # Readers no longer block the writer and a commit appends to the log
+            'journal_mode': 'WAL',
+            # In WAL mode only checkpoints fsync; a crash may lose the last
+            # commits but cannot corrupt the database
+            'synchronous': 'NORMAL',
+            # Read pages straight from the OS page cache
+            'mmap_size': 256 * 1024 * 1024,
+            # Wait for the write lock instead of failing with "database is locked"
+            'busy_timeout': 10000
+        },
+        # Pool sizing; only used for database files (see engine_options)
+        'engine_options': {
+            'pool_size': 10,
+            'max_overflow': 10,
+            'pool_timeout': 30
+        }
+    }
+}
+
+
+def sqlite_profile(name):
+    """
+    Look up an engine profile by name.
+
+    Raises:
+        ValueError: If there is no such profile
+    """
+    if name not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile '{name}' (expected one of: {', '.join(SQLITE_PROFILES)})")
+    return SQLITE_PROFILES[name]
+
+
+def is_sqlite_file(uri):
+    """Whether a database URI names an SQLite database file (not an in-memory one)."""
+    url = make_url(uri)
+    return (url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+            and url.query.get('mode') != 'memory')
+
+
+def engine_options(name, uri=None):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a profile.
+
+    The pool options only apply to SQLite database files: in-memory databases
+    use a StaticPool, which create_engine() refuses to size.
+
+    Args:
+        name (str): Profile name
+        uri (str): The database URI; None for a database file
+    """
+    if uri is not None and not is_sqlite_file(uri):
+        return {}
+    return dict(sqlite_profile(name)['engine_options'])
+
+
+def install_pragmas(engine, name):
+    """Run the profile's PRAGMA statements on every new connection of a SQLite engine."""
+    pragmas = sqlite_profile(name)['pragmas']
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f'PRAGMA {pragma}={value}')
+        cursor.close()
@@ -0,0 +1,105 @@
+import numpy as np
+from score_table import (BASE_OFFSETS, DENSITY_INDEX, DENSITY_POINTS, INFRASTRUCTURE_INDEX, INFRASTRUCTURE_POINTS,
+                         POPULATION_OFFSETS, RISK_LEVEL_THRESHOLDS, population_bucket)
+
+# PredictionForm's temperature_increase bounds and the slider step
+TEMPERATURE_RANGE = (0.1, 5.0)
+TEMPERATURE_STEP = 0.1
+# Most (population x temperature) points one sweep may evaluate
+MAX_SWEEP_POINTS = 100000
+
+# Risk levels entered at each of RISK_LEVEL_THRESHOLDS
+THRESHOLD_LEVELS = ('medium', 'high')
+
+
+def temperature_grid(start=TEMPERATURE_RANGE[0], stop=TEMPERATURE_RANGE[1], step=TEMPERATURE_STEP,
+                     max_points=MAX_SWEEP_POINTS):
+    """
+    Evenly spaced temperatures from start up to stop (inclusive when on the grid).
+
+    The number of points is checked before anything is allocated, so a
+    tiny step over a huge range is refused instead of exhausting memory.
+
+    Raises:
+        ValueError: If the range or step is invalid or not finite, or the
+            grid would have more than max_points points
+    """
+    if not all(np.isfinite((start, stop, step))):
+        raise ValueError("temperature range and step must be finite numbers")
+    if step <= 0 or stop < start:
+        raise ValueError("temperature range must satisfy start <= stop with a positive step")
+    # Never past stop; the tolerance keeps 0.1 .. 5.0 / 0.1 from losing its last point
+    count = np.floor((stop - start) / step + 1e-9) + 1
+    if count > max_points:
+        raise ValueError(f"sweep is limited to {max_points} points")
+    # Rounded so a 0.1 step yields 0.1, 0.2, ... rather than 0.30000000000000004
+    return np.round(start + np.arange(int(count)) * step, 10)
+
+
+def threshold_crossings(offset, start, stop):
+    """
+    Temperatures at which a score of offset + 10 * temperature reaches each risk threshold.
+
+    The score is linear in the temperature, so the crossing of threshold t
+    is (t - offset) / 10; crossings outside [start, stop] are None.
+
+    Returns:
+        dict: level -> crossing temperature or None, for THRESHOLD_LEVELS
+    """
+    crossings = {}
+    for level, threshold in zip(THRESHOLD_LEVELS, RISK_LEVEL_THRESHOLDS):
+        crossing = (threshold - offset) / 10
+        crossings[level] = crossing if start <= crossing <= stop else None
+    return crossings
+
+
+def sweep(populations, urban_density, infrastructure, temperatures):
+    """
+    Score one city's fixed attributes over a grid of temperatures (and populations).
+
+    Args:
+        populations (list): Populations to sweep; one curve per population
+        urban_density (str): Urban density level
+        infrastructure (str): Infrastructure age level
+        temperatures (array-like): Temperature increases to evaluate
+
+    Returns:
+        dict: 'temperature_increase' plus one curve per population with
+            'risk_score', 'risk_level' and analytic threshold 'crossings'
+
+    Raises:
+        ValueError: If the grid is empty or larger than MAX_SWEEP_POINTS
+    """
+    temperatures = np.asarray(temperatures, dtype=float)
+    if not np.isfinite(np.asarray(populations, dtype=float)).all():
+        raise ValueError("populations must be finite numbers")
+    populations = [int(population) for population in populations]
+    if not len(temperatures) or not populations:
+        raise ValueError("sweep needs at least one population and one temperature")
+    if len(temperatures) * len(populations) > MAX_SWEEP_POINTS:
+        raise ValueError(f"sweep is limited to {MAX_SWEEP_POINTS} points")
+
+    # One offset per population; the whole grid is then a single broadcast, with
+    # the points added in rule_based_prediction's order so the scores are identical
+    buckets = [population_bucket(population) for population in populations]
+    density, infra = DENSITY_INDEX.get(urban_density, 0), INFRASTRUCTURE_INDEX.get(infrastructure, 0)
+    offsets = BASE_OFFSETS[buckets, density, infra]
+    scores = POPULATION_OFFSETS[buckets][:, None] + temperatures[None, :] * 10
+    scores += DENSITY_POINTS[density]
+    scores += INFRASTRUCTURE_POINTS[infra]
+    scores = np.minimum(scores, 100)
+    levels = np.array(('low',) + THRESHOLD_LEVELS)[np.searchsorted(RISK_LEVEL_THRESHOLDS, scores, side='right')]
+
+    start, stop = float(temperatures.min()), float(temperatures.max())
+    return {
+        'temperature_increase': temperatures.tolist(),
+        'curves': [
+            {
+                'population': population,
+                'risk_score': scores[row].tolist(),
+                'risk_level': levels[row].tolist(),
+                'crossings': threshold_crossings(int(offsets[row]), start, stop)
+            }
+            for row, population in enumerate(populations)
+        ]
+    }
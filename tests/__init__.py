@@ -0,0 +1,22 @@
+"""
+Every test runs against a scratch database, never instance/climate_risk.db.
+
+app.py creates its engine on import, so the database URI is set here,
+before any test module imports the app, and the schema is created once.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+_directory = tempfile.mkdtemp(prefix='climate-risk-tests-')
+atexit.register(shutil.rmtree, _directory, True)
+
+TEST_DATABASE = os.path.join(_directory, 'test.db')
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + TEST_DATABASE
+
+from app import app
+from models import db
+
+with app.app_context():
+    db.create_all()
@@ -0,0 +1,31 @@
+import unittest
+from app import app, db
+from tests import TEST_DATABASE
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Runs each test in an app context, starting from empty tables of the scratch test database."""
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        if db.engine.url.database != TEST_DATABASE:
+            self.app_context.pop()
+            raise RuntimeError(f"Refusing to reset {db.engine.url}: tests must run on {TEST_DATABASE}")
+        # Start from empty tables so each test sees only its own rows
+        db.drop_all()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        # Leave empty tables behind for the tests that use the database without this fixture
+        db.drop_all()
+        db.create_all()
+        self.app_context.pop()
+
+    def login(self, user):
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
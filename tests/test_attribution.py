@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from app import app
+from attribution import explain_batch, explain_rule_scores, FACTORS
+from predict_model import predict_risk_batch
+
+class TestAttribution(unittest.TestCase):
+    def setUp(self):
+        """Random cities covering every factor level and the 100 point cap"""
+        rng = np.random.default_rng(0)
+        n = 2000
+        self.data = {
+            'population': rng.integers(1000, 10000000, n),
+            'temperature_increase': rng.uniform(0.1, 5.0, n),
+            'urban_density': rng.choice(['low', 'medium', 'high'], n),
+            'infrastructure': rng.choice(['new', 'moderate', 'aging'], n)
+        }
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+    def test_rule_contributions_sum_to_score(self):
+        """Test that the rule decomposition is exact"""
+        explanation = explain_batch(self.data, use_model=False)
+        self.assertNotIn('model', explanation)
+        total = sum(explanation['rule'].values())
+        np.testing.assert_array_equal(total, predict_risk_batch(self.data)['risk_score'])
+
+    def test_rule_contributions_per_factor(self):
+        """Test the points credited to each factor for a capped city"""
+        explanation = explain_rule_scores([2000000], [5.0], ['high'], ['aging'])
+        self.assertEqual({key: values[0] for key, values in explanation.items()}, {
+            'base': 20.0, 'population': 20.0, 'temperature_increase': 50.0,
+            'urban_density': 15.0, 'infrastructure': 20.0, 'cap': -25.0
+        })
+
+    def test_model_contributions_sum_to_probability(self):
+        """Test that tree path contributions add up to the model probability"""
+        explanation = explain_batch(self.data)
+        total = sum(explanation['model'].values())
+        probability = predict_risk_batch(self.data, use_model=True)['high_risk_probability']
+        np.testing.assert_allclose(total, probability, atol=1e-12)
+        self.assertEqual(set(explanation['model']), {'base'} | set(FACTORS))
+
+    def test_invalid_input_is_rejected_like_scoring(self):
+        """Test that explain_batch refuses exactly what predict_risk_batch refuses, with the same error"""
+        for data in ({'population': [1000]},
+                     dict(self.data, urban_density='low'),
+                     dict(self.data, population=self.data['population'][:-1]),
+                     dict(self.data, temperature_increase=np.append(self.data['temperature_increase'][:-1], np.nan))):
+            with self.assertRaises(ValueError) as scoring:
+                predict_risk_batch(data)
+            with self.assertRaises(ValueError) as explaining:
+                explain_batch(data, use_model=False)
+            self.assertEqual(str(explaining.exception), str(scoring.exception))
+
+    def test_batch_endpoint_explain(self):
+        """Test that the batch endpoint returns contributions on request"""
+        response = self.client.post('/api/predict/batch?explain=true', json=[
+            {'population': 600000, 'temperature_increase': 1.5, 'urban_density': 'medium', 'infrastructure': 'moderate'}
+        ])
+        contributions = response.get_json()['contributions']
+        self.assertEqual(contributions['rule']['population'], [10.0])
+        self.assertNotIn('model', contributions)
+
+if __name__ == '__main__':
+    unittest.main()
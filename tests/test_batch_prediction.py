@@ -0,0 +1,110 @@
+import unittest
+import numpy as np
+from app import app
+from predict_model import rule_based_prediction, risk_level_from_score, predict_risk_batch
+
+class TestBatchPrediction(unittest.TestCase):
+    def setUp(self):
+        """Build a grid of inputs covering every scoring branch"""
+        self.rows = [
+            (population, temperature_increase, urban_density, infrastructure)
+            for population in (1000, 500000, 500001, 1000000, 1000001, 10000000)
+            for temperature_increase in (0.1, 1.5, 2.7, 5.0)
+            for urban_density in ('low', 'medium', 'high')
+            for infrastructure in ('new', 'moderate', 'aging')
+        ]
+        self.columns = {
+            'population': [row[0] for row in self.rows],
+            'temperature_increase': [row[1] for row in self.rows],
+            'urban_density': [row[2] for row in self.rows],
+            'infrastructure': [row[3] for row in self.rows]
+        }
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+    def test_batch_matches_scalar_path(self):
+        """Test that batch scores and levels equal the scalar results"""
+        result = predict_risk_batch(self.columns)
+        expected_scores = [rule_based_prediction(*row) for row in self.rows]
+        self.assertEqual(result['risk_score'].tolist(), expected_scores)
+        self.assertEqual(result['risk_level'].tolist(), [risk_level_from_score(s) for s in expected_scores])
+
+    def test_batch_accepts_dataframe(self):
+        """Test that a pandas DataFrame is scored like a column mapping"""
+        import pandas as pd
+        result = predict_risk_batch(pd.DataFrame(self.columns))
+        np.testing.assert_array_equal(result['risk_score'], predict_risk_batch(self.columns)['risk_score'])
+
+    def test_batch_missing_column(self):
+        """Test that missing columns are reported"""
+        with self.assertRaises(ValueError):
+            predict_risk_batch({'population': [1000]})
+
+    def test_batch_endpoint_json(self):
+        """Test the batch endpoint with a list of JSON records"""
+        response = self.client.post('/api/predict/batch', json=[
+            {'city': 'A', 'population': 2000000, 'temperature_increase': 3.0, 'urban_density': 'high', 'infrastructure': 'aging'},
+            {'city': 'B', 'population': 5000, 'temperature_increase': 0.5, 'urban_density': 'low', 'infrastructure': 'new'}
+        ])
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(data['city'], ['A', 'B'])
+        self.assertEqual(data['risk_level'], ['high', 'low'])
+
+    def test_batch_endpoint_csv(self):
+        """Test the batch endpoint with a CSV body"""
+        body = (
+            'city,population,temperature_increase,urban_density,infrastructure\n'
+            'A,600000,1.5,medium,moderate\n'
+        )
+        response = self.client.post('/api/predict/batch', data=body, content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['risk_score'], [rule_based_prediction(600000, 1.5, 'medium', 'moderate')])
+
+    def test_batch_endpoint_rejects_bad_body(self):
+        """Test that malformed bodies return 400"""
+        response = self.client.post('/api/predict/batch', json=[{'population': 'many'}])
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_endpoint_rejects_incomplete_rows(self):
+        """Test that rows missing a required field return 400"""
+        city = {'city': 'A', 'population': 600000, 'temperature_increase': 1.5, 'urban_density': 'medium',
+                'infrastructure': 'moderate'}
+        for column in ('population', 'temperature_increase', 'urban_density'):
+            row = {key: value for key, value in city.items() if key != column}
+            response = self.client.post('/api/predict/batch', json=[city, row])
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(column, response.get_json()['error'])
+        body = 'city,population,temperature_increase,urban_density,infrastructure\nA,600000,,medium,moderate\n'
+        response = self.client.post('/api/predict/batch', data=body, content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_rejects_unequal_columns(self):
+        """Test that columns of different lengths are not broadcast"""
+        columns = dict(self.columns, temperature_increase=[1.0])
+        with self.assertRaises(ValueError):
+            predict_risk_batch(columns)
+        response = self.client.post('/api/predict/batch', json={
+            'population': [1000, 2000], 'temperature_increase': [1.0], 'urban_density': ['low', 'low'],
+            'infrastructure': ['new', 'new']})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/predict/batch', json=dict(self.columns, city=['A']))
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_rejects_scalar_columns(self):
+        """Test that columns must be lists"""
+        response = self.client.post('/api/predict/batch', json={
+            'population': 5000, 'temperature_increase': 1.0, 'urban_density': 'low', 'infrastructure': 'new'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_rejects_non_finite_values(self):
+        """Test that missing, NaN and infinite numbers are rejected"""
+        for value in (None, float('nan'), float('inf'), 'many'):
+            with self.assertRaises(ValueError):
+                predict_risk_batch(dict(self.columns, population=[value] + self.columns['population'][1:]))
+        with self.assertRaises(ValueError):
+            predict_risk_batch(dict(self.columns, urban_density=[None] + self.columns['urban_density'][1:]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+from app import app, db
+from tests.helpers import DatabaseTestCase
+from models import User, Prediction
+from werkzeug.security import generate_password_hash
+from predict_model import rule_based_prediction
+from ingest import insert_predictions, score_and_store, rescore_stored_predictions
+
+class TestBulkIngest(DatabaseTestCase):
+    def setUp(self):
+        """Start from empty tables with one user"""
+        super().setUp()
+        self.user = User(name='User', email='user@example.com', password=generate_password_hash('password123'))
+        db.session.add(self.user)
+        db.session.commit()
+        self.columns = {
+            'city': ['A', 'B', 'C', 'D', 'E'],
+            'population': [2000000, 5000, 600000, 1500000, 800000],
+            'temperature_increase': [3.0, 0.5, 1.5, 2.0, 4.5],
+            'urban_density': ['high', 'low', 'medium', 'high', 'low'],
+            'infrastructure': ['aging', 'new', 'moderate', 'new', 'aging']
+        }
+
+    def test_score_and_store(self):
+        """Test that bulk rows match the per-row scoring path, in batches of the given size"""
+        result, stats = score_and_store(self.user.id, self.columns, batch_size=2)
+        self.assertEqual((stats['rows'], stats['batches']), (5, 3))
+        stored = Prediction.query.order_by(Prediction.id).all()
+        self.assertEqual([p.city for p in stored], self.columns['city'])
+        for prediction in stored:
+            self.assertEqual(prediction.user_id, self.user.id)
+            self.assertEqual(prediction.risk_score, rule_based_prediction(
+                prediction.population, prediction.temperature_increase,
+                prediction.urban_density, prediction.infrastructure))
+
+    def test_score_and_store_requires_city(self):
+        """Test that rows without a city are rejected before anything is written"""
+        columns = dict(self.columns)
+        del columns['city']
+        with self.assertRaises(ValueError):
+            score_and_store(self.user.id, columns)
+        self.assertEqual(Prediction.query.count(), 0)
+
+    def test_score_and_store_requires_city_names(self):
+        """Test that a row without a city name is rejected and no batch of the request is stored"""
+        for city in (None, '', '  ', 5):
+            columns = dict(self.columns, city=['A', 'B', 'C', city, 'E'])
+            with self.assertRaises(ValueError):
+                score_and_store(self.user.id, columns, batch_size=2)
+        self.assertEqual(Prediction.query.count(), 0)
+
+    def test_score_and_store_parses_populations(self):
+        """Test that populations are parsed like the unsaved scoring path parses them"""
+        columns = dict(self.columns, population=[1e6, '600000.5', '5000', 2000000.0, 800000])
+        score_and_store(self.user.id, columns)
+        self.assertEqual([p.population for p in Prediction.query.order_by(Prediction.id)],
+                         [1000000, 600000, 5000, 2000000, 800000])
+
+    def test_failed_store_writes_nothing(self):
+        """Test that an error in a later batch rolls back the batches written before it"""
+        from rollup import record_predictions
+        calls = []
+
+        def fail_on_second_batch(batch):
+            calls.append(len(batch))
+            if len(calls) == 2:
+                raise RuntimeError('Disk full')
+            record_predictions(batch)
+
+        with mock.patch('ingest.record_predictions', side_effect=fail_on_second_batch):
+            with self.assertRaises(RuntimeError):
+                score_and_store(self.user.id, self.columns, batch_size=2)
+        self.assertEqual(Prediction.query.count(), 0)
+
+    def test_rescore_latest_predictions(self):
+        """Test that only the latest prediction per user and city is re-scored"""
+        insert_predictions([
+            {'user_id': self.user.id, 'city': 'A', 'population': 1000, 'temperature_increase': 1.0,
+             'urban_density': 'low', 'infrastructure': 'new', 'risk_level': 'low', 'risk_score': 0.0,
+             'date': datetime(2024, 1, 1)},
+            {'user_id': self.user.id, 'city': 'A', 'population': 2000000, 'temperature_increase': 3.0,
+             'urban_density': 'high', 'infrastructure': 'aging', 'risk_level': 'low', 'risk_score': 0.0,
+             'date': datetime(2024, 1, 2)},
+            {'user_id': self.user.id, 'city': 'B', 'population': 5000, 'temperature_increase': 0.5,
+             'urban_density': 'low', 'infrastructure': 'new', 'risk_level': 'low', 'risk_score': 0.0,
+             'date': datetime(2024, 1, 1)}
+        ])
+        stats = rescore_stored_predictions(batch_size=1)
+        self.assertEqual((stats['rows'], stats['batches']), (2, 2))
+        latest = Prediction.query.filter_by(city='A').order_by(Prediction.id.desc()).first()
+        self.assertEqual(latest.population, 2000000)
+        self.assertEqual(latest.risk_score, rule_based_prediction(2000000, 3.0, 'high', 'aging'))
+        self.assertEqual(Prediction.query.count(), 5)
+
+    def test_batch_endpoint_save_requires_login(self):
+        """Test that saving from the batch endpoint needs an account"""
+        response = self.client.post('/api/predict/batch?save=true', json=self.columns)
+        self.assertEqual(response.status_code, 401)
+
+    def test_batch_endpoint_save(self):
+        """Test that the batch endpoint stores scores for the logged-in user"""
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.user.id)
+        response = self.client.post('/api/predict/batch?save=true', json=self.columns)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['saved'], 5)
+        self.assertEqual(Prediction.query.filter_by(user_id=self.user.id).count(), 5)
+
+if __name__ == '__main__':
+    unittest.main()
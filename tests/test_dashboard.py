@@ -0,0 +1,96 @@
+import re
+import unittest
+from datetime import datetime, timedelta
+from app import app, db
+from tests.helpers import DatabaseTestCase
+from models import User, Prediction
+from werkzeug.security import generate_password_hash
+from ingest import insert_predictions
+from dashboard import DASHBOARD_PAGE_SIZE, prediction_summary, recent_predictions
+
+class TestDashboard(DatabaseTestCase):
+    def setUp(self):
+        """Start from empty tables with two users, one of them owning predictions"""
+        super().setUp()
+        self.user = User(name='User', email='user@example.com', password=generate_password_hash('password123'))
+        self.other = User(name='Other', email='other@example.com', password=generate_password_hash('password123'))
+        db.session.add_all([self.user, self.other])
+        db.session.commit()
+
+        start = datetime(2026, 1, 1)
+        self.scores = [float(10 + (i * 7) % 90) for i in range(45)]
+        insert_predictions([
+            {'user_id': self.user.id, 'city': f'City {i}', 'population': 500000, 'temperature_increase': 1.5,
+             'urban_density': 'medium', 'infrastructure': 'moderate',
+             'risk_level': 'high' if score >= 70 else 'medium' if score >= 40 else 'low',
+             # Pairs of rows share a timestamp, so the id breaks ties
+             'risk_score': score, 'date': start + timedelta(hours=i // 2)}
+            for i, score in enumerate(self.scores)
+        ])
+        insert_predictions([{'user_id': self.other.id, 'city': 'Elsewhere', 'population': 1000,
+                             'temperature_increase': 0.5, 'urban_density': 'low', 'infrastructure': 'new',
+                             'risk_level': 'low', 'risk_score': 25.0, 'date': start}])
+
+    def test_aggregates(self):
+        """Test that the SQL aggregates match the predictions they summarize"""
+        summary = prediction_summary(self.user.id)
+        self.assertEqual(summary['count'], 45)
+        self.assertAlmostEqual(summary['average_risk'], sum(self.scores) / 45)
+        self.assertEqual(summary['last_date'], datetime(2026, 1, 1) + timedelta(hours=22))
+        counts = summary['risk_counts']
+        self.assertEqual(sum(counts.values()), 45)
+        self.assertEqual(counts['high'], sum(score >= 70 for score in self.scores))
+        self.assertEqual(prediction_summary(12345), {'count': 0, 'average_risk': None, 'last_date': None,
+                                                     'risk_counts': {'low': 0, 'medium': 0, 'high': 0}})
+
+    def test_keyset_pages_cover_every_prediction_once(self):
+        """Test that following the cursors visits every prediction once, newest first"""
+        expected = [p.id for p in Prediction.query.filter_by(user_id=self.user.id)
+                    .order_by(Prediction.date.desc(), Prediction.id.desc())]
+        seen, before, pages = [], None, 0
+        while True:
+            predictions, before = recent_predictions(self.user.id, before)
+            seen.extend(p.id for p in predictions)
+            pages += 1
+            if before is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, -(-45 // DASHBOARD_PAGE_SIZE))
+        other_id = Prediction.query.filter_by(user_id=self.other.id).first().id
+        with self.assertRaises(ValueError):
+            recent_predictions(self.user.id, other_id)
+
+    def test_dashboard_page(self):
+        """Test that the dashboard renders totals and links the next page"""
+        self.login(self.user)
+        response = self.client.get('/dashboard')
+        self.assertEqual(response.status_code, 200)
+        html = response.get_data(as_text=True)
+        self.assertIn('<h2 class="mb-0">45</h2>', html)
+        self.assertEqual(html.count('<td>City '), DASHBOARD_PAGE_SIZE)
+        older = re.search(r'href="(/dashboard\?before=\d+)"', html).group(1)
+
+        html = self.client.get(older).get_data(as_text=True)
+        self.assertEqual(html.count('<td>City '), DASHBOARD_PAGE_SIZE)
+        self.assertIn('Newest', html)
+        self.assertNotIn('Elsewhere', html)
+
+    def test_dashboard_requires_login(self):
+        """Test that anonymous users are sent to the login page"""
+        self.assertEqual(self.client.get('/dashboard').status_code, 302)
+
+    def test_dashboard_rejects_bad_cursors(self):
+        """Test that cursors of other users' predictions and non-numeric cursors are rejected"""
+        self.login(self.user)
+        other_id = Prediction.query.filter_by(user_id=self.other.id).first().id
+        self.assertEqual(self.client.get(f'/dashboard?before={other_id}').status_code, 400)
+        self.assertEqual(self.client.get('/dashboard?before=abc').status_code, 400)
+
+    def test_predictions_relationship_is_a_query(self):
+        """Test that User.predictions no longer loads the whole list"""
+        self.assertEqual(self.user.predictions.count(), 45)
+        self.assertEqual(self.user.predictions.filter_by(risk_level='high').count(),
+                         sum(score >= 70 for score in self.scores))
+
+if __name__ == '__main__':
+    unittest.main()
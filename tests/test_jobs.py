@@ -0,0 +1,189 @@
+import csv
+import io
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+from sqlalchemy import update
+from app import app, db, job_runner
+from tests.helpers import DatabaseTestCase
+from models import User, Job, JobChunk
+from werkzeug.security import generate_password_hash
+from predict_model import rule_based_prediction
+from jobs import MAX_JOB_ATTEMPTS, claim_job, enqueue_job, run_job, run_pending_jobs
+
+class TestJobs(DatabaseTestCase):
+    def setUp(self):
+        """Start from empty tables with jobs run explicitly by the test"""
+        app.config['JOBS_IN_PROCESS'] = False
+        super().setUp()
+        self.cities = [
+            {'city': f'City {i}', 'population': 1000 + i * 150000, 'temperature_increase': round(0.1 + i * 0.2, 1),
+             'urban_density': ('low', 'medium', 'high')[i % 3], 'infrastructure': ('new', 'moderate', 'aging')[i % 3]}
+            for i in range(25)
+        ]
+
+    def tearDown(self):
+        app.config['JOBS_IN_PROCESS'] = True
+        super().tearDown()
+
+    def test_job_lifecycle(self):
+        """Test queueing, chunked progress and the downloadable result"""
+        response = self.client.post('/api/jobs', json=self.cities)
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['id']
+        self.assertTrue(response.headers['Location'].endswith(f'/api/jobs/{job_id}'))
+        status = self.client.get(f'/api/jobs/{job_id}').get_json()
+        self.assertEqual((status['status'], status['processed'], status['total']), ('queued', 0, 25))
+        self.assertEqual(self.client.get(f'/api/jobs/{job_id}/result.csv').status_code, 409)
+
+        self.assertEqual(run_pending_jobs(chunk_size=10), 1)
+        self.assertEqual(JobChunk.query.filter_by(job_id=job_id).count(), 3)
+        status = self.client.get(f'/api/jobs/{job_id}').get_json()
+        self.assertEqual((status['status'], status['processed'], status['progress']), ('done', 25, 1.0))
+
+        result = self.client.get(status['result_url'])
+        self.assertEqual(result.mimetype, 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(result.get_data(as_text=True))))
+        self.assertEqual([row['city'] for row in rows], [city['city'] for city in self.cities])
+        for row, city in zip(rows, self.cities):
+            self.assertEqual(float(row['risk_score']), rule_based_prediction(
+                city['population'], city['temperature_increase'], city['urban_density'], city['infrastructure']))
+
+    def test_claim_is_exclusive_and_in_order(self):
+        """Test that each queued job is claimed exactly once, oldest first"""
+        first = enqueue_job({'population': [1000], 'temperature_increase': [1.0],
+                             'urban_density': ['low'], 'infrastructure': ['new']})
+        second = enqueue_job({'population': [2000], 'temperature_increase': [2.0],
+                              'urban_density': ['low'], 'infrastructure': ['new']})
+        self.assertEqual(claim_job().id, first.id)
+        self.assertEqual(claim_job().id, second.id)
+        self.assertIsNone(claim_job())
+        self.assertEqual(db.session.get(Job, first.id).status, 'running')
+
+    def test_failed_job(self):
+        """Test that a job whose rows cannot be scored is marked failed with the error"""
+        job = enqueue_job({'population': [1000, 2000], 'temperature_increase': [1.0, 2.0],
+                           'urban_density': ['low', 'low'], 'infrastructure': ['new', 'new']})
+        with mock.patch('predict_model.predict_risk_batch', side_effect=RuntimeError('Scoring failed')):
+            run_job(claim_job())
+        status = self.client.get(f'/api/jobs/{job.id}').get_json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertTrue(status['error'])
+        self.assertEqual(self.client.get(f'/api/jobs/{job.id}/result.csv').status_code, 409)
+
+    def test_invalid_batches_are_rejected(self):
+        """Test that missing and ragged columns are rejected before queueing"""
+        self.assertEqual(self.client.post('/api/jobs', json={'population': [1000]}).status_code, 400)
+        response = self.client.post('/api/jobs', json={'population': [1000, 2000], 'temperature_increase': [1.0],
+                                                       'urban_density': ['low'], 'infrastructure': ['new']})
+        self.assertEqual(response.status_code, 400)
+        # A string is not a column of values; list() would split it into characters
+        with self.assertRaises(ValueError):
+            enqueue_job({'population': [1000, 2000, 3000], 'temperature_increase': [1.0, 2.0, 3.0],
+                         'urban_density': 'low', 'infrastructure': ['new', 'new', 'new']})
+        with self.assertRaises(ValueError):
+            enqueue_job({'population': [1000, 2000], 'temperature_increase': [1.0, 'hot'],
+                         'urban_density': ['low', 'low'], 'infrastructure': ['new', 'new']})
+        self.assertEqual(Job.query.count(), 0)
+
+    def expire_lease(self, job_id):
+        """Age a running job's heartbeat as if its worker died an hour ago"""
+        db.session.execute(update(Job).where(Job.id == job_id)
+                           .values(heartbeat_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+        db.session.commit()
+
+    def test_abandoned_job_resumes(self):
+        """Test that a job whose worker died is claimed again and resumes after its last committed chunk"""
+        job_id = enqueue_job({column: [city[column] for city in self.cities] for column in self.cities[0]}).id
+        job = claim_job()
+        from predict_model import predict_risk_batch
+        calls = []
+
+        def die_on_second_chunk(chunk, use_model=False):
+            calls.append(len(chunk['population']))
+            if len(calls) == 2:
+                raise KeyboardInterrupt  # Not handled by run_job, like a killed worker
+            return predict_risk_batch(chunk, use_model)
+
+        with mock.patch('predict_model.predict_risk_batch', side_effect=die_on_second_chunk):
+            with self.assertRaises(KeyboardInterrupt):
+                run_job(job, chunk_size=10)
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        self.assertEqual((job.status, job.processed, job.chunks.count()), ('running', 10, 1))
+        self.assertIsNone(claim_job())  # The lease has not expired yet
+
+        self.expire_lease(job_id)
+        job = claim_job()
+        self.assertEqual((job.id, job.attempts), (job_id, 2))
+        with mock.patch('predict_model.predict_risk_batch', side_effect=die_on_second_chunk):
+            run_job(job, chunk_size=10)
+        self.assertEqual(calls[2:], [10, 5])  # Only the cities after the first chunk were scored again
+        status = self.client.get(f'/api/jobs/{job_id}').get_json()
+        self.assertEqual((status['status'], status['processed']), ('done', 25))
+        rows = list(csv.DictReader(io.StringIO(self.client.get(status['result_url']).get_data(as_text=True))))
+        self.assertEqual([row['city'] for row in rows], [city['city'] for city in self.cities])
+
+    def test_worker_without_lease_stops(self):
+        """Test that a worker whose job was taken over writes no chunks or progress"""
+        job = enqueue_job({'population': [1000, 2000], 'temperature_increase': [1.0, 2.0],
+                           'urban_density': ['low', 'low'], 'infrastructure': ['new', 'new']})
+        job = claim_job()
+        from predict_model import predict_risk_batch
+
+        def taken_over(chunk, use_model=False):
+            # Another worker claims the job while this one scores its chunk
+            db.session.execute(update(Job).where(Job.id == job.id).values(attempts=Job.attempts + 1))
+            return predict_risk_batch(chunk, use_model)
+
+        with mock.patch('predict_model.predict_risk_batch', side_effect=taken_over):
+            run_job(job, chunk_size=1)
+        job = db.session.get(Job, job.id)
+        self.assertEqual((job.status, job.processed, job.chunks.count()), ('running', 0, 0))
+
+    def test_job_that_keeps_losing_its_worker_fails(self):
+        """Test that a job abandoned MAX_JOB_ATTEMPTS times is failed instead of claimed again"""
+        job_id = enqueue_job({'population': [1000], 'temperature_increase': [1.0],
+                              'urban_density': ['low'], 'infrastructure': ['new']}).id
+        for _ in range(MAX_JOB_ATTEMPTS):
+            self.assertEqual(claim_job().id, job_id)
+            self.expire_lease(job_id)
+        self.assertIsNone(claim_job())
+        job = db.session.get(Job, job_id)
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('Abandoned', job.error)
+
+    def test_owned_jobs_are_private(self):
+        """Test that a logged-in user's job is hidden from other clients"""
+        user = User(name='User', email='user@example.com', password=generate_password_hash('password123'))
+        db.session.add(user)
+        db.session.commit()
+        job = enqueue_job({'population': [1000], 'temperature_increase': [1.0],
+                           'urban_density': ['low'], 'infrastructure': ['new']}, user_id=user.id)
+        self.assertEqual(self.client.get(f'/api/jobs/{job.id}').status_code, 404)
+        self.assertEqual(self.client.get('/api/jobs/missing').status_code, 404)
+
+    def test_in_process_runner(self):
+        """Test that the in-process runner scores queued jobs without a separate worker"""
+        app.config['JOBS_IN_PROCESS'] = True
+        job_id = self.client.post('/api/jobs', json=self.cities).get_json()['id']
+        job_runner.join(timeout=10)
+        deadline = time.time() + 10
+        while self.client.get(f'/api/jobs/{job_id}').get_json()['status'] != 'done' and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(self.client.get(f'/api/jobs/{job_id}').get_json()['status'], 'done')
+
+    def test_in_process_runner_survives_errors(self):
+        """Test that an error escaping a job does not stop the runner from taking later jobs"""
+        app.config['JOBS_IN_PROCESS'] = True
+        with mock.patch('jobs.run_job', side_effect=RuntimeError('Database is gone')):
+            with self.assertLogs(app.logger, 'ERROR'):
+                self.client.post('/api/jobs', json=self.cities)
+                job_runner.join(timeout=10)
+        job_id = self.client.post('/api/jobs', json=self.cities).get_json()['id']
+        job_runner.join(timeout=10)
+        self.assertEqual(self.client.get(f'/api/jobs/{job_id}').get_json()['status'], 'done')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from flask import Flask
+from flask_migrate import Migrate, downgrade, upgrade, check
+from sqlalchemy import inspect, text
+from models import db, Prediction
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'migrations')
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        """Migrate an empty database in a temporary directory"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(self.directory.name, 'test.db')
+        db.init_app(self.app)
+        Migrate(self.app, db, directory=MIGRATIONS_DIR)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        upgrade()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.app_context.pop()
+        self.directory.cleanup()
+
+    def test_migrations_match_models(self):
+        """Test that the migrated schema has everything the models declare"""
+        check()
+        names = {index['name'] for index in inspect(db.engine).get_indexes('prediction')}
+        self.assertEqual(names, {'ix_prediction_city', 'ix_prediction_date', 'ix_prediction_user_id_city_date',
+                                 'ix_prediction_user_id_date_id'})
+        self.assertEqual({index['name'] for index in inspect(db.engine).get_indexes('city_rollup')},
+                         {'ix_city_rollup_city'})
+
+    def test_latest_prediction_lookup_uses_index(self):
+        """Test that the download_report lookup is an index search, not a table scan"""
+        query = Prediction.query.filter_by(user_id=1, city='Paris').order_by(Prediction.date.desc()).limit(1)
+        statement = query.statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+        plan = ' '.join(row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {statement}')))
+        self.assertIn('USING INDEX ix_prediction_user_id_city_date', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_dashboard_page_uses_index(self):
+        """Test that a keyset page of the dashboard is an index range scan without a sort"""
+        from dashboard import recent_predictions
+        from sqlalchemy import select, tuple_
+        query = (select(Prediction).where(Prediction.user_id == 1)
+                 .where(tuple_(Prediction.date, Prediction.id) < ('2026-01-01 00:00:00', 50))
+                 .order_by(Prediction.date.desc(), Prediction.id.desc()).limit(21))
+        statement = query.compile(db.engine, compile_kwargs={'literal_binds': True})
+        plan = ' '.join(row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {statement}')))
+        self.assertIn('USING INDEX ix_prediction_user_id_date_id', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertEqual(recent_predictions(1), ([], None))
+
+    def test_upgrade_rolls_up_existing_predictions(self):
+        """Test that the city_rollup migration fills the rollups of predictions stored before it"""
+        from rollup import rebuild_rollups
+        downgrade(revision='e5a1b8c4d902')
+        db.session.execute(text("INSERT INTO user (id, name, email, password, is_admin) "
+                                "VALUES (1, 'User', 'user@example.com', 'x', 0)"))
+        rows = [('Paris', 'low', 20.0, '2026-01-01 00:00:00'), ('Paris', 'high', 80.0, '2026-03-01 12:00:00'),
+                ('Paris', 'medium', None, '2026-02-01 00:00:00'), ('Lyon', 'medium', 50.0, '2025-06-01 00:00:00')]
+        for city, level, score, date in rows:
+            db.session.execute(text("INSERT INTO prediction (user_id, city, risk_level, risk_score, date) "
+                                    "VALUES (1, :city, :level, :score, :date)"),
+                               {'city': city, 'level': level, 'score': score, 'date': date})
+        db.session.commit()
+        upgrade()
+
+        query = text('SELECT * FROM city_rollup ORDER BY city')
+        migrated = [dict(row._mapping) for row in db.session.execute(query)]
+        self.assertEqual([(row['city'], row['count'], row['latest_risk_level']) for row in migrated],
+                         [('Lyon', 1, 'medium'), ('Paris', 3, 'high')])
+        self.assertEqual(rebuild_rollups(), 2)
+        rebuilt = [dict(row._mapping) for row in db.session.execute(query)]
+        for expected, actual in zip(rebuilt, migrated):
+            for column, value in expected.items():
+                if isinstance(value, float):
+                    self.assertAlmostEqual(actual[column], value, places=6)
+                else:
+                    self.assertEqual(actual[column], value)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from compiled_forest import CompiledForest
+from model_artifact import ModelArtifact, MODEL_PATH, MODEL_ARTIFACT_PATH, training_scaler, encode_levels, DENSITY_LEVELS
+from model_serving import ModelServer, get_model_server
+from predict_model import predict_climate_risk, predict_risk_batch
+
+class TestModelServing(unittest.TestCase):
+    def setUp(self):
+        """Use the shared, warm model server"""
+        self.server = get_model_server().load()
+
+    def test_model_is_shared(self):
+        """Test that the process-wide server loads the model once"""
+        artifact = self.server.artifact
+        self.assertIs(get_model_server().load().artifact, artifact)
+
+    def test_notebook_sample_prediction(self):
+        """Test the sample input from notebooks/train.ipynb is scored as high risk"""
+        probability = self.server.predict_proba(800000, 2.5, 'high', 'moderate')
+        self.assertGreater(probability, 0.9)
+
+    def test_concurrent_requests_match_batch(self):
+        """Test that micro-batched single rows equal one direct batch call"""
+        rows = [(100000 * (i + 1), 0.5 + i * 0.1, ('low', 'medium', 'high')[i % 3], ('new', 'moderate', 'aging')[i % 3])
+                for i in range(40)]
+        server = ModelServer(max_wait=0.01)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            probabilities = list(executor.map(lambda row: server.predict_proba(*row), rows))
+        expected = server.predict_proba_batch(*zip(*rows))
+        np.testing.assert_array_equal(probabilities, expected)
+
+    def test_large_batches_use_sklearn(self):
+        """Test that batches from sklearn_min_rows rows on are scored by the sklearn forest, with equal results"""
+        server = ModelServer(sklearn_min_rows=10)
+        rng = np.random.default_rng(0)
+        rows = 25
+        columns = (rng.integers(50000, 5000000, rows), rng.uniform(0.5, 4.0, rows),
+                   rng.choice(['low', 'medium', 'high'], rows), rng.choice(['new', 'moderate', 'aging'], rows))
+        small = server.predict_proba_batch(*(column[:5] for column in columns))
+        self.assertIsNone(server._estimator)  # Not loaded for small batches
+        large = server.predict_proba_batch(*columns)
+        self.assertIsNotNone(server._estimator)
+        np.testing.assert_array_equal(large, self.server.artifact.predict_proba(*columns))
+        np.testing.assert_array_equal(small, large[:5])
+
+    def test_bad_row_fails_only_its_request(self):
+        """Test that a row the model cannot score fails its own request, not the rest of its batch"""
+        rows = [(800000, 2.5, 'high', 'moderate'), (1000, 'hot', 'low', 'new'), (5000, 0.2, 'low', 'new')]
+        # The batch closes when all rows arrived, so they are scored together first
+        server = ModelServer(max_batch_size=len(rows), max_wait=1.0)
+        calls = []
+        predict_proba_batch = server.predict_proba_batch
+        server.predict_proba_batch = lambda *columns: calls.append(len(columns[0])) or predict_proba_batch(*columns)
+
+        def predict(row):
+            try:
+                return server.predict_proba(*row)
+            except ValueError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=len(rows)) as executor:
+            results = list(executor.map(predict, rows))
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[0], self.server.predict_proba_batch([800000], [2.5], ['high'], ['moderate'])[0])
+        self.assertEqual(results[2], self.server.predict_proba_batch([5000], [0.2], ['low'], ['new'])[0])
+        self.assertEqual(calls, [3, 1, 1, 1])
+
+    def test_prediction_includes_probability(self):
+        """Test that predictions carry the model probability alongside the rule score"""
+        result = predict_climate_risk('Testville', 800000, 2.5, 'high', 'moderate')
+        self.assertGreater(result['high_risk_probability'], 0.9)
+        self.assertIsNone(predict_climate_risk('Testville', 800000, 2.5, 'high', 'moderate', use_model=False)['high_risk_probability'])
+
+    def test_batch_prediction_includes_probability(self):
+        """Test that batch scoring can add model probabilities per row"""
+        result = predict_risk_batch({
+            'population': [800000, 5000],
+            'temperature_increase': [2.5, 0.2],
+            'urban_density': ['high', 'low'],
+            'infrastructure': ['moderate', 'new']
+        }, use_model=True)
+        self.assertEqual(result['high_risk_probability'][0], self.server.predict_proba(800000, 2.5, 'high', 'moderate'))
+        self.assertLess(result['high_risk_probability'][1], 0.1)
+
+class TestModelArtifact(unittest.TestCase):
+    def setUp(self):
+        """Load the pickled forest, its scaler and the shipped artifact"""
+        with open(MODEL_PATH, 'rb') as f:
+            self.model = pickle.load(f)
+        self.mean, self.scale = training_scaler()
+        self.artifact = ModelArtifact.load(MODEL_ARTIFACT_PATH)
+        self.directory = tempfile.mkdtemp()
+
+        rng = np.random.default_rng(0)
+        n = 1000
+        self.columns = (
+            rng.integers(1000, 10000000, n),
+            rng.uniform(0.1, 5.0, n),
+            rng.choice(['low', 'medium', 'high'], n),
+            rng.choice(['new', 'moderate', 'aging'], n)
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def reference_proba(self):
+        """The notebook pipeline: encode, StandardScaler.transform, predict_proba"""
+        population, temperature_increase, urban_density, infrastructure = self.columns
+        features = np.column_stack([
+            population,
+            temperature_increase,
+            [DENSITY_LEVELS.index(value) for value in urban_density],
+            [('new', 'moderate', 'aging').index(value) for value in infrastructure]
+        ]).astype(float)
+        return self.model.predict_proba((features - self.mean) / self.scale)[:, 1]
+
+    def test_fused_pipeline_matches_notebook(self):
+        """Test that the shipped artifact scores exactly like the notebook pipeline"""
+        np.testing.assert_array_equal(self.artifact.predict_proba(*self.columns), self.reference_proba())
+
+    def test_forest_arrays_are_memory_mapped(self):
+        """Test that loading maps the node arrays instead of copying them"""
+        self.assertIsInstance(self.artifact.forest.threshold, np.memmap)
+        self.assertEqual(self.artifact.forest.n_trees, len(self.model.estimators_))
+
+    def test_compiled_forest_round_trip(self):
+        """Test that a saved and reloaded forest scores like sklearn, for batches and single rows"""
+        path = os.path.join(self.directory, 'forest.npz')
+        CompiledForest.from_sklearn(self.model).save(path)
+        forest = CompiledForest.load(path)
+        X = np.random.default_rng(1).normal(size=(500, 4))
+        np.testing.assert_array_equal(forest.predict_proba(X), self.model.predict_proba(X))
+        np.testing.assert_array_equal(forest.predict_proba(X[0]), self.model.predict_proba(X[:1]))
+
+    def test_unknown_levels_encode_as_zero(self):
+        """Test that categorical encoding matches the rule-based treatment of unknown values"""
+        self.assertEqual(encode_levels(['high', 'bogus', 'low'], DENSITY_LEVELS).tolist(), [2, 0, 0])
+
+    def test_version_mismatch_is_rejected(self):
+        """Test that artifacts of another version are refused"""
+        path = os.path.join(self.directory, 'old.npz')
+        np.savez(path, artifact_version=np.int64(0))
+        with self.assertRaises(ValueError):
+            ModelArtifact.load(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from plot_cache import PlotCache, plot_cache_key
+from predict_model import deterministic_plot_seed, predict_climate_risk
+
+class TestPlotCache(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch directory for the disk tier"""
+        self.directory = tempfile.mkdtemp()
+        self.renders = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def render(self, size=10):
+        self.renders += 1
+        return b'x' * size
+
+    def test_memory_hit_skips_render(self):
+        """Test that repeated lookups are served from memory"""
+        cache = PlotCache(max_bytes=100, directory=self.directory)
+        params = {'seed': 1}
+        self.assertEqual(cache.get_or_render('risk', params, self.render), b'x' * 10)
+        cache.get_or_render('risk', params, self.render)
+        self.assertEqual(self.renders, 1)
+        stats = cache.stats()
+        self.assertEqual((stats['misses'], stats['memory_hits']), (1, 1))
+
+    def test_lru_eviction_by_bytes(self):
+        """Test that the least recently used entries are evicted past max_bytes"""
+        cache = PlotCache(max_bytes=25)
+        for seed in range(3):
+            cache.get_or_render('risk', {'seed': seed}, self.render)
+        stats = cache.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['bytes'], 20)
+
+    def test_disk_tier_survives_memory_clear(self):
+        """Test that a fresh cache on the same directory reads images from disk"""
+        PlotCache(directory=self.directory).get_or_render('rainfall', {'seed': 2}, self.render)
+        cache = PlotCache(directory=self.directory)
+        cache.get_or_render('rainfall', {'seed': 2}, self.render)
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+
+    def test_key_depends_on_kind_and_params(self):
+        """Test that cache keys are content addresses of the plot inputs"""
+        self.assertEqual(plot_cache_key('risk', {'a': 1, 'b': 2}), plot_cache_key('risk', {'b': 2, 'a': 1}))
+        self.assertNotEqual(plot_cache_key('risk', {'a': 1}), plot_cache_key('rainfall', {'a': 1}))
+
+    def test_key_depends_on_renderer_version(self):
+        """Test that a new renderer version never serves images cached by the old one"""
+        key = plot_cache_key('risk', {'a': 1})
+        with mock.patch('plot_cache.PLOT_RENDERER_VERSION', -1):
+            self.assertNotEqual(plot_cache_key('risk', {'a': 1}), key)
+
+    def test_disk_tier_evicts_least_recently_used(self):
+        """Test that the disk tier stays within its budget by deleting the files used longest ago"""
+        cache = PlotCache(directory=self.directory, max_disk_bytes=50)
+        paths = []
+        for seed in range(5):
+            cache.get_or_render('risk', {'seed': seed}, self.render)
+            key = plot_cache_key('risk', {'seed': seed})
+            paths.append(os.path.join(self.directory, key[:2], key + '.png'))
+            # Distinct ages, oldest first, without sleeping
+            os.utime(paths[-1], (time.time() - 1000 + seed, time.time() - 1000 + seed))
+
+        # A disk hit from another worker makes seed 0 the most recently used file
+        cache = PlotCache(directory=self.directory, max_disk_bytes=50)
+        cache.get_or_render('risk', {'seed': 0}, self.render)
+        cache.get_or_render('risk', {'seed': 5}, self.render)
+        self.assertEqual([os.path.exists(path) for path in paths], [True, False, False, True, True])
+        self.assertEqual(cache.stats()['disk_evictions'], 2)
+        self.assertEqual(self.renders, 6)
+
+    def test_variants_are_cached_separately(self):
+        """Test that formats and resolutions get their own keys and files"""
+        keys = {plot_cache_key('risk', {'a': 1}, image_format, dpi)
+                for image_format, dpi in (('png', None), ('png', 50), ('webp', None), ('svg', None))}
+        self.assertEqual(len(keys), 4)
+        cache = PlotCache(directory=self.directory)
+        cache.get_or_render('risk', {'seed': 3}, lambda: b'webp', 'webp', 50)
+        self.assertEqual(cache.get_or_render('risk', {'seed': 3}, self.render), b'x' * 10)
+        key = plot_cache_key('risk', {'seed': 3}, 'webp', 50)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, key[:2], key + '.webp')))
+
+    def test_deterministic_plot_mode(self):
+        """Test that deterministic mode gives equal plot params for equal inputs"""
+        first = predict_climate_risk('A', 600000, 1.5, 'medium', 'moderate', deterministic_plots=True)
+        second = predict_climate_risk('B', 600000, 1.5, 'medium', 'moderate', deterministic_plots=True)
+        self.assertEqual(first['plot_params'], second['plot_params'])
+        self.assertEqual(first['projections'], second['projections'])
+        self.assertEqual(first['plot_params']['seed'], deterministic_plot_seed(first['risk_score'], 'medium', 'moderate', 1.5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import gzip
+import re
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from app import app
+from plot_renderer import PlotRenderer, PLOT_FORMATS
+from predict_model import predict_climate_risk, project_rainfall, project_risk, PROJECTION_YEARS
+
+class TestPredictionPlots(unittest.TestCase):
+    def setUp(self):
+        """Set up test client"""
+        app.config['TESTING'] = True
+        app.config['WTF_CSRF_ENABLED'] = False
+        self.client = app.test_client()
+
+    def test_result_carries_series_without_plots(self):
+        """Test that predictions return projection series and no rendered plots"""
+        result = predict_climate_risk('Testville', 750000, 2.0, 'high', 'aging')
+        self.assertNotIn('rainfall_plot', result)
+        self.assertNotIn('risk_plot', result)
+        self.assertEqual(len(result['projections']['years']), 8)
+        params = result['plot_params']
+        self.assertEqual(result['projections']['rainfall'], project_rainfall(2.0, params['seed']).tolist())
+        self.assertEqual(result['projections']['risk'], project_risk(result['risk_score'], 'high', 'aging', params['seed']).tolist())
+
+    def test_predict_page_links_lazy_plots(self):
+        """Test that the predict page links plots and they render as PNG"""
+        response = self.client.post('/predict', data={
+            'city': 'Testville',
+            'population': 750000,
+            'temperature_increase': 2.0,
+            'urban_density': 'high',
+            'infrastructure': 'aging'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(b'data:image/png;base64', response.data)
+        urls = re.findall(r'src="(/predict/[^"]+/plot/(?:rainfall|risk)\.png)"', response.get_data(as_text=True))
+        self.assertEqual(len(urls), 2)
+
+        plot = self.client.get(urls[0])
+        self.assertEqual(plot.status_code, 200)
+        self.assertEqual(plot.mimetype, 'image/png')
+        self.assertTrue(plot.data.startswith(b'\x89PNG'))
+
+    def _plot_url(self, kind='risk', image_format='png'):
+        response = self.client.post('/predict', data={
+            'city': 'Testville',
+            'population': 750000,
+            'temperature_increase': 2.0,
+            'urban_density': 'high',
+            'infrastructure': 'aging'
+        })
+        url = re.search(rf'src="(/predict/[^"]+/plot/{kind})\.png"', response.get_data(as_text=True)).group(1)
+        return f'{url}.{image_format}'
+
+    def test_plot_formats(self):
+        """Test that plots are served as PNG, WebP and SVG, and at a lower DPI"""
+        sizes = {}
+        for image_format, magic in (('png', b'\x89PNG'), ('webp', b'RIFF'), ('svg', b'<?xml')):
+            response = self.client.get(self._plot_url(image_format=image_format))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, PLOT_FORMATS[image_format])
+            self.assertTrue(response.data.startswith(magic))
+            sizes[image_format] = len(response.data)
+        self.assertLess(sizes['webp'], sizes['png'])
+
+        url = self._plot_url()
+        small = self.client.get(url + '?dpi=50')
+        self.assertTrue(small.data.startswith(b'\x89PNG'))
+        self.assertLess(len(small.data), sizes['png'])
+        self.assertEqual(self.client.get(url + '?dpi=1000').status_code, 400)
+        self.assertEqual(self.client.get(url[:-len('png')] + 'svg?dpi=50').status_code, 400)
+        self.assertEqual(self.client.get(url[:-len('png')] + 'gif').status_code, 404)
+
+    def test_plot_caching_headers(self):
+        """Test that plots carry an ETag and Cache-Control and revalidate to a 304"""
+        url = self._plot_url()
+        response = self.client.get(url)
+        self.assertEqual(response.headers['Cache-Control'], f"public, max-age={app.config['PLOT_MAX_AGE']}")
+        etag = response.headers['ETag']
+        self.assertNotEqual(self.client.get(url + '?dpi=50').headers['ETag'], etag)
+
+        revalidated = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.data, b'')
+
+    def test_svg_is_gzipped(self):
+        """Test that SVG plots are gzip-compressed for clients that accept it"""
+        url = self._plot_url(image_format='svg')
+        plain = self.client.get(url)
+        compressed = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.data), plain.data)
+        self.assertLess(len(compressed.data), len(plain.data))
+        self.assertNotEqual(compressed.headers['ETag'], plain.headers['ETag'])
+
+    def test_tampered_plot_id_is_rejected(self):
+        """Test that unsigned plot ids return 404"""
+        response = self.client.get('/predict/not-a-token/plot/risk.png')
+        self.assertEqual(response.status_code, 404)
+
+    def test_renderer_is_thread_safe(self):
+        """Test that concurrent renders match serial renders of the same data"""
+        series = [project_risk(30 + i * 7, 'medium', 'moderate', seed=i) for i in range(8)]
+        expected = [PlotRenderer(PROJECTION_YEARS).render_risk(values) for values in series]
+        renderer = PlotRenderer(PROJECTION_YEARS)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            images = list(executor.map(renderer.render_risk, series))
+        self.assertEqual(images, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import json
+import unittest
+import numpy as np
+from app import app
+from predict_model import predict_climate_risk, project_rainfall, project_risk
+from projections import (MAX_PROJECTION_YEAR, PROJECTION_YEARS, REFERENCE_CITY, city_climate_data, climate_years,
+                         iter_climate_series, project, project_city)
+
+class TestProjections(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.cities = 50
+        self.columns = (
+            rng.uniform(0.1, 5.0, self.cities),
+            rng.uniform(20, 100, self.cities),
+            rng.choice(['low', 'medium', 'high'], self.cities),
+            rng.choice(['new', 'moderate', 'aging'], self.cities)
+        )
+        self.seeds = rng.integers(0, 2**31 - 1, self.cities)
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+    def test_shapes(self):
+        """Test that every series is a (cities, years) array"""
+        projection = project(*self.columns)
+        self.assertEqual(projection['years'], PROJECTION_YEARS)
+        for quantity in ('temperature', 'rainfall', 'risk'):
+            self.assertEqual(projection[quantity].shape, (self.cities, len(PROJECTION_YEARS)))
+        self.assertTrue((projection['risk'] <= 100).all())
+
+    def test_batch_rows_equal_single_city_series(self):
+        """Test that per-city seeds reproduce the series each city gets on its own"""
+        projection = project(*self.columns, seeds=self.seeds)
+        for row, (temperature_increase, risk_score, urban_density, infrastructure, seed) in enumerate(
+                zip(*self.columns, self.seeds)):
+            city = project_city(temperature_increase, risk_score, urban_density, infrastructure, seed)
+            for quantity in ('temperature', 'rainfall', 'risk'):
+                np.testing.assert_array_equal(projection[quantity][row], city[quantity])
+            np.testing.assert_array_equal(city['rainfall'], project_rainfall(temperature_increase, seed))
+            np.testing.assert_array_equal(city['risk'], project_risk(risk_score, urban_density, infrastructure, seed))
+
+    def test_prediction_series_are_consistent(self):
+        """Test that the CSV data reports the same series as the plots"""
+        result = predict_climate_risk('Testville', 2000000, 3.0, 'high', 'aging', deterministic_plots=True, use_model=False)
+        lines = result['csv_data'].strip().splitlines()[-len(PROJECTION_YEARS):]
+        for line, year, rainfall, risk in zip(lines, PROJECTION_YEARS, result['projections']['rainfall'],
+                                              result['projections']['risk']):
+            self.assertEqual(line.split(',')[0], str(year))
+            self.assertEqual(line.split(',')[2], f"{rainfall:.0f}")
+            self.assertEqual(line.split(',')[3], f"{risk:.1f}")
+        plot_rainfall = project_rainfall(3.0, result['plot_params']['seed'])
+        np.testing.assert_array_equal(result['projections']['rainfall'], plot_rainfall)
+
+    def test_climate_data_endpoint(self):
+        """Test that the landing page data comes from the projection engine"""
+        data = self.client.get('/api/climate-data').get_json()
+        projection = project_city(REFERENCE_CITY['temperature_increase'], 55, REFERENCE_CITY['urban_density'],
+                                  REFERENCE_CITY['infrastructure'])
+        self.assertEqual([point['year'] for point in data['temperature']], PROJECTION_YEARS)
+        self.assertEqual([point['value'] for point in data['rainfall']],
+                         [round(value, 1) for value in projection['rainfall'].tolist()])
+
+    def test_climate_years(self):
+        """Test that year ranges always project from the base year"""
+        self.assertEqual(climate_years(), (PROJECTION_YEARS, 0))
+        years, offset = climate_years(2025, 2040)
+        self.assertEqual((years[0], years[-1], offset), (PROJECTION_YEARS[0], 2040, 2))
+        for start_year, end_year in ((2022, 2030), (2030, 2025), (2023, MAX_PROJECTION_YEAR + 1)):
+            with self.assertRaises(ValueError):
+                climate_years(start_year, end_year)
+
+    def test_streamed_series_equal_single_city_series(self):
+        """Test that block-wise series equal each city's own, whatever the block size"""
+        temperature_increase, risk_score, urban_density, infrastructure = self.columns
+        for block in (1, 7, 256):
+            series = list(iter_climate_series(*self.columns, start_year=2025, end_year=2035, block=block))
+            self.assertEqual(len(series), self.cities)
+            for row in (0, 13, self.cities - 1):
+                projection = project([temperature_increase[row]], [risk_score[row]], [urban_density[row]],
+                                     [infrastructure[row]], years=list(range(2023, 2036)))
+                self.assertEqual([point['value'] for point in series[row]['risk']],
+                                 [round(value, 1) for value in projection['risk'][0, 2:].tolist()])
+                self.assertEqual([point['year'] for point in series[row]['rainfall']], list(range(2025, 2036)))
+        with self.assertRaises(ValueError):
+            iter_climate_series([1.0, None], [50, 60], ['low', 'low'], ['new', 'new'])
+
+    def test_climate_data_city_parameters(self):
+        """Test that query parameters override the reference city and pick the years"""
+        data = self.client.get('/api/climate-data?temperature_increase=3&urban_density=high&city=Testville'
+                               '&start_year=2026&end_year=2030').get_json()
+        self.assertEqual(data['city'], 'Testville')
+        expected = city_climate_data(temperature_increase=3.0, urban_density='high')
+        self.assertEqual(data['risk'], expected['risk'][3:])
+        self.assertEqual(self.client.get('/api/climate-data?start_year=2019').status_code, 400)
+        self.assertEqual(self.client.get('/api/climate-data?population=many').status_code, 400)
+
+    def test_year_range_does_not_change_values(self):
+        """Test that a year's values are the same whatever range is projected, and rainfall stays >= 0"""
+        short = city_climate_data(temperature_increase=5.0)
+        long = city_climate_data(end_year=MAX_PROJECTION_YEAR, temperature_increase=5.0)
+        for quantity in ('temperature', 'rainfall', 'risk'):
+            self.assertEqual(long[quantity][:len(PROJECTION_YEARS)], short[quantity])
+        self.assertTrue(all(point['value'] >= 0 for point in long['rainfall']))
+        self.assertEqual(long['rainfall'][-1]['value'], 0)
+        projection = project(*self.columns, seeds=self.seeds, years=list(range(2023, MAX_PROJECTION_YEAR + 1)))
+        self.assertTrue((projection['rainfall'] >= 0).all())
+
+    def test_climate_data_rejects_non_finite_inputs(self):
+        """Test that NaN and infinite query values return 400 rather than invalid JSON"""
+        for query in ('temperature_increase=nan', 'temperature_increase=inf', 'population=-inf'):
+            response = self.client.get(f'/api/climate-data?{query}')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.get_json())
+
+    def test_climate_data_bodies_are_cached(self):
+        """Test that equivalent queries share one serialized body"""
+        from app import _climate_data_body
+        first = self.client.get('/api/climate-data?temperature_increase=2&end_year=2040')
+        hits = _climate_data_body.cache_info().hits
+        second = self.client.get('/api/climate-data?end_year=2040&temperature_increase=2.0&start_year=2023')
+        self.assertEqual(_climate_data_body.cache_info().hits, hits + 1)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+
+    def test_climate_data_stream(self):
+        """Test that POSTed cities come back as one JSON line each, in order"""
+        cities = [{'city': f'City {i}', 'population': 100000 * (i + 1), 'temperature_increase': i / 2,
+                   'urban_density': 'high', 'infrastructure': 'aging'} for i in range(5)]
+        response = self.client.post('/api/climate-data?end_year=2035', json=cities)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([line['city'] for line in lines], [city['city'] for city in cities])
+        for city, line in zip(cities, lines):
+            inputs = {key: value for key, value in city.items() if key != 'city'}
+            self.assertEqual({key: value for key, value in line.items() if key != 'city'},
+                             city_climate_data(end_year=2035, **inputs))
+        self.assertEqual(self.client.post('/api/climate-data', json=[{'city': 'Nowhere'}]).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
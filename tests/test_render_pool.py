@@ -0,0 +1,104 @@
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+from app import app
+import app as app_module
+from predict_model import predict_climate_risk, render_plot
+from render_pool import RenderPool, RenderPoolSaturated, RenderTimeout
+
+class _StalledExecutor:
+    """Executor whose renders only finish when the test says so"""
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, function, *args):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+class TestRenderPool(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        self.plot_params = predict_climate_risk('Testville', 750000, 2.0, 'high', 'aging',
+                                                deterministic_plots=True)['plot_params']
+
+    def test_processes_render_like_the_request_thread(self):
+        """Test that warm renderer processes return the same PNG as an in-thread render"""
+        pool = RenderPool(processes=1, max_queue=2, timeout=60)
+        try:
+            for kind in ('rainfall', 'risk'):
+                self.assertEqual(pool.render(kind, self.plot_params), render_plot(kind, self.plot_params))
+            self.assertEqual(pool.stats()['rendered'], 2)
+            self.assertEqual(pool.stats()['in_flight'], 0)
+        finally:
+            pool.shutdown()
+
+    def test_pool_shut_down_under_a_render_is_replaced(self):
+        """Test that a render given a pool another thread shut down runs on a fresh one"""
+        pool = RenderPool(processes=1, max_queue=2, timeout=60)
+        try:
+            pool.render('risk', self.plot_params)
+            dead = pool._executor
+            dead.shutdown()  # As if shutdown() ran between taking the pool and submitting to it
+            self.assertEqual(pool.render('risk', self.plot_params), render_plot('risk', self.plot_params))
+            self.assertIsNot(pool._executor, dead)
+            stats = pool.stats()
+            self.assertEqual((stats['in_flight'], stats['restarts']), (0, 1))
+        finally:
+            pool.shutdown()
+
+    def test_failed_submit_releases_its_slot(self):
+        """Test that a render whose submit fails does not keep its slot"""
+        pool = RenderPool(processes=1, max_queue=0)
+        dead = mock.Mock()
+        dead.submit.side_effect = RuntimeError('cannot schedule new futures after shutdown')
+        with mock.patch.object(pool, '_get_executor', return_value=dead):
+            for _ in range(2):
+                with self.assertRaises(RuntimeError):
+                    pool.render('risk', self.plot_params)
+        self.assertEqual(pool.stats()['in_flight'], 0)
+
+    def test_in_thread_rendering(self):
+        """Test that processes=0 renders without starting a pool"""
+        pool = RenderPool(processes=0)
+        self.assertEqual(pool.render('risk', self.plot_params), render_plot('risk', self.plot_params))
+        self.assertIsNone(pool._executor)
+
+    def test_timeout_and_back_pressure(self):
+        """Test that timed out renders keep their slot until done and a full pool refuses work"""
+        pool = RenderPool(processes=1, max_queue=1, timeout=0.01)
+        executor = _StalledExecutor()
+        with mock.patch.object(pool, '_get_executor', return_value=executor):
+            for _ in range(2):
+                with self.assertRaises(RenderTimeout):
+                    pool.render('risk', self.plot_params)
+            with self.assertRaises(RenderPoolSaturated):
+                pool.render('risk', self.plot_params)
+            self.assertEqual(pool.stats()['in_flight'], 2)
+
+            executor.futures[0].set_result(b'png')
+            with self.assertRaises(RenderTimeout):
+                pool.render('risk', self.plot_params)
+            for future in executor.futures[1:]:
+                future.set_result(b'png')
+
+        stats = pool.stats()
+        self.assertEqual((stats['in_flight'], stats['timeouts'], stats['rejected']), (0, 3, 1))
+
+    def test_saturated_pool_returns_503(self):
+        """Test that the plot route answers 503 with Retry-After when the pool is saturated"""
+        plot_id = app_module._plot_serializer().dumps(dict(self.plot_params, seed=-1))
+        with mock.patch.object(app_module.render_pool, 'render', side_effect=RenderPoolSaturated('busy')):
+            response = self.client.get(f'/predict/{plot_id}/plot/risk.png')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+    def test_stats_endpoint(self):
+        """Test the render pool stats endpoint"""
+        response = self.client.get('/api/render-pool/stats')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('in_flight', response.get_json())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import csv
+import io
+import unittest
+from datetime import datetime
+from app import app, db
+from tests.helpers import DatabaseTestCase
+from models import User, Prediction
+from werkzeug.security import generate_password_hash
+import reports
+from predict_model import deterministic_plot_seed
+from projections import project_city
+
+class TestReportExport(DatabaseTestCase):
+    def setUp(self):
+        """Create two users with a prediction history each"""
+        app.config['WTF_CSRF_ENABLED'] = False
+        super().setUp()
+
+        self.user = User(name='User', email='user@example.com', password=generate_password_hash('password123'))
+        self.admin = User(name='Admin', email='admin@example.com', password=generate_password_hash('password123'),
+                          is_admin=True)
+        db.session.add_all([self.user, self.admin])
+        db.session.commit()
+
+        for owner in (self.user, self.admin):
+            for day, city in enumerate(['Paris', 'Paris', 'Lyon', 'Paris'], 1):
+                db.session.add(Prediction(
+                    user_id=owner.id, city=city, population=1000000 + day, temperature_increase=float(day),
+                    urban_density='high', infrastructure='aging', risk_level='high', risk_score=80.0,
+                    date=datetime(2024, 1, day)
+                ))
+        db.session.commit()
+
+    def read_csv(self, response):
+        return list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+
+    def test_city_report_lists_history(self):
+        """Test that the city report includes every prediction for the city, newest first"""
+        self.login(self.user)
+        response = self.client.get('/download-report/Paris')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        rows = self.read_csv(response)
+        history = [row for row in rows if len(row) == len(reports.PREDICTION_HEADER) and row[2] == 'Paris']
+        self.assertEqual([row[0][:10] for row in history], ['2024-01-04', '2024-01-02', '2024-01-01'])
+        self.assertTrue(all(row[1] == 'user@example.com' for row in history))
+        # Projections follow the latest prediction, with the series its plots show
+        seed = deterministic_plot_seed(80.0, 'high', 'aging', 4.0)
+        expected = list(reports.projection_rows(project_city(4.0, 80.0, 'high', 'aging', seed)))[-1]
+        self.assertEqual(rows[-1], [str(cell) for cell in expected])
+
+    def test_city_report_sample_data(self):
+        """Test that anonymous users get the sample report"""
+        rows = self.read_csv(self.client.get('/download-report/Berlin'))
+        self.assertIn(['Berlin', '500000', '1.5', 'medium', 'moderate', 'medium', '55%'], rows)
+
+    def test_export_filters(self):
+        """Test city and inclusive date range filters"""
+        self.login(self.user)
+        rows = self.read_csv(self.client.get('/export/predictions.csv?city=Paris&start=2024-01-02&end=2024-01-04'))
+        self.assertEqual(rows[0], reports.PREDICTION_HEADER)
+        self.assertEqual([row[0][:10] for row in rows[1:]], ['2024-01-04', '2024-01-02'])
+
+    def test_export_all_users_requires_admin(self):
+        """Test that regular users cannot export every user's predictions"""
+        self.login(self.user)
+        self.assertEqual(self.client.get('/export/predictions.csv?all=true').status_code, 403)
+
+    def test_export_all_users(self):
+        """Test that admins can export every user's predictions"""
+        self.login(self.admin)
+        rows = self.read_csv(self.client.get('/export/predictions.csv?all=true'))
+        self.assertEqual(len(rows), 1 + 8)
+
+    def test_export_rejects_bad_dates(self):
+        """Test that malformed dates are a client error"""
+        self.login(self.user)
+        self.assertEqual(self.client.get('/export/predictions.csv?start=01/02/2024').status_code, 400)
+
+    def test_csv_is_flushed_in_chunks(self):
+        """Test that large exports are produced as several chunks"""
+        rows = [[i, 'x'] for i in range(reports.EXPORT_FLUSH_ROWS * 2 + 1)]
+        chunks = list(reports.iter_csv(rows))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(list(csv.reader(io.StringIO(''.join(chunks))))), len(rows))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import gzip
+import json
+import unittest
+from app import app
+from projections import city_climate_data
+from response_cache import CachedBody
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+    def test_climate_data_is_unchanged(self):
+        """Test that the cached body holds the same series as before"""
+        response = self.client.get('/api/climate-data')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(response.get_json(), city_climate_data())
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_caching_headers(self):
+        """Test that responses carry a strong, stable ETag and Cache-Control"""
+        first = self.client.get('/api/climate-data')
+        second = self.client.get('/api/climate-data')
+        etag = first.headers['ETag']
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        self.assertEqual(second.headers['ETag'], etag)
+        self.assertEqual(first.headers['Cache-Control'], f"public, max-age={app.config['CLIMATE_DATA_MAX_AGE']}")
+        self.assertEqual(first.headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(first.data, second.data)
+
+    def test_not_modified(self):
+        """Test that a matching If-None-Match gets an empty 304"""
+        etag = self.client.get('/api/climate-data').headers['ETag']
+        response = self.client.get('/api/climate-data', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+        response = self.client.get('/api/climate-data', headers={'If-None-Match': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_gzip(self):
+        """Test that gzip clients get the pre-compressed body under its own ETag"""
+        plain = self.client.get('/api/climate-data')
+        response = self.client.get('/api/climate-data', headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+        self.assertNotEqual(response.headers['ETag'], plain.headers['ETag'])
+
+        response = self.client.get('/api/climate-data', headers={'Accept-Encoding': 'gzip',
+                                                                 'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        # Refused encodings are not sent
+        response = self.client.get('/api/climate-data', headers={'Accept-Encoding': 'gzip;q=0'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_small_bodies_are_not_compressed(self):
+        """Test that only bodies worth compressing get compressed variants"""
+        body = CachedBody.from_json({'a': 1})
+        self.assertEqual(list(body.variants), [None])
+        self.assertEqual(json.loads(body.variants[None][0]), {'a': 1})
+        self.assertEqual(body.select(app.test_request_context(headers={'Accept-Encoding': 'gzip'})
+                                     .request.accept_encodings), None)
+
+if __name__ == '__main__':
+    unittest.main()
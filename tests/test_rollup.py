@@ -0,0 +1,133 @@
+import unittest
+from datetime import datetime, timedelta
+from app import app, db
+from tests.helpers import DatabaseTestCase
+from models import User, Prediction, CityRollup
+from werkzeug.security import generate_password_hash
+from ingest import insert_predictions
+from rollup import DAYS_PER_YEAR, city_summaries, rebuild_rollups, record_predictions
+
+ROLLUP_COLUMNS = [column.name for column in CityRollup.__table__.columns]
+
+class TestRollup(DatabaseTestCase):
+    def setUp(self):
+        """Start from empty tables with two users and a mixed set of predictions"""
+        app.config['WTF_CSRF_ENABLED'] = False
+        super().setUp()
+        self.user = User(name='User', email='user@example.com', password=generate_password_hash('password123'))
+        self.admin = User(name='Admin', email='admin@example.com', password=generate_password_hash('password123'),
+                          is_admin=True)
+        db.session.add_all([self.user, self.admin])
+        db.session.commit()
+
+        start = datetime(2026, 1, 1)
+        self.mappings = []
+        for i in range(60):
+            score = float((i * 13) % 100)
+            self.mappings.append({
+                'user_id': (self.user.id, self.admin.id)[i % 2], 'city': ('Paris', 'Lagos', 'Lima')[i % 3],
+                'population': 500000, 'temperature_increase': 1.5, 'urban_density': 'medium',
+                'infrastructure': 'moderate',
+                'risk_level': 'high' if score >= 70 else 'medium' if score >= 40 else 'low',
+                # Some rows share a date, so the tie-break on insertion order matters
+                'risk_score': score, 'date': start + timedelta(days=i // 4)
+            })
+
+    def rollups(self):
+        return {(row.user_id, row.city): {column: getattr(row, column) for column in ROLLUP_COLUMNS}
+                for row in CityRollup.query.all()}
+
+    def assertRollupsEqual(self, actual, expected):
+        self.assertEqual(actual.keys(), expected.keys())
+        for key, row in expected.items():
+            for column, value in row.items():
+                if isinstance(value, float):
+                    self.assertAlmostEqual(actual[key][column], value, places=6, msg=column)
+                else:
+                    self.assertEqual(actual[key][column], value, msg=column)
+
+    def test_incremental_matches_rebuild(self):
+        """Test that batched incremental updates equal a rebuild from the predictions"""
+        insert_predictions(self.mappings, batch_size=7)
+        incremental = self.rollups()
+        self.assertEqual(len(incremental), 6)
+        self.assertEqual(rebuild_rollups(), 6)
+        self.assertRollupsEqual(incremental, self.rollups())
+
+    def test_predictions_without_scores(self):
+        """Test that rows without a score count but leave the score statistics alone"""
+        date = datetime(2026, 2, 1)
+        row = {'user_id': self.user.id, 'city': 'Oslo', 'population': 1000, 'temperature_increase': 1.0,
+               'urban_density': 'low', 'infrastructure': 'new'}
+        insert_predictions([dict(row, risk_level='low', risk_score=25.0, date=date)])
+        insert_predictions([dict(row, risk_level=None, risk_score=None, date=date + timedelta(days=1))])
+        incremental = self.rollups()
+        rollup = incremental[(self.user.id, 'Oslo')]
+        self.assertEqual((rollup['count'], rollup['score_count']), (2, 1))
+        self.assertEqual((rollup['min_score'], rollup['max_score'], rollup['latest_risk_score']), (25.0, 25.0, None))
+        rebuild_rollups()
+        self.assertRollupsEqual(incremental, self.rollups())
+
+    def test_city_summaries(self):
+        """Test that summaries combine users' rollups like aggregates over the raw rows"""
+        insert_predictions(self.mappings)
+        summaries = {summary['city']: summary for summary in city_summaries()}
+        self.assertEqual(sorted(summaries), ['Lagos', 'Lima', 'Paris'])
+        for city, summary in summaries.items():
+            rows = [m for m in self.mappings if m['city'] == city]
+            scores = [m['risk_score'] for m in rows]
+            self.assertEqual(summary['count'], len(rows))
+            self.assertAlmostEqual(summary['mean_risk_score'], sum(scores) / len(scores))
+            self.assertEqual((summary['min_risk_score'], summary['max_risk_score']), (min(scores), max(scores)))
+            # Users' rows on the same latest date are tied; any of them may be reported
+            latest = max(m['date'] for m in rows)
+            self.assertIn(summary['latest_risk_level'], {m['risk_level'] for m in rows if m['date'] == latest})
+            self.assertEqual(sum(summary['risk_counts'].values()), len(rows))
+        own = city_summaries(self.user.id, 'Paris')
+        self.assertEqual(own[0]['count'], sum(1 for m in self.mappings
+                                              if m['city'] == 'Paris' and m['user_id'] == self.user.id))
+
+    def test_trend(self):
+        """Test that the trend is the least-squares slope in points per year"""
+        start = datetime(2026, 1, 1)
+        record_predictions([{'user_id': self.user.id, 'city': 'Rome', 'risk_score': 40.0 + 0.1 * day,
+                             'risk_level': 'medium', 'date': start + timedelta(days=day)} for day in range(0, 100, 3)])
+        record_predictions([{'user_id': self.user.id, 'city': 'Oslo', 'risk_score': 50.0,
+                             'risk_level': 'medium', 'date': start}] * 2)
+        db.session.commit()
+        summaries = {summary['city']: summary for summary in city_summaries(self.user.id)}
+        self.assertAlmostEqual(summaries['Rome']['trend'], 0.1 * DAYS_PER_YEAR, places=6)
+        self.assertIsNone(summaries['Oslo']['trend'])
+
+    def test_predict_updates_rollup(self):
+        """Test that a prediction saved by /predict is rolled up in the same commit"""
+        self.login(self.user)
+        for temperature_increase in (1.0, 3.0):
+            response = self.client.post('/predict', data={
+                'city': 'Testville', 'population': 750000, 'temperature_increase': temperature_increase,
+                'urban_density': 'high', 'infrastructure': 'aging'
+            })
+            self.assertEqual(response.status_code, 200)
+        rollup = db.session.get(CityRollup, (self.user.id, 'Testville'))
+        latest = Prediction.query.order_by(Prediction.id.desc()).first()
+        self.assertEqual(rollup.count, 2)
+        self.assertEqual((rollup.latest_risk_score, rollup.latest_date), (latest.risk_score, latest.date))
+
+    def test_summary_endpoint(self):
+        """Test that users see their own cities and only admins see everyone's"""
+        insert_predictions(self.mappings)
+        self.login(self.user)
+        cities = self.client.get('/api/cities/summary').get_json()['cities']
+        self.assertEqual(sum(city['count'] for city in cities), 30)
+        self.assertEqual(len(self.client.get('/api/cities/summary?city=Lima').get_json()['cities']), 1)
+        self.assertEqual(self.client.get('/api/cities/summary?all=true').status_code, 403)
+
+    def test_summary_endpoint_for_admins(self):
+        """Test that admins can summarize every user's predictions"""
+        insert_predictions(self.mappings)
+        self.login(self.admin)
+        cities = self.client.get('/api/cities/summary?all=true').get_json()['cities']
+        self.assertEqual(sum(city['count'] for city in cities), 60)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import itertools
+import unittest
+import numpy as np
+from predict_model import rule_based_prediction, risk_level_from_score, generate_insights, rule_based_prediction_batch
+from score_table import BASE_OFFSETS, INSIGHTS, lookup_score, lookup_insights, lookup_prediction
+
+class TestScoreTable(unittest.TestCase):
+    def setUp(self):
+        """Cover every bucket boundary, level (including unknown ones) and temperature band"""
+        populations = (0, 500000, 500001, 1000000, 1000001, 50000000)
+        temperatures = [round(0.1 * step, 1) for step in range(0, 61)] + [0.123456789, 1.5000001, 2.4999999, 4.87654321]
+        densities = ('low', 'medium', 'high', 'unknown')
+        infrastructures = ('new', 'moderate', 'aging', 'modern')
+        self.rows = list(itertools.product(populations, temperatures, densities, infrastructures))
+
+    def test_table_shapes(self):
+        """Test the size of the precomputed tables"""
+        self.assertEqual(BASE_OFFSETS.shape, (3, 3, 3))
+        self.assertEqual(len(INSIGHTS) * len(INSIGHTS[0]) * len(INSIGHTS[0][0]) * len(INSIGHTS[0][0][0]), 81)
+
+    def test_lookup_matches_rules(self):
+        """Test that table lookups equal the rule chain exactly"""
+        for row in self.rows:
+            risk_score = rule_based_prediction(*row)
+            risk_level = risk_level_from_score(risk_score)
+            risk_factors, recommendations = generate_insights(row[1], row[2], row[3], risk_level)
+            self.assertEqual(lookup_score(*row), risk_score)
+            self.assertEqual(lookup_insights(row[1], row[2], row[3], risk_level), (tuple(risk_factors), tuple(recommendations)))
+            self.assertEqual(lookup_prediction(*row), (risk_score, risk_level, tuple(risk_factors), tuple(recommendations)))
+
+    def test_scores_keep_the_original_addition_order(self):
+        """Test that every scoring path adds the factors in the original order, to the last bit"""
+        def original(population, temperature_increase, urban_density, infrastructure):
+            risk = 20 + (20 if population > 1000000 else 10 if population > 500000 else 0)
+            risk += temperature_increase * 10
+            risk += {'high': 15, 'medium': 10}.get(urban_density, 0)
+            risk += {'aging': 20, 'moderate': 10}.get(infrastructure, 0)
+            return min(risk, 100)
+
+        rng = np.random.default_rng(0)
+        rows = [(population, temperature, density, infrastructure)
+                for population in (0, 600000, 2000000) for temperature in rng.uniform(0, 5, 500).tolist()
+                for density in ('low', 'medium', 'high') for infrastructure in ('new', 'moderate', 'aging')]
+        expected = [original(*row) for row in rows]
+        self.assertEqual([rule_based_prediction(*row) for row in rows], expected)
+        self.assertEqual([lookup_score(*row) for row in rows], expected)
+        self.assertEqual([lookup_prediction(*row)[0] for row in rows], expected)
+        self.assertEqual(rule_based_prediction_batch(*(np.array(column) for column in zip(*rows))).tolist(), expected)
+
+    def test_insights_are_shared(self):
+        """Test that lookups return the same immutable tuples every time"""
+        first = lookup_prediction(2000000, 3.0, 'high', 'aging')
+        second = lookup_prediction(2000000, 3.0, 'high', 'aging')
+        self.assertIs(first[2], second[2])
+        self.assertIsInstance(first[3], tuple)
+
+class TestInsights(unittest.TestCase):
+    def test_insights_are_memoized(self):
+        """Test that equal inputs share one pair of immutable tuples"""
+        first = generate_insights(3.0, 'high', 'aging', 'high')
+        second = generate_insights(4.2, 'high', 'aging', 'high')
+        self.assertIs(first, second)
+        self.assertIsInstance(first[0], tuple)
+        self.assertIsInstance(first[1], tuple)
+
+    def test_unknown_levels_share_an_entry(self):
+        """Test that values the rules ignore do not grow the cache"""
+        self.assertIs(generate_insights(1.0, 'low', 'new', 'low'), generate_insights(1.0, 'sparse', 'modern', 'none'))
+
+    def test_template_renders_shared_insights(self):
+        """Test that the prediction page renders the tuples it is given"""
+        from app import app
+        app.config['WTF_CSRF_ENABLED'] = False
+        response = app.test_client().post('/predict', data={
+            'city': 'Testville', 'population': 2000000, 'temperature_increase': 3.0,
+            'urban_density': 'high', 'infrastructure': 'aging'
+        })
+        self.assertEqual(response.status_code, 200)
+        for text in generate_insights(3.0, 'high', 'aging', 'high')[0] + generate_insights(3.0, 'high', 'aging', 'high')[1]:
+            self.assertIn(text.encode(), response.data)
+
+if __name__ == '__main__':
+    unittest.main()
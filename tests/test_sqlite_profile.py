@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from flask import Flask
+from sqlalchemy import text
+from models import db
+from sqlite_profile import engine_options, install_pragmas
+
+class TestSqliteProfile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def pragmas(self, profile, uri=None):
+        """PRAGMA values seen by a connection of an app configured with profile"""
+        profile_app = Flask(__name__)
+        uri = uri or 'sqlite:///' + os.path.join(self.directory.name, f'{profile}.db')
+        profile_app.config['SQLALCHEMY_DATABASE_URI'] = uri
+        profile_app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(profile, uri)
+        db.init_app(profile_app)
+        with profile_app.app_context():
+            install_pragmas(db.engine, profile)
+            values = {pragma: db.session.execute(text(f'PRAGMA {pragma}')).scalar()
+                      for pragma in ('journal_mode', 'synchronous', 'mmap_size', 'busy_timeout')}
+            pool_size = db.engine.pool.size() if hasattr(db.engine.pool, 'size') else None
+            db.session.remove()
+            db.engine.dispose()
+        return values, pool_size
+
+    def test_production_profile(self):
+        """Test that the production profile enables WAL and the other pragmas on every connection"""
+        values, pool_size = self.pragmas('production')
+        self.assertEqual(values['journal_mode'], 'wal')
+        self.assertEqual(values['synchronous'], 1)  # NORMAL
+        self.assertEqual(values['mmap_size'], 256 * 1024 * 1024)
+        self.assertEqual(values['busy_timeout'], 10000)
+        self.assertEqual(pool_size, 10)
+
+    def test_default_profile(self):
+        """Test that the default profile leaves SQLite's own settings"""
+        values, _ = self.pragmas('default')
+        self.assertEqual(values['journal_mode'], 'delete')
+        self.assertEqual(values['synchronous'], 2)  # FULL
+
+    def test_in_memory_database(self):
+        """Test that in-memory databases get the pragmas but not the file pool's options"""
+        for uri in ('sqlite://', 'sqlite:///:memory:'):
+            self.assertEqual(engine_options('production', uri), {})
+            values, pool_size = self.pragmas('production', uri)
+            self.assertEqual(values['busy_timeout'], 10000)
+            self.assertIsNone(pool_size)  # StaticPool
+        self.assertEqual(engine_options('production', 'sqlite:///climate_risk.db')['pool_size'], 10)
+
+    def test_unknown_profile(self):
+        """Test that a misspelled profile name is reported"""
+        with self.assertRaises(ValueError):
+            engine_options('fast')
+
+if __name__ == '__main__':
+    unittest.main()
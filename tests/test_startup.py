@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+class TestStartup(unittest.TestCase):
+    def imported_modules(self, module):
+        """Names of the top-level modules loaded by a cold `import module`"""
+        completed = subprocess.run(
+            [sys.executable, '-c', f'import sys, {module}; print(" ".join(sys.modules))'],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        return {name.split('.')[0] for name in completed.stdout.split()}
+
+    def test_app_import_is_lazy(self):
+        """Test that importing the app does not load the plotting and scoring stack"""
+        modules = self.imported_modules('app')
+        for heavy in ('numpy', 'matplotlib', 'sklearn', 'pandas'):
+            self.assertNotIn(heavy, modules)
+
+    def test_app_import_skips_migrations(self):
+        """Test that serving processes do not load Alembic, which only the migration commands need"""
+        modules = self.imported_modules('app')
+        for name in ('flask_migrate', 'alembic'):
+            self.assertNotIn(name, modules)
+
+    def test_app_import_does_not_touch_database(self):
+        """Test that importing the app neither creates nor opens its database; init-db does that"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'fresh.db')
+            env = dict(os.environ, SQLALCHEMY_DATABASE_URI='sqlite:///' + path)
+            completed = subprocess.run(
+                [sys.executable, '-c', 'from app import app; print(" ".join(app.cli.list_commands(None)))'],
+                cwd=ROOT, env=env, capture_output=True, text=True, check=True
+            )
+            self.assertIn('init-db', completed.stdout.split())
+            self.assertEqual(os.listdir(directory), [])
+
+if __name__ == '__main__':
+    unittest.main()
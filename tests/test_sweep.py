@@ -0,0 +1,105 @@
+import unittest
+from app import app
+from predict_model import risk_level_from_score, rule_based_prediction
+from sweep import MAX_SWEEP_POINTS, sweep, temperature_grid
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        self.populations = [1000, 500000, 750000, 2000000]
+        self.temperatures = temperature_grid()
+
+    def test_grid(self):
+        """Test that the default grid covers the form's range in 0.1 steps"""
+        self.assertEqual(len(self.temperatures), 50)
+        self.assertEqual(self.temperatures[0], 0.1)
+        self.assertEqual(self.temperatures[2], 0.3)
+        self.assertEqual(self.temperatures[-1], 5.0)
+        with self.assertRaises(ValueError):
+            temperature_grid(1.0, 2.0, 0)
+        with self.assertRaises(ValueError):
+            temperature_grid(2.0, 1.0, 0.1)
+
+    def test_grid_size_is_checked_before_allocating(self):
+        """Test that oversized and non-finite grids are refused up front"""
+        with self.assertRaises(ValueError):
+            temperature_grid(0.0, 1e9, 0.0001)
+        with self.assertRaises(ValueError):
+            temperature_grid(0.0, 1.0, 0.1, max_points=5)
+        self.assertEqual(len(temperature_grid(0.0, 1.0, 0.25, max_points=5)), 5)
+        for start, stop, step in ((0.0, float('inf'), 0.1), (float('nan'), 1.0, 0.1), (0.0, 1.0, float('nan'))):
+            with self.assertRaises(ValueError):
+                temperature_grid(start, stop, step)
+
+    def test_curves_equal_rules(self):
+        """Test that every point of every curve equals rule_based_prediction"""
+        for urban_density in ('low', 'medium', 'high'):
+            for infrastructure in ('new', 'moderate', 'aging'):
+                result = sweep(self.populations, urban_density, infrastructure, self.temperatures)
+                for curve in result['curves']:
+                    for temperature, score, level in zip(result['temperature_increase'], curve['risk_score'],
+                                                         curve['risk_level']):
+                        expected = rule_based_prediction(curve['population'], temperature, urban_density,
+                                                         infrastructure)
+                        self.assertEqual(score, expected)
+                        self.assertEqual(level, risk_level_from_score(expected))
+
+    def test_crossings_match_level_changes(self):
+        """Test that the analytic crossings fall where the sampled level changes"""
+        temperatures = temperature_grid(0.0, 10.0, 0.01)
+        for urban_density in ('low', 'medium', 'high'):
+            for infrastructure in ('new', 'moderate', 'aging'):
+                result = sweep(self.populations, urban_density, infrastructure, temperatures)
+                for curve in result['curves']:
+                    for level, crossing in curve['crossings'].items():
+                        entered = [temperature for temperature, point in
+                                   zip(result['temperature_increase'], curve['risk_level']) if point == level]
+                        if crossing is None:
+                            self.assertTrue(not entered or entered[0] == 0.0)
+                        else:
+                            self.assertAlmostEqual(entered[0], crossing, places=6)
+
+    def test_limits(self):
+        """Test that empty and oversized sweeps are rejected"""
+        with self.assertRaises(ValueError):
+            sweep([], 'low', 'new', self.temperatures)
+        with self.assertRaises(ValueError):
+            sweep([1000], 'low', 'new', [])
+        with self.assertRaises(ValueError):
+            sweep(list(range(MAX_SWEEP_POINTS // 50 + 1)), 'low', 'new', self.temperatures)
+
+    def test_endpoint(self):
+        """Test the sweep endpoint with a query string and a JSON body"""
+        response = self.client.get('/api/predict/sweep?population=2000000&urban_density=high'
+                                   '&infrastructure=aging&temperature_step=0.5')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(len(data['temperature_increase']), 10)
+        self.assertEqual(data['curves'][0]['risk_score'][0], min(
+            rule_based_prediction(2000000, 0.1, 'high', 'aging'), 100))
+
+        response = self.client.post('/api/predict/sweep', json={
+            'populations': [1000, 2000000], 'urban_density': 'low', 'infrastructure': 'new'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([curve['crossings'] for curve in response.get_json()['curves']],
+                         [{'medium': 2.0, 'high': 5.0}, {'medium': None, 'high': 3.0}])
+
+    def test_endpoint_errors(self):
+        """Test that missing and invalid parameters return 400"""
+        self.assertEqual(self.client.get('/api/predict/sweep').status_code, 400)
+        self.assertEqual(self.client.get('/api/predict/sweep?population=abc').status_code, 400)
+        self.assertEqual(self.client.get('/api/predict/sweep?population=600000&temperature_min=0'
+                                         '&temperature_max=1e9&temperature_step=0.0001').status_code, 400)
+        self.assertEqual(self.client.get('/api/predict/sweep?population=600000&temperature_max=inf').status_code,
+                         400)
+        # The points per population shrink as populations are added
+        self.assertEqual(self.client.post('/api/predict/sweep', json={
+            'populations': [1000] * 1000, 'temperature_min': 0, 'temperature_max': 10,
+            'temperature_step': 0.01}).status_code, 400)
+        self.assertEqual(self.client.post('/api/predict/sweep', data='{"population": Infinity}',
+                                          content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.get('/api/predict/sweep?population=1000&temperature_step=-1').status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from unittest import mock
+import numpy as np
+from app import app
+from projections import PROJECTION_YEARS, project_city
+import uncertainty
+from uncertainty import (MAX_MONTE_CARLO_DRAWS, MAX_MONTE_CARLO_SAMPLES, MONTE_CARLO_BLOCK_BYTES, block_cities,
+                         simulate, simulate_city)
+
+class TestUncertainty(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.cities = 40
+        self.columns = (
+            rng.uniform(0.1, 5.0, self.cities),
+            rng.uniform(20, 100, self.cities),
+            rng.choice(['low', 'medium', 'high'], self.cities),
+            rng.choice(['new', 'moderate', 'aging'], self.cities)
+        )
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+    def test_city_scenarios(self):
+        """Test that one city's scenarios are a (samples, years) array around its trend"""
+        scenarios = simulate_city(2.0, 50.0, 'medium', 'moderate', samples=5000, seed=1)
+        trend = project_city(2.0, 50.0, 'medium', 'moderate')
+        self.assertEqual(scenarios['rainfall'].shape, (5000, len(PROJECTION_YEARS)))
+        self.assertTrue((np.abs(scenarios['rainfall'] - trend['rainfall']) <= 25).all())
+        self.assertTrue((np.abs(scenarios['risk'] - trend['risk']) <= 2.5).all())
+        np.testing.assert_allclose(scenarios['rainfall'].mean(axis=0), trend['rainfall'], atol=1.0)
+
+    def test_bands_are_ordered(self):
+        """Test that p5 <= p50 <= p95 and that the bands match the single-city scenarios"""
+        bands = simulate(*self.columns, samples=500, seed=7)
+        for quantity in ('rainfall', 'risk'):
+            self.assertEqual(bands[quantity]['p50'].shape, (self.cities, len(PROJECTION_YEARS)))
+            self.assertTrue((bands[quantity]['p5'] <= bands[quantity]['p50']).all())
+            self.assertTrue((bands[quantity]['p50'] <= bands[quantity]['p95']).all())
+        self.assertTrue((bands['risk']['p95'] <= 100).all())
+
+    def test_reproducible_across_blocks(self):
+        """Test that a seed gives the same bands however the batch is split"""
+        expected = simulate(*self.columns, samples=300, seed=11)
+        with mock.patch.object(uncertainty, 'MONTE_CARLO_CHUNK_CITIES', 7):
+            split = simulate(*self.columns, samples=300, seed=11)
+            pooled = simulate(*self.columns, samples=300, seed=11, processes=2)
+        for quantity in ('rainfall', 'risk'):
+            for name, band in expected[quantity].items():
+                np.testing.assert_array_equal(split[quantity][name], band)
+                np.testing.assert_array_equal(pooled[quantity][name], band)
+        different = simulate(*self.columns, samples=300, seed=12)
+        self.assertFalse(np.array_equal(different['rainfall']['p50'], expected['rainfall']['p50']))
+
+    def test_invalid_input(self):
+        """Test that bad sample counts and ragged columns are rejected"""
+        with self.assertRaises(ValueError):
+            simulate(*self.columns, samples=0)
+        with self.assertRaises(ValueError):
+            simulate(*self.columns, samples=MAX_MONTE_CARLO_SAMPLES + 1)
+        with self.assertRaises(ValueError):
+            simulate([1.0, 2.0], [50.0], ['low'], ['new'])
+
+    def test_blocks_fit_the_memory_budget(self):
+        """Test that more samples mean fewer cities per block, never over the budget"""
+        years = len(PROJECTION_YEARS)
+        self.assertEqual(block_cities(1000, years), 256)
+        for samples in (10000, MAX_MONTE_CARLO_SAMPLES):
+            self.assertLessEqual(block_cities(samples, years) * samples * years * 8, MONTE_CARLO_BLOCK_BYTES)
+        self.assertEqual(block_cities(10 ** 9, years), 1)
+        with self.assertRaises(ValueError):
+            simulate(*self.columns, samples=MAX_MONTE_CARLO_DRAWS // self.cities + 1)
+
+    def test_pool_is_reused(self):
+        """Test that parallel runs share one long-lived pool"""
+        try:
+            with mock.patch.object(uncertainty, 'MONTE_CARLO_CHUNK_CITIES', 10):
+                first = simulate(*self.columns, samples=50, seed=3, processes=2)
+                executor = uncertainty._executor
+                second = simulate(*self.columns, samples=50, seed=3, processes=2)
+            self.assertIsNotNone(executor)
+            self.assertIs(uncertainty._executor, executor)
+            np.testing.assert_array_equal(first['risk']['p50'], second['risk']['p50'])
+        finally:
+            uncertainty.shutdown_pool()
+        self.assertIsNone(uncertainty._executor)
+
+    def test_pool_shut_down_under_a_run_is_replaced(self):
+        """Test that a run given a pool another thread shut down retries on a fresh one"""
+        try:
+            with mock.patch.object(uncertainty, 'MONTE_CARLO_CHUNK_CITIES', 10):
+                expected = simulate(*self.columns, samples=50, seed=3, processes=2)
+                dead = uncertainty._executor
+                dead.shutdown()  # As if another thread shut it down after this one took it
+                bands = simulate(*self.columns, samples=50, seed=3, processes=2)
+            self.assertIsNot(uncertainty._executor, dead)
+            np.testing.assert_array_equal(bands['risk']['p50'], expected['risk']['p50'])
+        finally:
+            uncertainty.shutdown_pool()
+
+    def test_endpoint(self):
+        """Test the uncertainty endpoint returns reproducible bands per city"""
+        cities = [
+            {'city': 'A', 'population': 600000, 'temperature_increase': 2.0, 'urban_density': 'high',
+             'infrastructure': 'aging'},
+            {'city': 'B', 'population': 1000, 'temperature_increase': 0.5, 'urban_density': 'low',
+             'infrastructure': 'new'}
+        ]
+        response = self.client.post('/api/predict/uncertainty?samples=200&seed=5', json=cities)
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['city'], ['A', 'B'])
+        self.assertEqual(data['seed'], 5)
+        self.assertEqual(len(data['risk']['p95']), 2)
+        self.assertEqual(len(data['rainfall']['p5'][0]), len(PROJECTION_YEARS))
+        self.assertEqual(self.client.post('/api/predict/uncertainty?samples=200&seed=5', json=cities).get_json(),
+                         data)
+
+        self.assertIsInstance(self.client.post('/api/predict/uncertainty', json=cities).get_json()['seed'], int)
+        self.assertEqual(self.client.post('/api/predict/uncertainty?samples=-1', json=cities).status_code, 400)
+        self.assertEqual(self.client.post('/api/predict/uncertainty', json={'population': [1000]}).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from projections import PROJECTION_YEARS, projection_trend
+
+# Scenarios drawn per city when the caller does not ask for a number
+MONTE_CARLO_SAMPLES = 1000
+# Most scenarios one city may draw
+MAX_MONTE_CARLO_SAMPLES = 100000
+# Percentile bands reported per year
+PERCENTILES = (5, 50, 95)
+# Most scenarios (cities x samples) one simulate() call may draw
+MAX_MONTE_CARLO_DRAWS = 10_000_000
+# Most cities simulated per (cities, samples, years) block
+MONTE_CARLO_CHUNK_CITIES = 256
+# Bytes of one block's float64 scenario array; a block holds two of them
+# (rainfall and risk) plus the copy np.percentile sorts, so about 3x this
+MONTE_CARLO_BLOCK_BYTES = 32 * 1024 * 1024
+
+# Quantities that carry the yearly jitter; temperature follows its trend exactly
+UNCERTAIN_QUANTITIES = ('rainfall', 'risk')
+
+
+def city_seeds(seed, n_cities):
+    """
+    One independent SeedSequence per city, spawned from seed.
+
+    City i always draws from the same stream, however the batch is split
+    into chunks or spread over processes.
+    """
+    return np.random.SeedSequence(seed).spawn(n_cities)
+
+
+def block_cities(samples, n_years):
+    """Cities per block: as many as fit MONTE_CARLO_BLOCK_BYTES, at least 1, at most MONTE_CARLO_CHUNK_CITIES."""
+    return max(1, min(MONTE_CARLO_CHUNK_CITIES, MONTE_CARLO_BLOCK_BYTES // (samples * n_years * 8)))
+
+
+def _scenarios(temperature_increase, risk_score, urban_density, infrastructure, seeds, samples, years):
+    """Rainfall and risk scenarios of shape (cities, samples, years) for one block of cities."""
+    _, rainfall, risk = projection_trend(temperature_increase, risk_score, urban_density, infrastructure, years)
+
+    # The same yearly draw moves rainfall and risk, as the plot jitter does
+    noise = np.empty((len(seeds), samples, len(years)))
+    for row, seed in enumerate(seeds):
+        np.random.default_rng(seed).random(out=noise[row])
+    # Worked in place: the noise buffer becomes the risk scenarios
+    noise *= 50
+    noise -= 25
+    rainfall = np.maximum(0, noise + rainfall[:, None, :])
+    noise /= 10
+    noise += risk[:, None, :]
+    return {
+        'rainfall': rainfall,
+        'risk': np.minimum(100, noise, out=noise)
+    }
+
+
+def _bands(scenarios):
+    """Percentile bands over the samples axis: quantity -> 'p5'/'p50'/'p95' -> (cities, years)."""
+    bands = {}
+    for quantity, values in scenarios.items():
+        percentiles = np.percentile(values, PERCENTILES, axis=1)
+        bands[quantity] = {f'p{percentile}': band for percentile, band in zip(PERCENTILES, percentiles)}
+    return bands
+
+
+def _simulate_block(block):
+    return _bands(_scenarios(*block))
+
+
+def simulate_city(temperature_increase, risk_score, urban_density, infrastructure, samples=MONTE_CARLO_SAMPLES,
+                  seed=None, years=PROJECTION_YEARS):
+    """
+    Monte Carlo scenarios for one city.
+
+    Returns:
+        dict: 'years', plus 'rainfall' and 'risk' arrays of shape (samples, years)
+    """
+    scenarios = _scenarios([temperature_increase], [risk_score], [urban_density], [infrastructure],
+                           city_seeds(seed, 1), samples, years)
+    result = {'years': list(years)}
+    for quantity, values in scenarios.items():
+        result[quantity] = values[0]
+    return result
+
+
+_executor = None
+_executor_processes = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(processes):
+    """The long-lived pool of `processes` simulation workers, started on first use."""
+    global _executor, _executor_processes
+    with _executor_lock:
+        if _executor is not None and _executor_processes != processes:
+            # Simulations already submitted to the old pool still finish
+            _executor.shutdown(wait=False)
+            _executor = None
+        if _executor is None:
+            # Spawned, like the plot renderers, so workers do not inherit a threaded server's locks
+            _executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+            _executor_processes = processes
+        return _executor
+
+
+def shutdown_pool(executor=None):
+    """Stop the simulation workers (only if `executor` is still the pool); the pool starts again when next needed."""
+    global _executor
+    with _executor_lock:
+        if executor is not None and executor is not _executor:
+            return
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown_pool)
+
+
+def simulate(temperature_increase, risk_score, urban_density, infrastructure, samples=MONTE_CARLO_SAMPLES, seed=None,
+             processes=None, years=PROJECTION_YEARS):
+    """
+    Percentile bands of the projected rainfall and risk for many cities.
+
+    Every city draws samples scenarios of the yearly jitter the plots apply
+    once, and the bands summarize them per year. Cities are simulated in
+    blocks sized by block_cities(), so memory stays bounded however many
+    samples are drawn; with processes > 1 and more than one block, the
+    blocks run in a process pool that is kept for later calls. Results do
+    not depend on the block size or the number of processes.
+
+    Args:
+        temperature_increase, risk_score, urban_density, infrastructure:
+            Equally sized array-likes, one entry per city
+        samples (int): Scenarios per city
+        seed (int): Seed of the batch; None draws fresh entropy
+        processes (int): Worker processes for large batches; None or 1 runs in process
+
+    Returns:
+        dict: 'years' plus, for 'rainfall' and 'risk', a dict of 'p5', 'p50'
+            and 'p95' arrays of shape (cities, years)
+
+    Raises:
+        ValueError: If samples is outside 1..MAX_MONTE_CARLO_SAMPLES, cities x
+            samples exceeds MAX_MONTE_CARLO_DRAWS or the columns differ in length
+    """
+    if not 1 <= samples <= MAX_MONTE_CARLO_SAMPLES:
+        raise ValueError(f"samples must be between 1 and {MAX_MONTE_CARLO_SAMPLES}")
+    columns = [np.atleast_1d(np.asarray(column)) for column in
+               (temperature_increase, risk_score, urban_density, infrastructure)]
+    n_cities = len(columns[0])
+    if any(len(column) != n_cities for column in columns):
+        raise ValueError("All columns must have the same length")
+    if n_cities * samples > MAX_MONTE_CARLO_DRAWS:
+        raise ValueError(f"cities x samples is limited to {MAX_MONTE_CARLO_DRAWS}")
+
+    seeds = city_seeds(seed, n_cities)
+    size = block_cities(samples, len(years))
+    blocks = [
+        tuple(column[start:start + size] for column in columns) + (seeds[start:start + size], samples, years)
+        for start in range(0, n_cities, size)
+    ]
+    if processes and processes > 1 and len(blocks) > 1:
+        for attempt in range(2):
+            executor = _get_executor(processes)
+            try:
+                results = list(executor.map(_simulate_block, blocks))
+                break
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); the next call starts a fresh pool
+                shutdown_pool(executor)
+                raise
+            except RuntimeError:
+                # "cannot schedule new futures after shutdown": another thread replaced
+                # the pool after this one took it; retry once on the current pool
+                shutdown_pool(executor)
+                if attempt:
+                    raise
+    else:
+        results = [_simulate_block(block) for block in blocks]
+
+    bands = {'years': list(years)}
+    for quantity in UNCERTAIN_QUANTITIES:
+        bands[quantity] = {
+            name: np.concatenate([result[quantity][name] for result in results]) if results
+            else np.empty((0, len(years)))
+            for name in (f'p{percentile}' for percentile in PERCENTILES)
+        }
+    return bands